@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+"""
+Address Book
+
+Reverse index over the address books in src/test/addresses_*.sol (mainnet, wallets, deployers
+and the L2 files): address -> every (book, name) it is known as. With --history, the archived
+copies are indexed too, recording for each name the first and last archive dates it appeared in.
+
+The index is cached in .cache/addresses; the current books are re-parsed only when their
+content changes, and each distinct archived file content is parsed once.
+
+Usage:
+    ./addressbook.py <address> [<address> ...] [--history]
+    ./addressbook.py --annotate [--history] < wards-output.txt
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import sys
+
+from packstore import ArchiveStore, load_file_index
+
+# Constants
+BOOK_DIR = 'src/test'
+BOOK_FILE_PATTERN = re.compile(r'^addresses_(\w+)\.sol$')
+ARCHIVE_BOOK_PATTERN = re.compile(r'^test/addresses_(\w+)\.sol$')
+CACHE_DIR = os.path.join(os.environ.get('SPELLS_CACHE_DIR', '.cache'), 'addresses')
+CURRENT_CACHE_PATH = os.path.join(CACHE_DIR, 'current.json')
+HISTORY_CACHE_PATH = os.path.join(CACHE_DIR, 'history.json')
+# Bump when parsing changes so cached results are parsed again
+PARSER_VERSION = 1
+NAMED_ENTRY_PATTERN = re.compile(r'^\s*addr\s*\[\s*"([^"]+)"\s*\]\s*=\s*(0x[0-9a-fA-F]{40})\s*;')
+LISTED_ENTRY_PATTERN = re.compile(r'^\s*(0x[0-9a-fA-F]{40})\s*,?\s*(?://\s*(.*?)\s*)?$')
+ADDRESS_PATTERN = re.compile(r'\b0x[0-9a-fA-F]{40}\b')
+
+
+def parse_book(text, book):
+    """Parse the entries of an address book contract.
+
+    Named books (`addr["NAME"] = 0x...;`) give their key; entries of listed books such as the
+    deployers array are named by their trailing comment, or by the book when there is none.
+    Commented-out entries are skipped.
+
+    Args:
+        text (str): Solidity source of an addresses_*.sol
+        book (str): Book name (mainnet, wallets, deployers, arbitrum, ...)
+
+    Returns:
+        list: (lowercase address, name) pairs
+    """
+    entries = []
+    for line in text.splitlines():
+        named = NAMED_ENTRY_PATTERN.match(line)
+        if named:
+            entries.append((named.group(2).lower(), named.group(1)))
+            continue
+        item = LISTED_ENTRY_PATTERN.match(line)
+        if item:
+            entries.append((item.group(1).lower(), item.group(2) or book.upper()))
+    return entries
+
+
+def digest_of(content):
+    return hashlib.sha256(content).hexdigest()
+
+
+def load_json(path):
+    try:
+        with open(path) as f:
+            data = json.load(f)
+        return data if data.get('version') == PARSER_VERSION else {}
+    except (FileNotFoundError, ValueError):
+        return {}
+
+
+def save_json(path, data):
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    with open(path + '.tmp', 'w') as f:
+        json.dump(dict(data, version=PARSER_VERSION), f, separators=(',', ':'))
+    os.replace(path + '.tmp', path)
+
+
+def build_current(book_dir=BOOK_DIR):
+    """Index the current address books, reusing the cache while their content is unchanged.
+
+    Returns:
+        dict: {lowercase address: [[book, name], ...]}
+    """
+    books = {}
+    for entry in sorted(os.listdir(book_dir)):
+        match = BOOK_FILE_PATTERN.match(entry)
+        if match:
+            with open(os.path.join(book_dir, entry), 'rb') as f:
+                books[match.group(1)] = f.read()
+    key = digest_of(b''.join(f'{book}\0'.encode() + content for book, content in books.items()))
+
+    cached = load_json(CURRENT_CACHE_PATH)
+    if cached.get('key') == key:
+        return cached['index']
+
+    index = {}
+    for book, content in books.items():
+        for address, name in parse_book(content.decode('utf-8'), book):
+            index.setdefault(address, []).append([book, name])
+    save_json(CURRENT_CACHE_PATH, {'key': key, 'index': index})
+    return index
+
+
+def build_history(store):
+    """Index the address books of every archived spell.
+
+    Returns:
+        dict: {lowercase address: {"book:name": [first date, last date]}}
+    """
+    files_index, _ = load_file_index(store)
+    cached = load_json(HISTORY_CACHE_PATH)
+    parsed = cached.get('parsed', {})
+
+    history, used = {}, set()
+    for name in sorted(files_index):
+        date = name[:10]
+        for relative, digest in files_index[name]['files'].items():
+            match = ARCHIVE_BOOK_PATTERN.match(relative)
+            if not match:
+                continue
+            book = match.group(1)
+            key = f'{book}:{digest}'
+            if key not in parsed:
+                parsed[key] = parse_book(store.read(name, relative).decode('utf-8', errors='replace'), book)
+            used.add(key)
+            for address, label in parsed[key]:
+                seen = history.setdefault(address, {}).setdefault(f'{book}:{label}', [date, date])
+                seen[0], seen[1] = min(seen[0], date), max(seen[1], date)
+
+    save_json(HISTORY_CACHE_PATH, {'parsed': {key: parsed[key] for key in used}})
+    return history
+
+
+class AddressBook:
+    """
+    O(1) address -> names lookups over the current (and optionally archived) address books.
+    """
+
+    def __init__(self, history=False, book_dir=BOOK_DIR, store=None):
+        self.current = build_current(book_dir)
+        self.history = build_history(store or ArchiveStore()) if history else {}
+
+    def names(self, address):
+        """
+        Current names of an address as `book:name` strings.
+        """
+        return [f'{book}:{name}' for book, name in self.current.get(address.lower(), ())]
+
+    def past_names(self, address):
+        """
+        Archived names of an address that it no longer has, with their first and last dates.
+        """
+        current = set(self.names(address))
+        return {
+            label: dates for label, dates in self.history.get(address.lower(), {}).items()
+            if label not in current
+        }
+
+    def label(self, address):
+        names = [name.split(':', 1)[1] for name in self.names(address)]
+        if not names:
+            names = [f"{label.split(':', 1)[1]} until {dates[1]}" for label, dates in self.past_names(address).items()]
+        return ', '.join(dict.fromkeys(names))
+
+    def annotate(self, text):
+        """
+        Append the known names after every address found in the text.
+        """
+        def replace(match):
+            label = self.label(match.group(0))
+            return f'{match.group(0)} ({label})' if label else match.group(0)
+        return ADDRESS_PATTERN.sub(replace, text)
+
+
+def parse_arguments():
+    """Parse command line arguments.
+
+    Returns:
+        argparse.Namespace: The parsed arguments
+    """
+    parser = argparse.ArgumentParser(description="Look up the names of addresses in the address books")
+    parser.add_argument(
+        "addresses",
+        nargs="*",
+        help="Addresses to look up"
+    )
+    parser.add_argument(
+        "--annotate",
+        action="store_true",
+        help="Copy stdin to stdout, naming every known address"
+    )
+    parser.add_argument(
+        "--history",
+        action="store_true",
+        help="Include the address books of every archived spell"
+    )
+    args = parser.parse_args()
+    if not args.addresses and not args.annotate:
+        parser.error("Please specify addresses to look up or --annotate")
+    return args
+
+
+def main():
+    """Main function to look up or annotate addresses."""
+    args = parse_arguments()
+    book = AddressBook(history=args.history)
+
+    if args.annotate:
+        for line in sys.stdin:
+            sys.stdout.write(book.annotate(line))
+        return
+
+    for address in args.addresses:
+        names = book.names(address)
+        past = book.past_names(address)
+        if not names and not past:
+            print(f"{address}: unknown")
+            continue
+        print(f"{address}:")
+        for name in names:
+            print(f"    {name}")
+        for label, (first, last) in sorted(past.items(), key=lambda item: item[1]):
+            print(f"    {label} ({first} - {last})")
+
+
+# Execute the main function if this script is run directly
+if __name__ == "__main__":
+    main()
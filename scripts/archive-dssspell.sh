@@ -3,6 +3,9 @@ set -e
 
 if [[ -z "$1" ]]; then
   echo "You must provide a date (YYYY-MM-DD) option to name the directory"
+elif [[ -d "./archive/.store" ]]; then
+  ./scripts/packstore.py add "./src" "$1-DssSpell"
+  echo "Spell, tests and base packed into the archive store as $1-DssSpell"
 else
   cp -r "./src" "./archive/$1-DssSpell"
   echo "Spell, tests and base copied to archive directory $1-DssSpell"
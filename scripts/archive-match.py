@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Archive Matcher
+
+Finds which archived spells match the working tree (`src/` by default) and, for the others,
+which files differ. A per-file sha256 index of every archived spell is kept in
+.cache/archive/index.json; on each run only the archive directories whose tree changed
+(by the mtimes and sizes of their entries) are re-hashed, and packed spells are read
+from their store manifests.
+
+Usage:
+    ./archive-match.py [--source src] [--closest <n>] [--all] [--json]
+"""
+
+import argparse
+import json
+import os
+import sys
+
+from packstore import ArchiveStore, hash_tree, load_file_index, tree_digest
+
+# Constants
+SOURCE_DIR = 'src'
+DEFAULT_CLOSEST = 5
+
+
+def compare(source, archived):
+    """Compare two {relative path: sha256} maps.
+
+    Returns:
+        dict: 'changed', 'only_source' and 'only_archive' lists of relative paths
+    """
+    return {
+        'changed': sorted(path for path in source.keys() & archived.keys() if source[path] != archived[path]),
+        'only_source': sorted(source.keys() - archived.keys()),
+        'only_archive': sorted(archived.keys() - source.keys()),
+    }
+
+
+def match(source_files, index):
+    """Rank every archived spell against the source tree.
+
+    Returns:
+        tuple: (names matching exactly, list of (name, differences) sorted by number of differing files)
+    """
+    digest = tree_digest(source_files)
+    exact = sorted(name for name, entry in index.items() if entry['digest'] == digest)
+    ranked = []
+    for name, entry in index.items():
+        if entry['digest'] == digest:
+            continue
+        differences = compare(source_files, entry['files'])
+        ranked.append((name, differences))
+    ranked.sort(key=lambda item: (sum(map(len, item[1].values())), item[0]))
+    return exact, ranked
+
+
+def parse_arguments():
+    """Parse command line arguments.
+
+    Returns:
+        argparse.Namespace: The parsed arguments
+    """
+    parser = argparse.ArgumentParser(description="Find the archived spells matching the working tree")
+    parser.add_argument(
+        "--source",
+        default=SOURCE_DIR,
+        help=f"Directory to compare (default: {SOURCE_DIR})"
+    )
+    parser.add_argument(
+        "--closest",
+        type=int,
+        default=DEFAULT_CLOSEST,
+        help=f"Number of non-matching archives to show (default: {DEFAULT_CLOSEST})"
+    )
+    parser.add_argument(
+        "--all",
+        action="store_true",
+        help="Show every non-matching archive"
+    )
+    parser.add_argument(
+        "--json",
+        action="store_true",
+        help="Print the result as JSON"
+    )
+    return parser.parse_args()
+
+
+def main():
+    """Main function to match the working tree against the archive."""
+    args = parse_arguments()
+    if not os.path.isdir(args.source):
+        sys.exit(f"{args.source} is not a directory")
+
+    index, refreshed = load_file_index(ArchiveStore())
+    exact, ranked = match(hash_tree(args.source), index)
+    if not args.all:
+        ranked = ranked[:args.closest]
+
+    if args.json:
+        print(json.dumps({
+            'exact': exact,
+            'closest': [{'archive': name, **differences} for name, differences in ranked],
+        }, indent=2))
+        return
+
+    print(f"Indexed {len(index)} archives ({refreshed} refreshed)")
+    if exact:
+        for name in exact:
+            print(f"{name}: exact match")
+    else:
+        print(f"No archive matches {args.source} exactly")
+    for name, differences in ranked:
+        print(f"{name}: {sum(map(len, differences.values()))} differing files")
+        for path in differences['changed']:
+            print(f"    changed        {path}")
+        for path in differences['only_source']:
+            print(f"    only in source {path}")
+        for path in differences['only_archive']:
+            print(f"    only archived  {path}")
+
+
+# Execute the main function if this script is run directly
+if __name__ == "__main__":
+    main()
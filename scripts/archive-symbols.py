@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+"""
+Archive Symbol Index
+
+Inverted index over the Solidity files of every archived spell, mapping ilks ("ETH-A"),
+DssExecLib calls (setIlkStabilityFee), ChainLog keys (MCD_VAT) and addresses to the archives,
+files and lines that mention them.
+
+Each distinct file content is scanned once (archives share most of their files) and the
+per-content symbols are kept in .cache/archive/symbols.json, so `update` only scans files that
+appeared since the last run. Queries read the compact .cache/archive/symbols-<kind>.json
+written by `update` and never touch the archive itself.
+
+Usage:
+    ./archive-symbols.py update
+    ./archive-symbols.py query <symbol> [--kind ilk|call|key|address] [--prefix] [--update]
+    ./archive-symbols.py list --kind <kind>
+    ./archive-symbols.py check
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+
+from packstore import ArchiveStore, load_file_index
+from spellconfig import load_config
+
+# Constants
+CACHE_DIR = os.path.join(os.environ.get('SPELLS_CACHE_DIR', '.cache'), 'archive')
+SYMBOLS_PATH = os.path.join(CACHE_DIR, 'symbols.json')
+QUERY_PATH_PATTERN = os.path.join(CACHE_DIR, 'symbols-{kind}.json')
+# Bump when the patterns change so every file is scanned again
+SCANNER_VERSION = 2
+INDEXED_SUFFIX = '.sol'
+PATTERNS = {
+    # Collateral ilks end in a single letter (ETH-A, PSM-USDC-A); D3M ilks start with DIRECT- (DIRECT-SPARK-DAI)
+    'ilk': re.compile(r'"(DIRECT(?:-[A-Z0-9]+)+|[A-Z][A-Z0-9]*(?:-[A-Z0-9]+)*-[A-Z])"'),
+    'call': re.compile(r'\bDssExecLib\.(\w+)\s*\('),
+    'key': re.compile(
+        r'(?:\b(?:getAddress|getChangelogAddress|setChangelogAddress|removeChangelogAddress|addr\.addr)\s*\(\s*'
+        r'|\baddr\s*\[\s*)"([A-Z][A-Z0-9_]*)"'
+    ),
+    'address': re.compile(r'\b(0x[0-9a-fA-F]{40})\b'),
+}
+KINDS = list(PATTERNS)
+
+
+def scan(text):
+    """Collect the symbols of a Solidity source.
+
+    Args:
+        text (str): File content
+
+    Returns:
+        dict: {kind: {symbol: [line numbers]}}
+    """
+    found = {kind: {} for kind in KINDS}
+    for number, line in enumerate(text.splitlines(), start=1):
+        for kind, pattern in PATTERNS.items():
+            for symbol in pattern.findall(line):
+                if kind == 'address':
+                    symbol = symbol.lower()
+                lines = found[kind].setdefault(symbol, [])
+                if not lines or lines[-1] != number:
+                    lines.append(number)
+    return {kind: symbols for kind, symbols in found.items() if symbols}
+
+
+def update(store):
+    """Scan the new file contents of the archive and rewrite the per-kind query indexes.
+
+    Returns:
+        tuple: (number of archives, number of newly scanned contents)
+    """
+    files_index, _ = load_file_index(store)
+    try:
+        with open(SYMBOLS_PATH) as f:
+            cached = json.load(f)
+        blobs = cached['blobs'] if cached.get('version') == SCANNER_VERSION else {}
+    except (FileNotFoundError, ValueError, KeyError):
+        blobs = {}
+
+    # Where every distinct content lives
+    locations = {}
+    for name in sorted(files_index):
+        for relative, digest in sorted(files_index[name]['files'].items()):
+            if relative.endswith(INDEXED_SUFFIX):
+                locations.setdefault(digest, []).append((name, relative))
+
+    scanned = 0
+    for digest, places in locations.items():
+        if digest not in blobs:
+            name, relative = places[0]
+            blobs[digest] = scan(store.read(name, relative).decode('utf-8', errors='replace'))
+            scanned += 1
+    blobs = {digest: blobs[digest] for digest in locations}
+
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    with open(SYMBOLS_PATH + '.tmp', 'w') as f:
+        json.dump({'version': SCANNER_VERSION, 'blobs': blobs}, f, separators=(',', ':'))
+    os.replace(SYMBOLS_PATH + '.tmp', SYMBOLS_PATH)
+
+    # Query indexes: symbol -> [[content id, line, ...]], content id -> [[archive id, path id], ...]
+    archives = sorted(files_index)
+    paths = sorted({relative for places in locations.values() for _, relative in places})
+    archive_ids = {name: index for index, name in enumerate(archives)}
+    path_ids = {relative: index for index, relative in enumerate(paths)}
+    contents = sorted(locations)
+    content_places = [
+        [[archive_ids[name], path_ids[relative]] for name, relative in locations[digest]]
+        for digest in contents
+    ]
+    for kind in KINDS:
+        postings = {}
+        for content_id, digest in enumerate(contents):
+            for symbol, lines in blobs[digest].get(kind, {}).items():
+                postings.setdefault(symbol, []).append([content_id] + lines)
+        path = QUERY_PATH_PATTERN.format(kind=kind)
+        with open(path + '.tmp', 'w') as f:
+            json.dump({
+                'archives': archives,
+                'paths': paths,
+                'contents': content_places,
+                'symbols': postings,
+            }, f, separators=(',', ':'))
+        os.replace(path + '.tmp', path)
+    return len(archives), scanned
+
+
+def guess_kinds(symbol):
+    if re.fullmatch(r'0x[0-9a-fA-F]{40}', symbol):
+        return ['address']
+    if PATTERNS['ilk'].fullmatch(f'"{symbol}"'):
+        return ['ilk']
+    return ['key', 'call', 'ilk']
+
+
+def check_ilks():
+    """
+    Return the ilks of the collaterals in config.sol that the ilk pattern does not match.
+    """
+    return [ilk for ilk in load_config()['collaterals'] if not PATTERNS['ilk'].fullmatch(f'"{ilk}"')]
+
+
+def load_query_index(kind):
+    try:
+        with open(QUERY_PATH_PATTERN.format(kind=kind)) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        sys.exit("No symbol index yet, run `./scripts/archive-symbols.py update` first")
+
+
+def query(symbol, kinds, prefix=False):
+    """Find the archives, files and lines mentioning a symbol.
+
+    Returns:
+        list: (kind, symbol, archive, path, lines) sorted by archive
+    """
+    results = []
+    for kind in kinds:
+        index = load_query_index(kind)
+        needle = symbol.lower() if kind == 'address' else symbol
+        if prefix:
+            matches = [key for key in index['symbols'] if key.startswith(needle)]
+        else:
+            matches = [needle] if needle in index['symbols'] else []
+        for key in matches:
+            for content_id, *lines in index['symbols'][key]:
+                for archive_id, path_id in index['contents'][content_id]:
+                    results.append((kind, key, index['archives'][archive_id], index['paths'][path_id], lines))
+    return sorted(results, key=lambda result: (result[2], result[3], result[0], result[1]))
+
+
+def parse_arguments():
+    """Parse command line arguments.
+
+    Returns:
+        argparse.Namespace: The parsed arguments
+    """
+    parser = argparse.ArgumentParser(description="Search ilks, DssExecLib calls, ChainLog keys and addresses in archived spells")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("update", help="Scan new archive contents and rewrite the query indexes")
+    search = commands.add_parser("query", help="Find where a symbol appears")
+    search.add_argument("symbol", help="Ilk (ETH-A), DssExecLib function, ChainLog key or address")
+    search.add_argument("--kind", choices=KINDS, help="Symbol kind (default: guessed from the symbol)")
+    search.add_argument("--prefix", action="store_true", help="Match every symbol starting with the given text")
+    search.add_argument("--update", action="store_true", help="Update the index first")
+    listing = commands.add_parser("list", help="List the indexed symbols of a kind")
+    listing.add_argument("--kind", choices=KINDS, required=True)
+    commands.add_parser("check", help="Check that the ilk pattern matches every ilk in config.sol")
+    return parser.parse_args()
+
+
+def main():
+    """Main function to update or query the archive symbol index."""
+    args = parse_arguments()
+
+    if args.command == 'check':
+        missed = check_ilks()
+        if missed:
+            sys.exit(f"The ilk pattern misses {', '.join(missed)}")
+        print("The ilk pattern matches every ilk in config.sol")
+        return
+
+    if args.command == 'update' or getattr(args, 'update', False):
+        archives, scanned = update(ArchiveStore())
+        if args.command == 'update':
+            print(f"Indexed {archives} archives ({scanned} new file contents scanned)")
+            return
+
+    if args.command == 'list':
+        index = load_query_index(args.kind)
+        for symbol, postings in sorted(index['symbols'].items()):
+            archives = {index['archives'][archive_id]
+                        for content_id, *_ in postings
+                        for archive_id, _ in index['contents'][content_id]}
+            print(f"{symbol}\t{len(archives)} archives")
+        return
+
+    kinds = [args.kind] if args.kind else guess_kinds(args.symbol)
+    results = query(args.symbol, kinds, args.prefix)
+    if not results:
+        sys.exit(f"{args.symbol} not found in the archive")
+    for kind, symbol, archive, path, lines in results:
+        label = f" [{kind} {symbol}]" if args.prefix or len(kinds) > 1 else ""
+        print(f"{archive}/{path}:{','.join(map(str, lines))}{label}")
+
+
+# Execute the main function if this script is run directly
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,428 @@
+#!/usr/bin/env python3
+"""
+Authority Graph
+
+Builds the directed `wards` graph between every ChainLog contract once, stores it on disk
+together with the block it reflects, and keeps it current by replaying only the `Rely`/`Deny`
+events (and their `LogNote` equivalents) emitted since that block. Contracts whose rely/deny
+emit no event (SILENT_KEYS, e.g. the Vat) are re-probed at every update instead.
+
+Both a build and an update record the wards relations between the ChainLog addresses at
+their block, so a build at block N holds the same edges as a build at M updated to N;
+`check` verifies exactly that against the node.
+
+Queries are answered from in-memory adjacency indexes without any RPC call:
+    who <target>    addresses that are wards of the target (--transitive: that can reach it)
+    what <target>   contracts the target is a ward of (--transitive: that it can reach)
+    path <a> <b>    shortest chain of wards relations from a to b
+
+Usage:
+    ./authority-graph.py build [--block <number>]
+    ./authority-graph.py update [--block <number>]
+    ./authority-graph.py check --from <number> [--block <number>]
+    ./authority-graph.py who MCD_VAT [--transitive]
+    ./authority-graph.py what MCD_PAUSE_PROXY [--transitive]
+    ./authority-graph.py path MCD_PAUSE_PROXY MCD_VAT
+
+Where targets are addresses or ChainLog keys (e.g. MCD_VAT)
+"""
+
+import argparse
+import json
+import os
+import sys
+from collections import deque
+
+import keccak
+from jsonrpc import CHAIN_NAMES, JsonRpcClient, RpcError, selector, to_checksum_address
+from wards import is_address, is_ward, resolve_chainlog
+
+# Constants
+CACHE_DIR = os.path.join(os.environ.get('SPELLS_CACHE_DIR', '.cache'), 'authority')
+ZERO_ADDRESS = '0x' + '00' * 20
+RELY_EVENT = keccak.keccak256('Rely(address)')
+DENY_EVENT = keccak.keccak256('Deny(address)')
+# LibNote/DSNote logs are anonymous: topic0 is the calldata selector left-aligned, topic2 the first argument
+RELY_NOTE = '0x' + selector('rely(address)') + '00' * 28
+DENY_NOTE = '0x' + selector('deny(address)') + '00' * 28
+GRANTS = {RELY_EVENT: True, RELY_NOTE: True, DENY_EVENT: False, DENY_NOTE: False}
+# ChainLog contracts whose rely/deny emit no event: their wards are re-probed on every update
+SILENT_KEYS = ('MCD_VAT',)
+
+
+def topic_address(topic):
+    return to_checksum_address('0x' + topic[-40:])
+
+
+class AuthorityGraph:
+    """
+    Directed wards graph: an edge ward -> contract means `contract.wards(ward) == 1`.
+    """
+
+    def __init__(self, chain_id, block, names=None, contracts=None, wards=None):
+        self.chain_id = chain_id
+        self.block = block
+        self.names = names or {}
+        # Addresses known to implement wards(address), i.e. whose Rely/Deny logs are followed
+        self.contracts = set(contracts or ())
+        self.wards = {}
+        self.relied = {}
+        for contract, contract_wards in (wards or {}).items():
+            for ward in contract_wards:
+                self.rely(contract, ward)
+
+    @staticmethod
+    def path_for(chain_id):
+        return os.path.join(CACHE_DIR, f'graph-{chain_id}.json')
+
+    @classmethod
+    def load(cls, chain_id):
+        """
+        Load the stored graph for a chain, or None when it has not been built yet.
+        """
+        try:
+            with open(cls.path_for(chain_id)) as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return None
+        nodes = data['nodes']
+        return cls(
+            data['chainId'],
+            data['block'],
+            {nodes[int(index)]: name for index, name in data['names'].items()},
+            [nodes[index] for index in data['contracts']],
+            {nodes[row[0]]: [nodes[index] for index in row[1:]] for row in data['wards']},
+        )
+
+    def save(self):
+        """
+        Store the graph with addresses interned once and edges as index lists.
+        """
+        nodes = sorted(set(self.names) | self.contracts | set(self.wards) | set(self.relied))
+        index = {address: position for position, address in enumerate(nodes)}
+        data = {
+            'chainId': self.chain_id,
+            'block': self.block,
+            'nodes': nodes,
+            'names': {index[address]: name for address, name in self.names.items()},
+            'contracts': sorted(index[address] for address in self.contracts),
+            'wards': [
+                [index[contract]] + sorted(index[ward] for ward in contract_wards)
+                for contract, contract_wards in sorted(self.wards.items())
+                if contract_wards
+            ],
+        }
+        path = self.path_for(self.chain_id)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path + '.tmp', 'w') as f:
+            json.dump(data, f, separators=(',', ':'))
+        os.replace(path + '.tmp', path)
+        return path
+
+    def rely(self, contract, ward):
+        self.wards.setdefault(contract, set()).add(ward)
+        self.relied.setdefault(ward, set()).add(contract)
+
+    def deny(self, contract, ward):
+        self.wards.get(contract, set()).discard(ward)
+        self.relied.get(ward, set()).discard(contract)
+
+    def edges(self):
+        """
+        Every (ward, contract) edge of the graph.
+        """
+        return {(ward, contract) for contract, contract_wards in self.wards.items() for ward in contract_wards}
+
+    def silent_contracts(self):
+        return {address for address in self.contracts if self.names.get(address) in SILENT_KEYS}
+
+    def retain(self, addresses):
+        """
+        Drop the contracts and edges involving an address outside `addresses`.
+        """
+        self.contracts &= addresses
+        for ward, contract in self.edges():
+            if ward not in addresses or contract not in addresses:
+                self.deny(contract, ward)
+
+    def apply_logs(self, logs, candidates):
+        """
+        Apply Rely/Deny logs in (blockNumber, logIndex) order, ignoring wards outside
+        `candidates`; returns the number applied.
+        """
+        applied = 0
+        for log in logs:
+            topics = log['topics']
+            grant = GRANTS.get(topics[0]) if topics else None
+            if grant is None:
+                continue
+            contract = to_checksum_address(log['address'])
+            ward = topic_address(topics[1] if topics[0] in (RELY_EVENT, DENY_EVENT) else topics[2])
+            if ward not in candidates:
+                continue
+            if grant:
+                self.rely(contract, ward)
+            else:
+                self.deny(contract, ward)
+            applied += 1
+        return applied
+
+    def resolve(self, target):
+        """
+        Resolve an address or ChainLog key to an address known to the graph.
+        """
+        if is_address(target):
+            return to_checksum_address(target)
+        for address, name in self.names.items():
+            if name == target:
+                return address
+        sys.exit(f"Unknown ChainLog key: {target}")
+
+    def label(self, address):
+        name = self.names.get(address)
+        return f"{name} ({address})" if name else address
+
+    def reach(self, start, forward):
+        """
+        Breadth-first traversal returning {address: distance}. Forward follows
+        ward -> contract edges (what start can touch), backward the reverse (who can touch start).
+        """
+        edges = self.relied if forward else self.wards
+        distances = {start: 0}
+        queue = deque([start])
+        while queue:
+            node = queue.popleft()
+            for neighbour in edges.get(node, ()):
+                if neighbour not in distances:
+                    distances[neighbour] = distances[node] + 1
+                    queue.append(neighbour)
+        del distances[start]
+        return distances
+
+    def path(self, source, target):
+        """
+        Shortest chain of addresses from source to target along ward -> contract edges.
+        """
+        parents = {source: None}
+        queue = deque([source])
+        while queue:
+            node = queue.popleft()
+            if node == target:
+                chain = []
+                while node is not None:
+                    chain.append(node)
+                    node = parents[node]
+                return chain[::-1]
+            for neighbour in self.relied.get(node, ()):
+                if neighbour not in parents:
+                    parents[neighbour] = node
+                    queue.append(neighbour)
+        return None
+
+
+def find_contracts(rpc, addresses, block):
+    """Select the addresses that implement wards(address).
+
+    Args:
+        rpc (JsonRpcClient): The RPC client
+        addresses (list): Candidate addresses
+        block (int): The block to read at
+
+    Returns:
+        list: The addresses whose wards(address) call decodes
+    """
+    results = rpc.multicall(
+        [(address, 'wards(address)(uint256)', (ZERO_ADDRESS,)) for address in addresses], block)
+    return [address for address, result in zip(addresses, results) if not isinstance(result, RpcError)]
+
+
+def probe_wards(rpc, graph, contracts, candidates, block):
+    """Probe contract.wards(candidate) for every pair and record the answers as edges.
+
+    Args:
+        rpc (JsonRpcClient): The RPC client
+        graph (AuthorityGraph): The graph to update
+        contracts (list): Addresses implementing wards(address)
+        candidates (list): Possible wards
+        block (int): The block to read at
+
+    Returns:
+        int: The number of probes sent
+    """
+    pairs = [(contract, candidate) for contract in contracts for candidate in candidates]
+    if not pairs:
+        return 0
+    results = rpc.multicall(
+        [(contract, 'wards(address)(uint256)', (candidate,)) for contract, candidate in pairs], block)
+    for (contract, candidate), result in zip(pairs, results):
+        if is_ward(result):
+            graph.rely(contract, candidate)
+        else:
+            graph.deny(contract, candidate)
+    return len(pairs)
+
+
+def build(rpc, chain_id, block):
+    """Build the full graph between every ChainLog contract at a block."""
+    chainlog = resolve_chainlog(rpc, block)
+    addresses = [address for _, address in chainlog]
+    contracts = find_contracts(rpc, addresses, block)
+    graph = AuthorityGraph(chain_id, block, {address: name for name, address in chainlog}, contracts)
+    probes = probe_wards(rpc, graph, contracts, addresses, block)
+    print(f"Probed {probes} pairs over {len(contracts)} contracts")
+    return graph
+
+
+def update(rpc, graph, block):
+    """Bring a stored graph to a later block.
+
+    Edges between contracts that log their wards changes are replayed from Rely/Deny logs,
+    silent contracts are re-probed, and ChainLog entries added since the stored block are
+    probed against every candidate (and every contract against them). Entries removed from
+    the ChainLog are dropped, so the candidates are the same as for a build at `block`.
+    """
+    if block <= graph.block:
+        return graph
+    chainlog = resolve_chainlog(rpc, block)
+    candidates = {address for _, address in chainlog}
+    added = sorted(candidates - set(graph.names))
+    graph.retain(candidates)
+    graph.names = {address: name for name, address in chainlog}
+
+    logs = rpc.get_logs(
+        sorted(graph.contracts - graph.silent_contracts()),
+        [list(GRANTS)],
+        graph.block + 1,
+        block
+    )
+    applied = graph.apply_logs(logs, candidates)
+    print(f"Applied {applied} Rely/Deny logs from blocks {graph.block + 1} to {block}")
+
+    # Contracts added to the ChainLog since the last block have no log history in the graph yet
+    contracts = find_contracts(rpc, added, block) if added else []
+    graph.contracts.update(contracts)
+    reprobed = sorted(set(contracts) | graph.silent_contracts())
+    probes = probe_wards(rpc, graph, reprobed, sorted(candidates), block)
+    probes += probe_wards(rpc, graph, sorted(graph.contracts - set(reprobed)), added, block)
+    print(f"Probed {probes} pairs for {len(added)} new ChainLog entries and {len(reprobed) - len(contracts)} "
+          f"silent contracts")
+    graph.block = block
+    return graph
+
+
+def check(rpc, chain_id, start, block):
+    """Compare a build at `block` with a build at `start` updated to `block`.
+
+    Returns:
+        tuple: (missing, extra, built) with the edges only in the build, the edges only in
+            the updated graph, and the graph built at `block`
+    """
+    updated = update(rpc, build(rpc, chain_id, start), block)
+    built = build(rpc, chain_id, block)
+    return built.edges() - updated.edges(), updated.edges() - built.edges(), built
+
+
+def parse_arguments():
+    """Parse command line arguments.
+
+    Returns:
+        argparse.Namespace: The parsed arguments
+    """
+    parser = argparse.ArgumentParser(description="Build and query the ChainLog wards graph")
+    parser.add_argument(
+        "--chain-id",
+        type=int,
+        default=1,
+        help="Chain of the stored graph to query (default: 1)"
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+    for command, help_text in (("build", "Probe the full graph from scratch"),
+                               ("update", "Replay Rely/Deny logs since the stored block"),
+                               ("check", "Compare a build with an earlier build plus updates")):
+        sync = commands.add_parser(command, help=help_text)
+        sync.add_argument("--block", type=int, help="Block number to sync to (default: latest)")
+    commands.choices["check"].add_argument(
+        "--from",
+        dest="start",
+        type=int,
+        required=True,
+        help="Block number of the earlier build"
+    )
+    for command, help_text in (("who", "Addresses that are wards of the target"),
+                               ("what", "Contracts the target is a ward of")):
+        query = commands.add_parser(command, help=help_text)
+        query.add_argument("target", help="Address or ChainLog key")
+        query.add_argument("--transitive", action="store_true", help="Follow wards of wards")
+    path = commands.add_parser("path", help="Shortest wards chain between two targets")
+    path.add_argument("source", help="Address or ChainLog key")
+    path.add_argument("target", help="Address or ChainLog key")
+    return parser.parse_args()
+
+
+def sync(args):
+    """Build, update or check the stored graph against ETH_RPC_URL."""
+    if not os.environ.get('ETH_RPC_URL'):
+        sys.exit("Please set a ETH_RPC_URL")
+
+    with JsonRpcClient() as rpc:
+        chain_id = rpc.chain_id()
+        block = args.block if args.block is not None else rpc.block_number()
+        print(f"Network: {CHAIN_NAMES.get(chain_id, chain_id)}")
+
+        if args.command == 'check':
+            missing, extra, graph = check(rpc, chain_id, args.start, block)
+            for kind, edges in (('missing', missing), ('extra', extra)):
+                for ward, contract in sorted(edges):
+                    print(f"{kind}: {graph.label(ward)} -> {graph.label(contract)}")
+            if missing or extra:
+                sys.exit(f"Updating from block {args.start} differs from a build at block {block}")
+            print(f"Updating from block {args.start} matches a build at block {block}")
+            return
+
+        graph = AuthorityGraph.load(chain_id) if args.command == 'update' else None
+        if graph is None:
+            graph = build(rpc, chain_id, block)
+        else:
+            graph = update(rpc, graph, block)
+
+    path = graph.save()
+    edges = sum(len(contract_wards) for contract_wards in graph.wards.values())
+    print(f"Stored {edges} edges at block {graph.block} in {path}")
+
+
+def query(args):
+    """Answer a query from the stored graph without touching the network."""
+    graph = AuthorityGraph.load(args.chain_id)
+    if graph is None:
+        sys.exit(f"No graph stored for chain {args.chain_id}, run `build` first")
+    print(f"Block: {graph.block}")
+
+    if args.command == 'path':
+        chain = graph.path(graph.resolve(args.source), graph.resolve(args.target))
+        if chain is None:
+            sys.exit(f"No wards path from {args.source} to {args.target}")
+        print(" -> ".join(graph.label(address) for address in chain))
+        return
+
+    target = graph.resolve(args.target)
+    forward = args.command == 'what'
+    if args.transitive:
+        found = graph.reach(target, forward)
+    else:
+        found = dict.fromkeys((graph.relied if forward else graph.wards).get(target, ()), 1)
+    for address, distance in sorted(found.items(), key=lambda item: (item[1], graph.label(item[0]))):
+        print(f"{distance} {graph.label(address)}" if args.transitive else graph.label(address))
+
+
+def main():
+    """Main function to build, update or query the authority graph."""
+    args = parse_arguments()
+    if args.command in ('build', 'update', 'check'):
+        sync(args)
+    else:
+        query(args)
+
+
+# Execute the main function if this script is run directly
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,332 @@
+#!/usr/bin/env python3
+"""
+Script Benchmarks
+
+Times the network-bound scripts end to end against local record/replay stand-ins
+(see replay.py) for Etherscan, GitHub and the JSON-RPC node, so runs are repeatable and
+need neither network access nor API keys.
+
+`record` runs every scenario once through recording proxies to the real services
+(ETH_RPC_URL and ETHERSCAN_API_KEY must be set) and stores one cassette per scenario and
+service under .cache/bench/cassettes. Recording never publishes anything: the proxies refuse
+submissions, and the verify scenario's submissions are answered by a local stub
+(VerificationStub) instead of Etherscan. `run` replays them: each scenario is run --runs times
+with a fresh cache directory, reporting the median wall time, the requests and time spent
+per service, and the per-phase timings scripts report themselves (verify.py). With --save
+the medians become the baseline in .cache/bench/baseline.json; later runs print their
+change against it and exit with an error when a scenario got slower than --threshold.
+
+Usage:
+    ./benchmark.py record [<scenario> ...]
+    ./benchmark.py run [<scenario> ...] [--runs <n>] [--latency <ms>] [--save] [--threshold <pct>]
+    ./benchmark.py list
+"""
+
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+from replay import form_fields, start_server
+from spellconfig import get_field, load_config
+
+# Constants
+BENCH_DIR = os.path.join(os.environ.get('SPELLS_CACHE_DIR', '.cache'), 'bench')
+CASSETTE_DIR = os.path.join(BENCH_DIR, 'cassettes')
+BASELINE_PATH = os.path.join(BENCH_DIR, 'baseline.json')
+DEFAULT_RUNS = 3
+DEFAULT_THRESHOLD = 10.0
+REPLAY_API_KEY = 'replay'
+# Service -> (environment variable pointing the scripts at it, real endpoint)
+SERVICES = {
+    'rpc': ('ETH_RPC_URL', lambda: os.environ.get('ETH_RPC_URL')),
+    'etherscan': ('ETHERSCAN_API_URL', lambda: 'https://api.etherscan.io/v2/api'),
+    'github-api': ('GITHUB_API_BASE', lambda: 'https://api.github.com/repos'),
+    'github-raw': ('GITHUB_RAW_BASE', lambda: 'https://raw.githubusercontent.com'),
+}
+EXEC_DATE = '2025-06-26'
+STUB_GUID_PREFIX = 'bench-stub-'
+PIP_ETH = '0x81FE72B5A8d1A857d176C3E7d5Bd2679A9B85763'
+
+
+class VerificationStub:
+    """
+    Answers Etherscan verification submissions while recording: a submission gets a fake
+    GUID, whose first status check is pending and the next ones verified. Everything else
+    goes to Etherscan.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.submissions = 0
+        self.checks = {}
+
+    @staticmethod
+    def answer(status, message, result):
+        body = json.dumps({'status': status, 'message': message, 'result': result})
+        return {'status': 200, 'content_type': 'application/json', 'body': body}
+
+    def __call__(self, method, path, body):
+        fields = form_fields(path, body)
+        with self.lock:
+            if fields.get('action') == 'verifysourcecode':
+                self.submissions += 1
+                return self.answer('1', 'OK', f'{STUB_GUID_PREFIX}{self.submissions}')
+            guid = fields.get('guid', '')
+            if fields.get('action') == 'checkverifystatus' and guid.startswith(STUB_GUID_PREFIX):
+                self.checks[guid] = self.checks.get(guid, 0) + 1
+                if self.checks[guid] == 1:
+                    return self.answer('0', 'NOTOK', 'Pending in queue')
+                return self.answer('1', 'OK', 'Pass - Verified')
+        return None
+
+
+SCENARIOS = {
+    'wards': {
+        'command': ['./scripts/wards.py', 'MCD_VAT'],
+        'services': ['rpc'],
+    },
+    'feed': {
+        'command': ['./scripts/check-oracle-feed.sh', PIP_ETH],
+        'services': ['rpc'],
+    },
+    'exec-hash': {
+        'command': ['./scripts/hash-exec-copy.py', EXEC_DATE],
+        'services': ['github-api', 'github-raw'],
+    },
+    'check-deployed-spell': {
+        'command': ['./scripts/check-deployed-dssspell.py', '--json'],
+        'services': ['rpc', 'etherscan'],
+    },
+    'verify': {
+        'command': ['./scripts/verify.py', '--concurrent', 'DssSpell', '{deployed_spell}'],
+        'services': ['rpc', 'etherscan'],
+        'timings': 'VERIFY_TIMINGS_LOG',
+        # Service -> stub factory used while recording
+        'stubs': {'etherscan': VerificationStub},
+    },
+}
+
+
+def expand(command):
+    """
+    Fill in the placeholders of a scenario command from config.sol.
+    """
+    if any('{deployed_spell}' in part for part in command):
+        spell = get_field(load_config(), 'spell.deployed_spell')
+        command = [part.replace('{deployed_spell}', str(spell)) for part in command]
+    return command
+
+
+def cassette_path(name, service):
+    return os.path.join(CASSETTE_DIR, name, f'{service}.json')
+
+
+def read_phases(path):
+    """
+    Sum the durations a script logged per phase (JSON lines with `phase` and `duration`).
+    """
+    phases = {}
+    try:
+        with open(path) as f:
+            for line in f:
+                entry = json.loads(line)
+                phases[entry['phase']] = phases.get(entry['phase'], 0) + entry['duration']
+    except FileNotFoundError:
+        pass
+    return phases
+
+
+def run_scenario(name, scenario, servers, env):
+    """Run a scenario once with a fresh cache directory.
+
+    Returns:
+        dict: 'seconds', 'returncode', 'services' {service: stats} and 'phases' {phase: seconds}
+    """
+    with tempfile.TemporaryDirectory(prefix=f'bench-{name}-') as scratch:
+        run_env = dict(env, SPELLS_CACHE_DIR=os.path.join(scratch, 'cache'))
+        for service, server in servers.items():
+            server.reset_stats()
+            run_env[SERVICES[service][0]] = server.url
+        timings_path = os.path.join(scratch, 'timings.jsonl')
+        if scenario.get('timings'):
+            run_env[scenario['timings']] = timings_path
+
+        started = time.monotonic()
+        result = subprocess.run(expand(scenario['command']), env=run_env, capture_output=True, text=True)
+        seconds = time.monotonic() - started
+        if result.returncode != 0:
+            print(f"{name}: exited with {result.returncode}\n{result.stderr.strip()}", file=sys.stderr)
+        return {
+            'seconds': seconds,
+            'returncode': result.returncode,
+            'services': {service: dict(server.stats) for service, server in servers.items()},
+            'phases': read_phases(timings_path),
+        }
+
+
+def start_servers(name, scenario, record=False, latency=0.0):
+    servers = {}
+    for service in scenario['services']:
+        upstream = SERVICES[service][1]() if record else None
+        if record and not upstream:
+            raise RuntimeError(f"No upstream for {service}, please set {SERVICES[service][0]}")
+        if not record and not os.path.exists(cassette_path(name, service)):
+            raise RuntimeError(f"No {service} cassette for {name}, run `./scripts/benchmark.py record {name}` first")
+        stubs = scenario.get('stubs', {})
+        stub = stubs[service]() if record and service in stubs else None
+        servers[service] = start_server(cassette_path(name, service), upstream, latency, stub=stub)
+    return servers
+
+
+def record(names):
+    if not os.environ.get('ETHERSCAN_API_KEY'):
+        sys.exit("Please set ETHERSCAN_API_KEY")
+    for name in names:
+        # Start from an empty cassette so stale answers are not kept
+        shutil.rmtree(os.path.join(CASSETTE_DIR, name), ignore_errors=True)
+        servers = start_servers(name, SCENARIOS[name], record=True)
+        try:
+            result = run_scenario(name, SCENARIOS[name], servers, dict(os.environ))
+        finally:
+            for server in servers.values():
+                server.shutdown()
+                server.cassette.save()
+        requests = sum(stats['requests'] for stats in result['services'].values())
+        refused = sum(stats['misses'] for stats in result['services'].values())
+        print(f"{name}: recorded {requests} requests in {result['seconds']:.2f}s"
+              f"{f', refused {refused} submissions' if refused else ''}")
+
+
+def load_baseline():
+    try:
+        with open(BASELINE_PATH) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def run(names, runs, latency, save, threshold):
+    """
+    Replay every scenario `runs` times and compare the medians with the baseline.
+    Scenarios with a failed run or with requests missing from the cassettes are not
+    timed against nor saved to the baseline.
+    Returns the names of the scenarios that regressed beyond the threshold and of
+    those that failed.
+    """
+    baseline = load_baseline()
+    env = dict(os.environ, ETHERSCAN_API_KEY=os.environ.get('ETHERSCAN_API_KEY', REPLAY_API_KEY))
+    medians, regressed, failed = {}, [], []
+    for name in names:
+        try:
+            servers = start_servers(name, SCENARIOS[name], latency=latency)
+        except RuntimeError as e:
+            print(f"{name}: skipped, {e}", file=sys.stderr)
+            continue
+        try:
+            results = [run_scenario(name, SCENARIOS[name], servers, env) for _ in range(runs)]
+        finally:
+            for server in servers.values():
+                server.shutdown()
+
+        median = statistics.median(result['seconds'] for result in results)
+        line = f"{name:<22} {median:8.3f}s"
+        if any(result['returncode'] != 0 for result in results):
+            line += "  FAILED"
+            failed.append(name)
+        elif any(stats['misses'] for result in results for stats in result['services'].values()):
+            line += "  NOT RECORDED"
+            failed.append(name)
+        else:
+            medians[name] = round(median, 3)
+            if name in baseline:
+                change = (median - baseline[name]) / baseline[name] * 100 if baseline[name] else 0.0
+                line += f"  {change:+6.1f}% vs {baseline[name]:.3f}s"
+                if change > threshold:
+                    line += "  REGRESSION"
+                    regressed.append(name)
+        print(line)
+
+        last = results[-1]
+        for service, stats in last['services'].items():
+            missed = f", {stats['misses']} not recorded" if stats['misses'] else ""
+            print(f"    {service:<18} {stats['requests']:5d} requests {stats['seconds']:8.3f}s{missed}")
+        for phase, seconds in last['phases'].items():
+            print(f"    phase {phase:<12} {seconds:8.3f}s")
+
+    if save:
+        os.makedirs(BENCH_DIR, exist_ok=True)
+        with open(BASELINE_PATH + '.tmp', 'w') as f:
+            json.dump({**baseline, **medians}, f, indent=2, sort_keys=True)
+        os.replace(BASELINE_PATH + '.tmp', BASELINE_PATH)
+        print(f"Baseline saved to {BASELINE_PATH}")
+    return regressed, failed
+
+
+def parse_arguments():
+    """Parse command line arguments.
+
+    Returns:
+        argparse.Namespace: The parsed arguments
+    """
+    parser = argparse.ArgumentParser(description="Benchmark the scripts against recorded service answers")
+    commands = parser.add_subparsers(dest="command", required=True)
+    recording = commands.add_parser("record", help="Record the cassettes from the real services")
+    recording.add_argument("scenarios", nargs="*", help="Scenarios to record (default: all)")
+    running = commands.add_parser("run", help="Time the scenarios against the recorded cassettes")
+    running.add_argument("scenarios", nargs="*", help="Scenarios to run (default: all)")
+    running.add_argument("--runs", type=int, default=DEFAULT_RUNS, help=f"Runs per scenario (default: {DEFAULT_RUNS})")
+    running.add_argument("--latency", type=float, default=0, help="Milliseconds added to every replayed answer")
+    running.add_argument("--save", action="store_true", help="Store the medians as the new baseline")
+    running.add_argument(
+        "--threshold",
+        type=float,
+        default=DEFAULT_THRESHOLD,
+        help=f"Slowdown in percent reported as a regression (default: {DEFAULT_THRESHOLD})"
+    )
+    commands.add_parser("list", help="List the scenarios")
+    args = parser.parse_args()
+    unknown = [name for name in getattr(args, 'scenarios', []) if name not in SCENARIOS]
+    if unknown:
+        parser.error(f"Unknown scenarios {', '.join(unknown)}, expected some of {', '.join(SCENARIOS)}")
+    if args.command != 'list' and not args.scenarios:
+        args.scenarios = list(SCENARIOS)
+    return args
+
+
+def main():
+    """Main function to record or run the benchmarks."""
+    args = parse_arguments()
+
+    if args.command == 'list':
+        for name, scenario in SCENARIOS.items():
+            recorded = all(os.path.exists(cassette_path(name, service)) for service in scenario['services'])
+            print(f"{name:<22} {', '.join(scenario['services']):<16} {'recorded' if recorded else 'not recorded'}")
+        return
+
+    if args.command == 'record':
+        try:
+            record(args.scenarios)
+        except RuntimeError as e:
+            sys.exit(str(e))
+        return
+
+    regressed, failed = run(args.scenarios, args.runs, args.latency / 1000, args.save, args.threshold)
+    errors = []
+    if failed:
+        errors.append(f"Failed or not fully recorded: {', '.join(failed)}")
+    if regressed:
+        errors.append(f"Slower than the baseline: {', '.join(regressed)}")
+    if errors:
+        sys.exit('\n'.join(errors))
+
+
+# Execute the main function if this script is run directly
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+Deployed Spell Checker
+
+Checks the deployed DssSpell recorded in src/test/config.sol against Etherscan and the chain:
+verification, license, solc version, optimizer, linked DssExecLib, deployment block and
+timestamp.
+
+The Etherscan source info (cached once verified), the Etherscan internal transactions and
+the RPC data are fetched concurrently over pooled sessions, and each endpoint is called at
+most once: the block recorded in config.sol is fetched alongside the chain id while
+Etherscan is queried, so only the deployment transaction has to wait for the internal
+transaction list.
+
+Usage:
+    ./check-deployed-dssspell.py [--json] OR
+    make check-deployed-spell
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from etherscan import EtherscanClient, EtherscanError
+from jsonrpc import JsonRpcClient, RpcError, to_checksum_address
+from spellconfig import get_field, load_config
+
+# Constants
+CHAIN_ID = 1
+CONFIG_PATH = 'src/test/config.sol'
+FOUNDRY_CONFIG_PATH = 'foundry.toml'
+LICENSE = 'GNU AGPLv3'
+SOLC = 'v0.8.16+commit.07a7930e'
+LIBRARY_PATTERN = re.compile(r'DssExecLib:(0x[0-9a-fA-F]{40})')
+ZERO_ADDRESS = '0x' + '0' * 40
+
+# Define Colors
+GREEN = '\033[1;32m'
+RED = '\033[1;31m'
+NC = '\033[0m'  # No Color
+
+
+def read_library_address(path=FOUNDRY_CONFIG_PATH):
+    with open(path) as f:
+        match = LIBRARY_PATTERN.search(f.read())
+    return match.group(1) if match else None
+
+
+def read_deployed_spell(path=CONFIG_PATH):
+    """Read the deployed spell address, block number and timestamp from config.sol.
+
+    Returns:
+        tuple: (address, block, timestamp), or None when any of them is not set
+    """
+    config = load_config(path)
+    address = get_field(config, 'spell.deployed_spell')
+    block = get_field(config, 'spell.deployed_spell_block')
+    timestamp = get_field(config, 'spell.deployed_spell_created')
+    if not isinstance(address, str) or address.lower() == ZERO_ADDRESS or block == 0 or timestamp == 0:
+        return None
+    return address, block, timestamp
+
+
+def fetch(rpc, etherscan, address, block):
+    """Fetch everything the checks need, each endpoint once and concurrently.
+
+    Returns:
+        dict: 'chain_id', 'source' (Etherscan source info), 'tx' (deployment transaction)
+            and 'block' (block of the deployment transaction)
+    """
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        source = executor.submit(etherscan.get_source, address)
+        internal = executor.submit(etherscan.get_internal_transactions, address)
+        # The block recorded in config.sol is expected to be the deployment block
+        chain_and_block = executor.submit(
+            rpc.batch, [('eth_chainId', []), ('eth_getBlockByNumber', [hex(block), False])]
+        )
+
+        chain_id, expected_block = chain_and_block.result()
+        if int(chain_id, 16) != CHAIN_ID:
+            return {'chain_id': int(chain_id, 16)}
+        transactions = internal.result()
+        tx = rpc.request('eth_getTransactionByHash', [transactions[0]['hash']]) if transactions else None
+        deployed_block = expected_block
+        if tx and (not expected_block or expected_block['number'] != tx['blockNumber']):
+            deployed_block = rpc.request('eth_getBlockByNumber', [tx['blockNumber'], False])
+        return {
+            'chain_id': CHAIN_ID,
+            'source': source.result(),
+            'tx': tx,
+            'block': deployed_block if tx else None,
+        }
+
+
+def run_checks(data, library_address, expected_block, expected_timestamp):
+    """Evaluate the checks of the deployed spell.
+
+    Returns:
+        list: (name, passed, message) in the order of check-deployed-dssspell.sh
+    """
+    source = data['source']
+    library = source.get('Library', '').split(':')
+    library = to_checksum_address(library[1]) if len(library) > 1 and library[1] else None
+    block = int(data['block']['number'], 16) if data['block'] else None
+    timestamp = int(data['block']['timestamp'], 16) if data['block'] else None
+
+    def check(name, passed, success, error):
+        return name, bool(passed), success if passed else error
+
+    return [
+        check('verified', source.get('SourceCode'),
+              "DssSpell is verified.", "DssSpell not verified."),
+        check('license', source.get('LicenseType') == LICENSE,
+              "DssSpell was verified with a valid license.",
+              "DssSpell was verified with an invalid or unknown license."),
+        check('solc', source.get('CompilerVersion') == SOLC,
+              "DssSpell solc version matches.", "DssSpell solc version does not match."),
+        check('optimizations', source.get('OptimizationUsed') != '1',
+              "DssSpell was not compiled with optimizations.", "DssSpell was compiled with optimizations."),
+        check('library', library is not None and library == library_address,
+              "DssSpell library matches hardcoded address in foundry.toml.",
+              "DssSpell library does not match hardcoded address."),
+        check('timestamp', timestamp == expected_timestamp,
+              "DssSpell deployment timestamp matches.", "DssSpell deployment timestamp does not match."),
+        check('block', block == expected_block,
+              "DssSpell deployment block number matches.", "DssSpell deployment block number does not match."),
+    ]
+
+
+def parse_arguments():
+    """Parse command line arguments.
+
+    Returns:
+        argparse.Namespace: The parsed arguments
+    """
+    parser = argparse.ArgumentParser(description="Check the deployed DssSpell recorded in config.sol")
+    parser.add_argument(
+        "--json",
+        action="store_true",
+        help="Print the checks as JSON"
+    )
+    return parser.parse_args()
+
+
+def main():
+    """Main function to check the deployed spell."""
+    args = parse_arguments()
+
+    if not os.environ.get('ETH_RPC_URL'):
+        sys.exit("Please set a Mainnet ETH_RPC_URL")
+    if not os.environ.get('ETHERSCAN_API_KEY'):
+        sys.exit("Please set ETHERSCAN_API_KEY")
+
+    deployed = read_deployed_spell()
+    if deployed is None:
+        sys.exit("DssSpell address, block number, or timestamp is not set in config file.")
+    address, expected_block, expected_timestamp = deployed
+
+    with JsonRpcClient() as rpc, EtherscanClient(chain_id=CHAIN_ID) as etherscan:
+        try:
+            data = fetch(rpc, etherscan, address, expected_block)
+        except (requests.RequestException, EtherscanError, RpcError) as e:
+            sys.exit(str(e))
+    if data['chain_id'] != CHAIN_ID:
+        sys.exit("Please set a Mainnet ETH_RPC_URL")
+
+    checks = run_checks(data, read_library_address(), expected_block, expected_timestamp)
+
+    if args.json:
+        print(json.dumps({
+            'spell': address,
+            'checks': [{'check': name, 'passed': passed, 'message': message} for name, passed, message in checks],
+        }, indent=2))
+        return
+
+    for _, passed, message in checks:
+        if passed:
+            print(f"[{GREEN}✔{NC}] {GREEN}{message}{NC}")
+        else:
+            print(f"[{RED}✖{NC}] {RED}{message}{NC}")
+
+
+# Execute the main function if this script is run directly
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""
+Keccak Regression Check
+
+Checks every installed keccak backend (see keccak.py) and the streaming hash of
+hash-exec-copy.py against the corpus in scripts/keccak-corpus:
+
+- the published Keccak-256 vectors in digests.json;
+- the Keccak-f[1600] permutation of the pure-Python backend against hashlib's SHA3-256,
+  which uses the same permutation with a different padding byte, at every length around
+  the block boundaries;
+- the documents in the corpus, hashed as the old `cast keccak -- "$content"` path did (the
+  UTF-8 text without one trailing newline) and as the archived spells did (`"$(wget ...)"`,
+  without every trailing newline), whole and streamed in chunks of several sizes. When
+  `cast` is installed its digest is compared as well.
+
+The documents come in two sections of digests.json. `synthetic` lists the fixtures in
+keccak-corpus/synthetic, written to cover the edge cases (CRLF line endings, non-ASCII
+text, no or several trailing newlines); their digests were produced by the backends
+themselves, so they only catch regressions. `executive_copies` lists past executive copies
+in keccak-corpus/executive-copies, each checked against the hash recorded in its archived
+spell when it was added with `add`.
+
+Usage:
+    ./check-keccak.py OR
+    make check-keccak
+    ./check-keccak.py add <archive name, e.g. 2025-06-26-DssSpell>
+"""
+
+import argparse
+import hashlib
+import importlib.util
+import json
+import os
+import shutil
+import subprocess
+import sys
+
+import requests
+
+import keccak
+
+# Constants
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+CORPUS_DIR = os.path.join(SCRIPTS_DIR, 'keccak-corpus')
+DIGESTS_PATH = os.path.join(CORPUS_DIR, 'digests.json')
+SECTIONS = {'synthetic': 'synthetic', 'executive_copies': 'executive-copies'}
+CHUNK_SIZES = (1, 7, keccak.RATE - 1, keccak.RATE, keccak.RATE + 1, 16 * 1024)
+PERMUTATION_LENGTHS = range(0, 4 * keccak.RATE + 2)
+
+
+def load_hash_exec_copy():
+    """
+    Import hash-exec-copy.py, whose name is not a valid module name.
+    """
+    spec = importlib.util.spec_from_file_location('hash_exec_copy', os.path.join(SCRIPTS_DIR, 'hash-exec-copy.py'))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def load_digests():
+    with open(DIGESTS_PATH) as f:
+        return json.load(f)
+
+
+def load_documents(digests):
+    """
+    Returns (name, content, expected digests) for every document of every section.
+    """
+    documents = []
+    for section, directory in SECTIONS.items():
+        for name in sorted(digests[section]):
+            with open(os.path.join(CORPUS_DIR, directory, name), 'rb') as f:
+                documents.append((f"{directory}/{name}", f.read(), digests[section][name]))
+    return documents
+
+
+def chunked(data, size):
+    return (data[start:start + size] for start in range(0, len(data), size))
+
+
+class Sha3Permutation(keccak.PureKeccak256):
+    """
+    The pure-Python sponge with the NIST SHA3 padding, to compare with hashlib.sha3_256.
+    """
+    padding = 0x06
+
+
+def check_vectors(vectors):
+    """
+    Yields one (name, expected, actual) per backend and published vector.
+    """
+    for vector in vectors:
+        data = bytes.fromhex(vector['hex']) if 'hex' in vector else vector['text'].encode('utf-8')
+        for backend in keccak.BACKENDS:
+            yield f"{backend} {vector['name']}", vector['hash'], keccak.keccak256(data, backend)
+
+
+def check_permutation(documents):
+    """
+    Yields one (name, expected, actual) per input, expected being hashlib's SHA3-256.
+    """
+    inputs = [(f'{length} bytes', bytes(range(256)) * (length // 256) + bytes(range(length % 256)))
+              for length in PERMUTATION_LENGTHS]
+    inputs += [(name, data) for name, data, _ in documents]
+    for name, data in inputs:
+        yield f"sha3 permutation {name}", hashlib.sha3_256(data).hexdigest(), Sha3Permutation(data).hexdigest()
+
+
+def check_documents(documents, hash_exec_copy):
+    """
+    Yields one (name, expected, actual) per backend, document and way of hashing it.
+    """
+    cast = shutil.which('cast')
+    for name, data, expected in documents:
+        text = data.decode('utf-8')
+        # The old path: requests' decoded text without one trailing newline, hashed by cast
+        content = text[:-1] if text.endswith('\n') else text
+        if cast:
+            result = subprocess.run([cast, 'keccak', '--', content], capture_output=True, text=True)
+            yield f"cast {name}", expected['hash'], result.stdout.strip()
+        for backend in keccak.BACKENDS:
+            yield f"{backend} {name}", expected['hash'], keccak.keccak256(content, backend)
+            yield f"{backend} {name} archive", expected['archive_hash'], \
+                keccak.keccak256(text.rstrip('\n'), backend)
+            for size in CHUNK_SIZES:
+                yield f"{backend} {name} streamed in {size}", expected['hash'], \
+                    hash_exec_copy.get_stream_hash(chunked(data, size), 1, backend)
+                yield f"{backend} {name} archive streamed in {size}", expected['archive_hash'], \
+                    hash_exec_copy.get_stream_hash(chunked(data, size), None, backend)
+
+
+def check():
+    """Run every check against the corpus.
+
+    Returns:
+        list: (name, expected, actual) of the failed checks
+    """
+    digests = load_digests()
+    documents = load_documents(digests)
+
+    results = list(check_vectors(digests['vectors']))
+    results += check_permutation(documents)
+    results += check_documents(documents, load_hash_exec_copy())
+    print(f"Backends: {', '.join(keccak.BACKENDS)}{', cast' if shutil.which('cast') else ''}")
+    print(f"{len(results)} digests compared, {len(digests['synthetic'])} synthetic documents, "
+          f"{len(digests['executive_copies'])} executive copies")
+    return [(name, expected, actual) for name, expected, actual in results if expected != actual]
+
+
+def add(archive):
+    """
+    Add the executive copy referenced by an archived spell to the corpus.
+    """
+    hash_exec_copy = load_hash_exec_copy()
+    entry = next((entry for entry in hash_exec_copy.read_archived_hashes() if entry['archive'] == archive), None)
+    if entry is None:
+        sys.exit(f"{archive} records no executive copy URL and hash")
+
+    response = requests.get(entry['url'])
+    response.raise_for_status()
+    data = response.content
+    # Archived spells hashed "$(wget ...)", which strips every trailing newline
+    archive_hash = keccak.keccak256(data.rstrip(b'\n'))
+    if archive_hash != entry['expected']:
+        sys.exit(f"{entry['url']} hashes to {archive_hash}, {archive} records {entry['expected']}")
+
+    name = f"{archive}.md"
+    directory = os.path.join(CORPUS_DIR, SECTIONS['executive_copies'])
+    os.makedirs(directory, exist_ok=True)
+    with open(os.path.join(directory, name), 'wb') as f:
+        f.write(data)
+    text = data.decode('utf-8')
+    digests = load_digests()
+    digests['executive_copies'][name] = {
+        'source': entry['url'],
+        'hash': keccak.keccak256(text[:-1] if text.endswith('\n') else text),
+        'archive_hash': archive_hash,
+    }
+    with open(DIGESTS_PATH + '.tmp', 'w') as f:
+        json.dump(digests, f, indent=2)
+        f.write('\n')
+    os.replace(DIGESTS_PATH + '.tmp', DIGESTS_PATH)
+    print(f"Added {name}")
+
+
+def parse_arguments():
+    """Parse command line arguments.
+
+    Returns:
+        argparse.Namespace: The parsed arguments
+    """
+    parser = argparse.ArgumentParser(description="Check the keccak backends against the corpus")
+    commands = parser.add_subparsers(dest="command")
+    adding = commands.add_parser("add", help="Add the executive copy of an archived spell to the corpus")
+    adding.add_argument("archive", help="Archive name, e.g. 2025-06-26-DssSpell")
+    return parser.parse_args()
+
+
+def main():
+    """Main function to check the keccak backends or extend the corpus."""
+    args = parse_arguments()
+
+    if args.command == 'add':
+        try:
+            add(args.archive)
+        except requests.exceptions.RequestException as e:
+            sys.exit(str(e))
+        return
+
+    failures = check()
+    for name, expected, actual in failures:
+        print(f"FAIL {name}: expected {expected}, got {actual}")
+    if failures:
+        sys.exit(f"{len(failures)} digests do not match")
+    print("All digests match")
+
+
+# Execute the main function if this script is run directly
+if __name__ == "__main__":
+    main()
@@ -3,6 +3,12 @@ set -e
 
 if [[ -z "$1" ]]; then
   echo "You must provide a date (YYYY-MM-DD) option to diff the directory"
+elif [[ -f "./archive/.store/manifests/$1-DssSpell.json" ]]; then
+  archived=$(mktemp -d)
+  trap 'rm -rf "$archived"' EXIT
+  ./scripts/packstore.py checkout "$1-DssSpell" "$archived" > /dev/null
+  diff -r "./src" "$archived"
+  echo "Spell, tests and base match the archive store entry $1-DssSpell"
 else
   diff -r "./src" "./archive/$1-DssSpell"
   echo "Spell, tests and base match the archive directory $1-DssSpell"
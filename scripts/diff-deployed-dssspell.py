@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+"""
+Deployed Spell Differ
+
+Diffs the verified Etherscan source of a deployed spell (the one in src/test/config.sol by
+default) against the flattened local src/DssSpell.sol. A spell verified from standard JSON
+input (verify.py --standard-json) is compared file by file instead: every source of the
+input against the local file at the same path, without flattening.
+
+The verified source of an address never changes, so the shared Etherscan client downloads
+it once and keeps it in .cache/etherscan/sources. The flattened spell is cached by the hash
+of its inputs (the non-test sources under src/, lib/ and the foundry config), so
+`forge flatten` only runs again when they change; build artifacts are left in place.
+
+Usage:
+    ./diff-deployed-dssspell.py [<address>] OR
+    make diff-deployed-spell [spell=<address>]
+"""
+
+import argparse
+import difflib
+import hashlib
+import os
+import re
+import shutil
+import subprocess
+import sys
+
+import requests
+
+from etherscan import EtherscanClient, EtherscanError, parse_sources
+from packstore import hash_file, tree_signature, walk_files
+from spellconfig import get_field, load_config
+
+# Constants
+CHAIN_ID = 1
+CONFIG_PATH = 'src/test/config.sol'
+SOURCE_DIR = 'src'
+SOURCE_FILE_PATH = 'src/DssSpell.sol'
+LIBRARY_DIR = 'lib'
+FORGE_CONFIG_FILES = ['foundry.toml', 'remappings.txt']
+FLATTEN_OUTPUT_PATH = 'out/flat.sol'
+CACHE_DIR = os.environ.get('SPELLS_CACHE_DIR', '.cache')
+FLATTEN_CACHE_DIR = os.path.join(CACHE_DIR, 'flatten')
+ZERO_ADDRESS = '0x' + '0' * 40
+
+# Define Colors
+BOLD = '\033[1m'
+RED = '\033[31m'
+GREEN = '\033[32m'
+CYAN = '\033[36m'
+NC = '\033[0m'  # No Color
+
+
+def is_address(value):
+    return re.fullmatch(r'0x[0-9a-fA-F]{40}', value) is not None
+
+
+def flatten_inputs_digest():
+    """
+    Digest of everything `forge flatten` reads: the non-test sources, lib/ and the forge config.
+    """
+    digest = hashlib.sha256()
+    for relative in walk_files(SOURCE_DIR):
+        if relative.startswith('test/') or '.t.' in relative:
+            continue
+        digest.update(f'{relative}\0{hash_file(os.path.join(SOURCE_DIR, relative))}\n'.encode())
+    if os.path.isdir(LIBRARY_DIR):
+        digest.update(f'{LIBRARY_DIR}\0{tree_signature(LIBRARY_DIR)}\n'.encode())
+    for path in FORGE_CONFIG_FILES:
+        if os.path.exists(path):
+            digest.update(f'{path}\0{hash_file(path)}\n'.encode())
+    return digest.hexdigest()
+
+
+def get_flattened_source():
+    """Flatten src/DssSpell.sol into out/flat.sol unless its inputs are unchanged since the last run.
+
+    Returns:
+        str: The flattened source code
+    """
+    cache_path = os.path.join(FLATTEN_CACHE_DIR, f'{flatten_inputs_digest()}.sol')
+    if not os.path.exists(cache_path):
+        result = subprocess.run(
+            ['forge', 'flatten', SOURCE_FILE_PATH, '--output', FLATTEN_OUTPUT_PATH],
+            capture_output=True, text=True
+        )
+        if result.returncode != 0:
+            raise RuntimeError(f"forge flatten failed:\n{result.stderr}")
+        os.makedirs(FLATTEN_CACHE_DIR, exist_ok=True)
+        shutil.copyfile(FLATTEN_OUTPUT_PATH, cache_path + '.tmp')
+        os.replace(cache_path + '.tmp', cache_path)
+    elif not os.path.exists(FLATTEN_OUTPUT_PATH) or hash_file(FLATTEN_OUTPUT_PATH) != hash_file(cache_path):
+        os.makedirs(os.path.dirname(FLATTEN_OUTPUT_PATH), exist_ok=True)
+        shutil.copyfile(cache_path, FLATTEN_OUTPUT_PATH)
+
+    with open(cache_path, encoding='utf-8') as f:
+        return f.read()
+
+
+def normalize(source):
+    """
+    Split into lines, ignoring carriage returns and trailing empty lines (Etherscan sometimes
+    returns the source with Windows-style line breaks).
+    """
+    return [line.rstrip('\r') for line in source.rstrip('\r\n').split('\n')]
+
+
+def read_local_sources(paths):
+    """
+    Local content of each source path of a standard JSON input, None when the file is missing.
+    """
+    sources = {}
+    for path in paths:
+        try:
+            with open(path, encoding='utf-8') as f:
+                sources[path] = f.read()
+        except FileNotFoundError:
+            sources[path] = None
+    return sources
+
+
+def diff_lines(address, etherscan_source):
+    """
+    Unified diff lines between the verified source and the local spell.
+    """
+    deployed = parse_sources(etherscan_source)
+    if deployed is None:
+        yield from difflib.unified_diff(
+            normalize(etherscan_source),
+            normalize(get_flattened_source()),
+            fromfile=f'etherscan:{address}',
+            tofile=FLATTEN_OUTPUT_PATH,
+            lineterm=''
+        )
+        return
+
+    for path, local in read_local_sources(sorted(deployed)).items():
+        if local is None:
+            yield f'Only in etherscan:{address}: {path}'
+            continue
+        yield from difflib.unified_diff(
+            normalize(deployed[path]),
+            normalize(local),
+            fromfile=f'etherscan:{address}/{path}',
+            tofile=path,
+            lineterm=''
+        )
+
+
+def colorize(line):
+    if line.startswith(('---', '+++')):
+        return f'{BOLD}{line}{NC}'
+    if line.startswith('@@'):
+        return f'{CYAN}{line}{NC}'
+    if line.startswith('-'):
+        return f'{RED}{line}{NC}'
+    if line.startswith('+'):
+        return f'{GREEN}{line}{NC}'
+    return line
+
+
+def parse_arguments():
+    """Parse command line arguments.
+
+    Returns:
+        argparse.Namespace: The parsed arguments
+    """
+    parser = argparse.ArgumentParser(description="Diff the deployed spell source against the local spell")
+    parser.add_argument(
+        "address",
+        nargs="?",
+        help="Deployed spell address (default: spell.deployed_spell in config.sol)"
+    )
+    return parser.parse_args()
+
+
+def main():
+    """Main function to diff the deployed spell against the local spell."""
+    args = parse_arguments()
+
+    if not os.environ.get('ETHERSCAN_API_KEY'):
+        sys.exit("Please set ETHERSCAN_API_KEY")
+
+    if args.address and is_address(args.address):
+        address = args.address
+    else:
+        address = get_field(load_config(CONFIG_PATH), 'spell.deployed_spell')
+        if not isinstance(address, str) or address.lower() == ZERO_ADDRESS:
+            sys.exit("DssSpell address is not set in config file.")
+
+    try:
+        with EtherscanClient(chain_id=CHAIN_ID) as etherscan:
+            etherscan_source = etherscan.get_source(address).get('SourceCode', '')
+        if not etherscan_source:
+            sys.exit(f"{address} is not verified on Etherscan")
+
+        color = sys.stdout.isatty()
+        different = False
+        for line in diff_lines(address, etherscan_source):
+            different = True
+            print(colorize(line) if color else line)
+    except (requests.RequestException, EtherscanError, RuntimeError) as e:
+        sys.exit(str(e))
+
+    if different:
+        sys.exit(1)
+
+
+# Execute the main function if this script is run directly
+if __name__ == "__main__":
+    main()
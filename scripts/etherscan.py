@@ -0,0 +1,289 @@
+#!/usr/bin/env python3
+"""
+Etherscan API client shared by the spell scripts.
+
+Every request goes through the v2 API over a pooled keep-alive session, is paced by a
+token bucket sized for the API key tier (ETHERSCAN_API_TIER, default free) and is retried
+with exponential backoff on transient errors and rate limit answers. Answers that cannot
+change, such as the source of a verified contract, are cached on disk.
+
+Usage:
+    ./etherscan.py deployment-tx <address>
+    ./etherscan.py source <address> [--field <name>]
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import threading
+import time
+import requests
+from requests.adapters import HTTPAdapter
+from typing import Any, Dict, List, Optional
+
+# Constants
+ETHERSCAN_API_URL = os.environ.get('ETHERSCAN_API_URL', 'https://api.etherscan.io/v2/api')
+REQUEST_TIMEOUT = 60
+USER_AGENT = 'Sky-Protocol-Spell-Scripts'
+# Calls per second allowed by each API key tier
+RATE_LIMITS = {
+    'free': 5,
+    'standard': 10,
+    'advanced': 20,
+    'professional': 30,
+}
+DEFAULT_TIER = 'free'
+MAX_RETRIES = 5
+BACKOFF_BASE = 1.0
+BACKOFF_MAX = 30.0
+TRANSIENT_STATUS_CODES = (429, 500, 502, 503, 504)
+RATE_LIMIT_MESSAGES = ('rate limit', 'too many')
+CACHE_DIR = os.path.join(os.environ.get('SPELLS_CACHE_DIR', '.cache'), 'etherscan')
+
+
+class EtherscanError(Exception):
+    """
+    Raised when Etherscan answers a request with an error.
+    """
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket: `rate` tokens per second, bursts of up to `capacity`.
+    """
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        self.rate = rate
+        self.capacity = capacity or rate
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self) -> None:
+        """
+        Take a token, sleeping until one is available.
+        """
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+def is_rate_limited(answer: Dict[str, Any]) -> bool:
+    result = answer.get('result')
+    return answer.get('status') == '0' and isinstance(result, str) and \
+        any(message in result.lower() for message in RATE_LIMIT_MESSAGES)
+
+
+def backoff_delay(attempt: int) -> float:
+    """
+    Exponential backoff with full jitter.
+    """
+    return random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt))
+
+
+def parse_sources(source_code: str) -> Optional[Dict[str, str]]:
+    """
+    Split the `SourceCode` of a contract verified with several files into {path: content}.
+    Etherscan wraps standard JSON input in double braces; a plain multi-file upload is a
+    single JSON object of {path: {content}}. Returns None for a single-file source.
+    """
+    text = source_code.strip()
+    if text.startswith('{{') and text.endswith('}}'):
+        text = text[1:-1]
+    if not text.startswith('{'):
+        return None
+    try:
+        parsed = json.loads(text)
+    except json.decoder.JSONDecodeError:
+        return None
+    sources = parsed.get('sources', parsed) if isinstance(parsed, dict) else None
+    if not isinstance(sources, dict) or not all(isinstance(source, dict) for source in sources.values()):
+        return None
+    return {path: source.get('content', '') for path, source in sources.items()}
+
+
+class EtherscanClient:
+    """
+    Rate-limited Etherscan v2 client with retries and an on-disk cache for immutable answers.
+    """
+
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        chain_id: int = 1,
+        tier: Optional[str] = None,
+        url: str = ETHERSCAN_API_URL,
+        pool_size: int = 4,
+        timeout: float = REQUEST_TIMEOUT,
+        cache_dir: Optional[str] = CACHE_DIR
+    ):
+        self.api_key = api_key or os.environ['ETHERSCAN_API_KEY']
+        self.chain_id = int(chain_id)
+        tier = tier or os.environ.get('ETHERSCAN_API_TIER', DEFAULT_TIER)
+        if tier not in RATE_LIMITS:
+            raise ValueError(f'Unknown Etherscan API tier {tier}, expected one of {", ".join(RATE_LIMITS)}')
+        self.limiter = TokenBucket(RATE_LIMITS[tier])
+        self.url = url
+        self.timeout = timeout
+        self.cache_dir = cache_dir
+        self.session = requests.Session()
+        self.session.headers.update({'User-Agent': USER_AGENT, 'Connection': 'keep-alive'})
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    def close(self) -> None:
+        self.session.close()
+
+    def __enter__(self) -> 'EtherscanClient':
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def request(
+        self,
+        params: Dict[str, Any],
+        data: Optional[Dict[str, Any]] = None,
+        idempotent: bool = True
+    ) -> Dict[str, Any]:
+        """
+        Send a request (a POST when `data` is given) and return the decoded answer.
+        Rate limit answers are always retried; other transient errors only for
+        idempotent requests, so a submission is never sent twice.
+        """
+        params = {'chainid': self.chain_id, **params}
+        if data is None:
+            params['apikey'] = self.api_key
+        else:
+            data = {'apikey': self.api_key, **data}
+
+        for attempt in range(MAX_RETRIES + 1):
+            self.limiter.acquire()
+            try:
+                if data is None:
+                    response = self.session.get(self.url, params=params, timeout=self.timeout)
+                else:
+                    response = self.session.post(self.url, params=params, data=data, timeout=self.timeout)
+            except (requests.ConnectionError, requests.Timeout):
+                if not idempotent or attempt == MAX_RETRIES:
+                    raise
+                time.sleep(backoff_delay(attempt))
+                continue
+
+            transient = response.status_code == 429 or \
+                (idempotent and response.status_code in TRANSIENT_STATUS_CODES)
+            if transient and attempt < MAX_RETRIES:
+                time.sleep(backoff_delay(attempt))
+                continue
+            response.raise_for_status()
+
+            try:
+                answer = response.json()
+            except json.decoder.JSONDecodeError:
+                raise EtherscanError(f'Etherscan responded with invalid JSON: {response.text[:200]}')
+            if is_rate_limited(answer) and attempt < MAX_RETRIES:
+                time.sleep(backoff_delay(attempt))
+                continue
+            return answer
+        raise EtherscanError(f'Etherscan still failing after {MAX_RETRIES} retries')
+
+    def result(self, module: str, action: str, **params: Any) -> Any:
+        """
+        Send a GET request and return its `result`, raising EtherscanError on errors.
+        An empty list answer ("No transactions found") is not an error.
+        """
+        answer = self.request({'module': module, 'action': action, **params})
+        result = answer.get('result')
+        if answer.get('status') != '1' and not (isinstance(result, list) and not result):
+            raise EtherscanError(f"Etherscan error: {result or answer.get('message')}")
+        return result
+
+    def _cache_path(self, kind: str, key: str) -> Optional[str]:
+        if not self.cache_dir:
+            return None
+        return os.path.join(self.cache_dir, kind, f'{self.chain_id}-{key}.json')
+
+    def get_source(self, address: str) -> Dict[str, Any]:
+        """
+        Get the `getsourcecode` answer of an address. The source of a verified contract
+        never changes, so it is cached on disk; unverified answers are not.
+        """
+        path = self._cache_path('sources', address.lower())
+        if path:
+            try:
+                with open(path) as f:
+                    return json.load(f)
+            except (FileNotFoundError, ValueError):
+                pass
+
+        info = self.result('contract', 'getsourcecode', address=address)[0]
+        if path and info.get('SourceCode'):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path + '.tmp', 'w') as f:
+                json.dump(info, f)
+            os.replace(path + '.tmp', path)
+        return info
+
+    def get_internal_transactions(self, address: str) -> List[Dict[str, Any]]:
+        return self.result(
+            'account', 'txlistinternal', address=address,
+            startblock=0, endblock=99999999, sort='asc'
+        )
+
+    def get_deployment_tx(self, address: str) -> Optional[str]:
+        """
+        Hash of the transaction that created a contract through an internal transaction
+        (e.g. a spell deployed by a factory or a create call).
+        """
+        transactions = self.get_internal_transactions(address)
+        return transactions[0]['hash'] if transactions else None
+
+
+def parse_arguments():
+    """Parse command line arguments.
+
+    Returns:
+        argparse.Namespace: The parsed arguments
+    """
+    parser = argparse.ArgumentParser(description="Query Etherscan through the shared rate-limited client")
+    commands = parser.add_subparsers(dest="command", required=True)
+    deployment = commands.add_parser("deployment-tx", help="Print the hash of the transaction that created a contract")
+    deployment.add_argument("address")
+    source = commands.add_parser("source", help="Print the verified source info of a contract as JSON")
+    source.add_argument("address")
+    source.add_argument("--field", help="Print a single field, e.g. SourceCode or CompilerVersion")
+    return parser.parse_args()
+
+
+def main():
+    """Main function to query Etherscan from the shell scripts."""
+    args = parse_arguments()
+    if not os.environ.get('ETHERSCAN_API_KEY'):
+        sys.exit("Please set ETHERSCAN_API_KEY")
+
+    try:
+        with EtherscanClient() as client:
+            if args.command == 'deployment-tx':
+                tx_hash = client.get_deployment_tx(args.address)
+                if not tx_hash:
+                    sys.exit(f"No internal transaction found for {args.address}")
+                print(tx_hash)
+            else:
+                info = client.get_source(args.address)
+                print(info.get(args.field, '') if args.field else json.dumps(info, indent=2))
+    except (requests.RequestException, EtherscanError, ValueError) as e:
+        sys.exit(str(e))
+
+
+# Execute the main function if this script is run directly
+if __name__ == "__main__":
+    main()
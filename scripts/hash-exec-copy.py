@@ -9,19 +9,100 @@ Usage:
     ./hash-exec-copy.py <date> OR
     make exec-hash date=<date>
 
-Where <date> is in the format YYYY-MM-DD
+Batch usage:
+    ./hash-exec-copy.py <date> <date> ... [--json]
+    ./hash-exec-copy.py --from <date> --to <date> [--json]
+    ./hash-exec-copy.py --archive [--json]
+
+Where <date> is in the format YYYY-MM-DD. In batch mode each year directory is listed
+once, and the commits and raw documents are fetched concurrently over one pooled session.
+The --archive mode re-hashes the executive copy referenced by every archived DssSpell.sol
+and compares it with the hash in the spell description.
+
+With --mirror, lookups are answered from a local mirror of the repository (kept under
+.cache/executive-votes) that is refreshed incrementally first; --offline skips the refresh.
 """
 
 import argparse
-from datetime import datetime
+import json
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
 import requests
-import subprocess
+from requests.adapters import HTTPAdapter
+
+import keccak
+from packstore import ArchiveStore
 
 # Constants
 INPUT_DATE_FORMAT = "%Y-%m-%d"
 REPO_URL = "/sky-ecosystem/executive-votes"
-GITHUB_API_BASE = "https://api.github.com/repos"
-GITHUB_RAW_BASE = "https://raw.githubusercontent.com"
+GITHUB_API_BASE = os.environ.get("GITHUB_API_BASE", "https://api.github.com/repos")
+GITHUB_RAW_BASE = os.environ.get("GITHUB_RAW_BASE", "https://raw.githubusercontent.com")
+STREAM_CHUNK_SIZE = 16 * 1024
+DEFAULT_WORKERS = 8
+ARCHIVE_SPELL_SUFFIX = "-DssSpell"
+ARCHIVE_SPELL_FILE = "DssSpell.sol"
+ARCHIVE_URL_PATTERN = re.compile(r"//\s*Hash:.*?wget\s+'?(https://[^'\s\"<>]+)['\s\"]")
+ARCHIVE_HASH_PATTERN = re.compile(r"Hash:\s*(0x[0-9a-fA-F]{64})")
+MIRROR_DIR = os.path.join(os.environ.get("SPELLS_CACHE_DIR", ".cache"), "executive-votes")
+MIRROR_FILE_PATTERN = re.compile(r"^\d{4}/executive-vote-(\d{4}-\d{2}-\d{2})[^/]*$")
+
+
+def create_session(workers=DEFAULT_WORKERS):
+    """Create a pooled HTTP session shared by all the requests of a run.
+
+    A GITHUB_TOKEN from the environment is used when set, to lift the
+    anonymous API rate limit.
+
+    Args:
+        workers (int): The number of concurrent connections to keep alive
+
+    Returns:
+        requests.Session: The configured session
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=2, pool_maxsize=workers)
+    session.mount("https://", adapter)
+    token = os.environ.get("GITHUB_TOKEN")
+    if token:
+        session.headers["Authorization"] = f"Bearer {token}"
+    return session
+
+
+def list_exec_files(year, session=requests):
+    """List the executive vote files in the given year directory.
+
+    Args:
+        year (str): The year directory to list
+        session: The HTTP session to use
+
+    Returns:
+        list: The filenames in the year directory
+
+    Raises:
+        requests.exceptions.RequestException: If the HTTP request fails
+    """
+    api_url = f"{GITHUB_API_BASE}{REPO_URL}/contents/{year}"
+    response = session.get(api_url)
+    response.raise_for_status()
+    return [file.get('name') for file in response.json() if file.get('type') == 'file']
+
+
+def match_exec_file(files, formatted_date):
+    """Pick the executive vote file for a date out of a directory listing.
+
+    Args:
+        files (list): The filenames of a year directory
+        formatted_date (str): The date in YYYY-MM-DD format
+
+    Returns:
+        str: The first matching filename, or None
+    """
+    pattern = f'executive-vote-{formatted_date}'
+    matching_files = [name for name in files if pattern in name]
+    return matching_files[0] if matching_files else None
 
 
 def find_exec_file_by_date(year, formatted_date):
@@ -37,21 +118,15 @@ def find_exec_file_by_date(year, formatted_date):
     Raises:
         SystemExit: If no matching file is found or if the API request fails
     """
-    api_url = f"{GITHUB_API_BASE}{REPO_URL}/contents/{year}"
-
     try:
         # Get list of files in the year directory
-        response = requests.get(api_url)
-        response.raise_for_status()
-        files = response.json()
+        files = list_exec_files(year)
 
         # Find files that match the date pattern
-        pattern = f'executive-vote-{formatted_date}'
-        matching_files = [file.get('name') for file in files if file.get(
-            'type') == 'file' and pattern in file.get('name')]
+        exec_title = match_exec_file(files, formatted_date)
 
-        if matching_files:
-            return matching_files[0]  # Return the first matching file
+        if exec_title:
+            return exec_title
 
         raise SystemExit(
             f"Error: No executive vote file found for date {formatted_date}")
@@ -61,16 +136,17 @@ def find_exec_file_by_date(year, formatted_date):
             f"HTTP Request failed when listing directory contents: {e}")
 
 
-def get_executive(exec_title, year):
-    """Fetch the executive vote document and its metadata.
+def get_executive(exec_title, year, session=requests):
+    """Fetch the executive vote document and hash it while it downloads.
 
     Args:
         exec_title (str): The filename of the executive vote document
         year (str): The year directory containing the document
+        session: The HTTP session to use
 
     Returns:
-        tuple: (content, url, commit_hash) where:
-            - content (str): The content of the executive vote document
+        tuple: (exec_hash, url, commit_hash) where:
+            - exec_hash (str): The keccak hash of the executive vote document
             - url (str): The raw GitHub URL to the document
             - commit_hash (str): The commit hash of the document
 
@@ -82,7 +158,7 @@ def get_executive(exec_title, year):
     commits_url = f"{GITHUB_API_BASE}{REPO_URL}/commits"
     file_path = f"{year}/{exec_title}"
 
-    response = requests.get(
+    response = session.get(
         commits_url,
         params={
             'path': file_path,
@@ -90,7 +166,7 @@ def get_executive(exec_title, year):
     response.raise_for_status()
     commits = response.json()
 
-    if not commits:
+    if not isinstance(commits, list) or not commits:
         raise SystemExit(f"Error: Executive copy not found: {exec_title}")
 
     commit_hash = commits[0].get("sha", "")
@@ -99,78 +175,517 @@ def get_executive(exec_title, year):
         raise SystemExit(
             f"Error: Executive copy commit hash not found: {exec_title}")
 
-    # Get the file content from the specific commit
+    # Stream the file content from the specific commit
     raw_url = f"{GITHUB_RAW_BASE}{REPO_URL}/{commit_hash}/{file_path}"
-    content_response = requests.get(raw_url)
-    content_response.raise_for_status()
+    exec_hash, executive_url = get_url_hash(raw_url, session)
 
-    # Store the URL for output
-    executive_url = content_response.url
+    return exec_hash, executive_url, commit_hash
 
-    # Remove trailing newline for consistent hashing
-    content = content_response.text
-    if content and content[-1] == '\n':
-        content = content[:-1]
 
-    return content, executive_url, commit_hash
+def get_url_hash(url, session=requests, trailing_newlines=1):
+    """Download a document and hash it while it streams in.
+
+    Args:
+        url (str): The URL of the document
+        session: The HTTP session to use
+        trailing_newlines (int): See get_stream_hash
+
+    Returns:
+        tuple: (exec_hash, url) with the final URL after redirects
+
+    Raises:
+        requests.exceptions.RequestException: If the HTTP request fails
+    """
+    with session.get(url, stream=True) as content_response:
+        content_response.raise_for_status()
+
+        # Store the URL for output
+        executive_url = content_response.url
+
+        exec_hash = get_stream_hash(
+            content_response.iter_content(chunk_size=STREAM_CHUNK_SIZE),
+            trailing_newlines)
+
+    return exec_hash, executive_url
+
+
+def get_stream_hash(chunks, trailing_newlines=1, backend=None):
+    """Calculate the keccak hash of a document received in chunks.
+
+    A single trailing newline is removed for consistent hashing, so the result
+    matches get_content_hash of the downloaded text without its final newline.
+
+    Args:
+        chunks (iterable): The raw bytes of the document, in order
+        trailing_newlines (int): How many trailing newlines to remove; None removes
+            them all, like the shell's "$(wget ...)" used in archived spells
+        backend (str): The keccak implementation to use (default: the fastest installed)
+
+    Returns:
+        str: The 0x-prefixed keccak hash of the content
+    """
+    hasher = keccak.new(backend=backend)
+    pending = b''
+    for chunk in chunks:
+        if not chunk:
+            continue
+        # Hold back the trailing newlines until we know whether they end the document
+        data = pending + chunk
+        content = data.rstrip(b'\n')
+        hasher.update(content)
+        pending = data[len(content):]
+    if trailing_newlines is not None:
+        hasher.update(pending[:max(len(pending) - trailing_newlines, 0)])
+    return '0x' + hasher.hexdigest()
 
 
 def get_content_hash(content):
-    """Calculate the keccak hash of the content using the 'cast' command.
+    """Calculate the keccak hash of the content, as `cast keccak -- <content>` would.
 
     Args:
         content (str): The content to hash
 
     Returns:
-        str: The keccak hash of the content
+        str: The 0x-prefixed keccak hash of the content
+    """
+    return keccak.keccak256(content)
 
-    Raises:
-        SystemExit: If the 'cast' command is not found or fails
+
+class ExecutiveMirror:
+    """Local mirror of the executive-votes repository with a date index.
+
+    The index (index.json) records the last synced commit and the ETag of the
+    branch head, and maps every executive vote file to its git blob SHA, the
+    last commit that touched it (the commit the live lookup links to) and its
+    keccak hash. Documents are stored under files/.
+
+    A sync lists the whole tree in a single API request. Only the files whose
+    blob SHA changed cost one more API request, for their last commit, and are
+    downloaded from raw.githubusercontent.com, which does not count against the
+    API rate limit. The first sync therefore needs a GITHUB_TOKEN.
+    """
+
+    def __init__(self, directory=MIRROR_DIR):
+        self.directory = directory
+        self.index_path = os.path.join(directory, "index.json")
+        try:
+            with open(self.index_path, "r") as f:
+                self.index = json.load(f)
+        except (FileNotFoundError, json.decoder.JSONDecodeError):
+            self.index = {"head": None, "etag": None, "files": {}, "dates": {}}
+
+    def save(self):
+        """Rebuild the date index and write index.json atomically."""
+        dates = {}
+        for path in sorted(self.index["files"]):
+            dates.setdefault(self.index["files"][path]["date"], []).append(path)
+        self.index["dates"] = dates
+
+        os.makedirs(self.directory, exist_ok=True)
+        with open(f"{self.index_path}.tmp", "w") as f:
+            json.dump(self.index, f, indent=1, sort_keys=True)
+        os.replace(f"{self.index_path}.tmp", self.index_path)
+
+    def lookup(self, formatted_date):
+        """Return the mirrored executive vote for a date, or None.
+
+        Args:
+            formatted_date (str): The date in YYYY-MM-DD format
+
+        Returns:
+            dict: The date, commit, url, hash and path of the first matching file
+        """
+        paths = self.index["dates"].get(formatted_date)
+        if not paths:
+            return None
+        entry = self.index["files"][paths[0]]
+        return {
+            "date": formatted_date,
+            "commit": entry["commit"],
+            "url": f"{GITHUB_RAW_BASE}{REPO_URL}/{entry['commit']}/{paths[0]}",
+            "hash": entry["hash"],
+            "path": os.path.join(self.directory, "files", paths[0]),
+            "error": None
+        }
+
+    def _get_head(self, session):
+        """Return the head commit, or None when it has not moved since the last sync.
+
+        Uses a conditional request, which GitHub does not count against the rate limit.
+        """
+        headers = {"Accept": "application/vnd.github.sha"}
+        if self.index["etag"] and self.index["head"]:
+            headers["If-None-Match"] = self.index["etag"]
+        response = session.get(f"{GITHUB_API_BASE}{REPO_URL}/commits/HEAD", headers=headers)
+        if response.status_code == 304:
+            return None
+        response.raise_for_status()
+        self.index["etag"] = response.headers.get("ETag")
+        return response.text.strip()
+
+    def _list_blobs(self, session, head):
+        """Return the blob SHA of every executive vote file at a commit, in one request.
+
+        Raises:
+            SystemExit: If the listing fails or is malformed
+        """
+        response = session.get(f"{GITHUB_API_BASE}{REPO_URL}/git/trees/{head}", params={"recursive": "1"})
+        try:
+            tree = response.json()
+        except ValueError:
+            tree = None
+        if not response.ok:
+            message = tree.get("message") if isinstance(tree, dict) else response.reason
+            raise SystemExit(f"Error: Listing the executive-votes tree failed ({response.status_code}): {message}")
+        if not isinstance(tree, dict) or not isinstance(tree.get("tree"), list):
+            raise SystemExit(f"Error: Malformed executive-votes tree listing for {head}")
+        if tree.get("truncated"):
+            raise SystemExit(f"Error: The executive-votes tree listing for {head} is truncated")
+        return {
+            entry["path"]: entry["sha"] for entry in tree["tree"]
+            if entry.get("type") == "blob" and MIRROR_FILE_PATTERN.match(entry.get("path", ""))
+        }
+
+    def _last_commit(self, session, head, path):
+        """Return the last commit touching a file as of the head commit.
+
+        Raises:
+            SystemExit: If the lookup fails or finds no commit
+        """
+        response = session.get(f"{GITHUB_API_BASE}{REPO_URL}/commits",
+                               params={"sha": head, "path": path, "per_page": "1"})
+        try:
+            commits = response.json()
+        except ValueError:
+            commits = None
+        if not response.ok:
+            message = commits.get("message") if isinstance(commits, dict) else response.reason
+            raise SystemExit(f"Error: Looking up the last commit of {path} failed ({response.status_code}): {message}")
+        if not isinstance(commits, list) or not commits or not isinstance(commits[0], dict) \
+                or not commits[0].get("sha"):
+            raise SystemExit(f"Error: No commit found for {path} as of {head}")
+        return commits[0]["sha"]
+
+    def _fetch(self, session, head, path, blob_sha):
+        """Download a file as of its last commit, then store and hash it."""
+        commit = self._last_commit(session, head, path)
+        target = os.path.join(self.directory, "files", path)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        with session.get(f"{GITHUB_RAW_BASE}{REPO_URL}/{commit}/{path}", stream=True) as content_response, \
+                open(target, "wb") as f:
+            content_response.raise_for_status()
+
+            def tee(chunks):
+                for chunk in chunks:
+                    f.write(chunk)
+                    yield chunk
+
+            exec_hash = get_stream_hash(tee(content_response.iter_content(chunk_size=STREAM_CHUNK_SIZE)))
+
+        date = MIRROR_FILE_PATTERN.match(path).group(1)
+        return path, {"sha": blob_sha, "commit": commit, "hash": exec_hash, "date": date}
+
+    def sync(self, session, workers=DEFAULT_WORKERS):
+        """Bring the mirror up to date with the repository.
+
+        Args:
+            session: The HTTP session to use
+            workers (int): The number of concurrent downloads
+
+        Returns:
+            int: The number of executive vote files added or updated
+        """
+        head = self._get_head(session)
+        if head is None or head == self.index["head"]:
+            return 0
+
+        blobs = self._list_blobs(session, head)
+        # Files whose blob SHA did not change keep their entry, commit included
+        for path in [path for path in self.index["files"] if path not in blobs]:
+            del self.index["files"][path]
+
+        changed = [path for path, sha in blobs.items() if self.index["files"].get(path, {}).get("sha") != sha]
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            for path, entry in executor.map(lambda path: self._fetch(session, head, path, blobs[path]), changed):
+                self.index["files"][path] = entry
+
+        self.index["head"] = head
+        self.index["synced_at"] = datetime.now().timestamp()
+        self.save()
+        return len(changed)
+
+
+def lookup_mirror(dates, workers=DEFAULT_WORKERS, offline=False, skip_missing=False):
+    """Answer date lookups from the local mirror, refreshing it first unless offline.
+
+    Args:
+        dates (list): The datetime objects to look up
+        workers (int): The number of concurrent downloads during the refresh
+        offline (bool): Use the mirror as is, without any network access
+        skip_missing (bool): Leave out dates without an executive vote file
+
+    Returns:
+        list: One dict per date with date, commit, url, hash and error keys
+    """
+    mirror = ExecutiveMirror()
+    if not offline:
+        with create_session(workers) as session:
+            mirror.sync(session, workers)
+    elif mirror.index["head"] is None:
+        raise SystemExit(f"Error: No executive-votes mirror found in {mirror.directory}. Run with --mirror first.")
+
+    rows = []
+    for formatted_date in sorted({date.strftime('%Y-%m-%d') for date in dates}):
+        row = mirror.lookup(formatted_date)
+        if row is None and not skip_missing:
+            row = {"date": formatted_date, "commit": None, "url": None, "hash": None,
+                   "error": "No executive vote file found"}
+        if row is not None:
+            rows.append(row)
+    return rows
+
+
+def hash_dates(dates, workers=DEFAULT_WORKERS, skip_missing=False):
+    """Find and hash the executive vote documents for many dates.
+
+    Each year directory is listed once; the commit lookups and raw downloads
+    then run concurrently over a single pooled session.
+
+    Args:
+        dates (list): The datetime objects to look up
+        workers (int): The number of concurrent requests
+        skip_missing (bool): Leave out dates without an executive vote file
+
+    Returns:
+        list: One dict per date with date, commit, url, hash and error keys
+    """
+    formatted_dates = sorted({date.strftime('%Y-%m-%d') for date in dates})
+    years = sorted({formatted_date[:4] for formatted_date in formatted_dates})
+
+    with create_session(workers) as session, ThreadPoolExecutor(max_workers=workers) as executor:
+        listings = dict(zip(years, executor.map(
+            lambda year: _try(list_exec_files, year, session), years)))
+
+        def hash_date(formatted_date):
+            row = {'date': formatted_date, 'commit': None, 'url': None, 'hash': None, 'error': None}
+            files = listings[formatted_date[:4]]
+            if isinstance(files, Exception):
+                row['error'] = f"Could not list {formatted_date[:4]}: {files}"
+                return row
+            exec_title = match_exec_file(files, formatted_date)
+            if not exec_title:
+                row['error'] = "No executive vote file found"
+                return row
+            result = _try(get_executive, exec_title, formatted_date[:4], session)
+            if isinstance(result, Exception):
+                row['error'] = str(result)
+            else:
+                row['hash'], row['url'], row['commit'] = result
+            return row
+
+        rows = list(executor.map(hash_date, formatted_dates))
+
+    if skip_missing:
+        rows = [row for row in rows if row['error'] != "No executive vote file found"]
+    return rows
+
+
+def read_archived_hashes(store=None):
+    """Collect the executive copy URL and hash recorded in each archived spell.
+
+    Args:
+        store (ArchiveStore): The archive to read, packed or loose (default: archive/)
+
+    Returns:
+        list: One dict per archived spell that records both a URL and a hash
+    """
+    store = store or ArchiveStore()
+    archived = []
+    for name in store.names():
+        if not name.endswith(ARCHIVE_SPELL_SUFFIX) or not store.exists(name, ARCHIVE_SPELL_FILE):
+            continue
+        source = store.read_text(name, ARCHIVE_SPELL_FILE)
+        url = ARCHIVE_URL_PATTERN.search(source)
+        expected = ARCHIVE_HASH_PATTERN.search(source)
+        if url and expected:
+            archived.append({
+                'archive': name,
+                'url': url.group(1),
+                'expected': expected.group(1).lower()
+            })
+    return archived
+
+
+def audit_archive(workers=DEFAULT_WORKERS):
+    """Re-hash the executive copy of every archived spell and compare it with the recorded hash.
+
+    Archived spells hashed `"$(wget ...)"` in the shell, which strips every trailing newline.
+
+    Args:
+        workers (int): The number of concurrent downloads
+
+    Returns:
+        list: One dict per archived spell with archive, url, expected, hash, match and error keys
+    """
+    archived = read_archived_hashes()
+
+    def audit(entry):
+        row = entry | {'hash': None, 'match': False, 'error': None}
+        result = _try(get_url_hash, entry['url'], session, None)
+        if isinstance(result, Exception):
+            row['error'] = str(result)
+        else:
+            row['hash'] = result[0]
+            row['match'] = row['hash'] == entry['expected']
+        return row
+
+    with create_session(workers) as session, ThreadPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(audit, archived))
+
+
+def _try(function, *args):
+    """Call a function, returning the exception instead of raising it.
+
+    Used in worker threads so that one failing date does not abort the batch.
+    """
+    try:
+        return function(*args)
+    except (requests.exceptions.RequestException, SystemExit) as e:
+        return e
+
+
+def print_rows(rows, columns, as_json=False):
+    """Print batch results as a table or as JSON lines.
+
+    Args:
+        rows (list): The result dicts
+        columns (list): The keys to print, in order
+        as_json (bool): Print one JSON object per line instead of a table
+    """
+    if as_json:
+        for row in rows:
+            print(json.dumps({column: row[column] for column in columns}))
+        return
+
+    cells = [[str(row[column] if row[column] is not None else '-') for column in columns] for row in rows]
+    widths = [max([len(column)] + [len(line[index]) for line in cells]) for index, column in enumerate(columns)]
+    print("  ".join(column.ljust(width) for column, width in zip(columns, widths)).rstrip())
+    for line in cells:
+        print("  ".join(cell.ljust(width) for cell, width in zip(line, widths)).rstrip())
+
+
+def parse_date(date_string):
+    """Parse a date argument, accepting the `date=` prefix passed by make.
+
+    Args:
+        date_string (str): The date in YYYY-MM-DD format
+
+    Returns:
+        datetime: The parsed date object
     """
     try:
-        # Run the 'cast keccak' command with the content
-        keccak_result = subprocess.run(
-            ['cast', 'keccak', '--', content],
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            text=True,
-            check=True
-        )
-        return keccak_result.stdout.strip()  # Strip any whitespace
-    except FileNotFoundError:
+        return datetime.strptime(date_string.replace("date=", ""), INPUT_DATE_FORMAT)
+    except ValueError:
         raise SystemExit(
-            "Error: The 'cast' command is not found. Ensure it's installed and in the PATH.")
-    except subprocess.CalledProcessError as e:
-        raise SystemExit(f"Command failed with error: {e.stderr}")
+            f"Invalid date format. Please use {INPUT_DATE_FORMAT}.")
 
 
 def parse_arguments():
     """Parse command line arguments.
 
     Returns:
-        datetime: The parsed date object
+        argparse.Namespace: The parsed arguments, with `dates` as datetime objects
     """
     parser = argparse.ArgumentParser(
-        description="Fetch an executive vote document and calculate its keccak hash")
+        description="Fetch executive vote documents and calculate their keccak hashes")
+    parser.add_argument(
+        "dates",
+        nargs="*",
+        help=f"Dates to find executive copies for (format: {INPUT_DATE_FORMAT})"
+    )
+    parser.add_argument(
+        "--from",
+        dest="start",
+        help="First date of a range to hash (inclusive)"
+    )
+    parser.add_argument(
+        "--to",
+        dest="end",
+        help="Last date of a range to hash (inclusive, defaults to today)"
+    )
+    parser.add_argument(
+        "--archive",
+        action="store_true",
+        help="Re-audit the hashes recorded in every archived DssSpell.sol"
+    )
+    parser.add_argument(
+        "--json",
+        action="store_true",
+        help="Print JSON lines instead of a table"
+    )
     parser.add_argument(
-        "date",
-        help=f"Date to find executive copy for (format: {INPUT_DATE_FORMAT})"
+        "--mirror",
+        action="store_true",
+        help=f"Refresh the local mirror in {MIRROR_DIR} and answer from it"
+    )
+    parser.add_argument(
+        "--offline",
+        action="store_true",
+        help="Answer from a previously populated local mirror without network access"
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=DEFAULT_WORKERS,
+        help="Number of concurrent requests in batch mode (default: %(default)s)"
     )
 
     args = parser.parse_args()
-    date_string = args.date.replace("date=", "")
+    args.dates = [parse_date(date) for date in args.dates if date.replace("date=", "")]
 
-    try:
-        return datetime.strptime(date_string, INPUT_DATE_FORMAT)
-    except ValueError:
-        raise SystemExit(
-            f"Invalid date format. Please use {INPUT_DATE_FORMAT}.")
+    if args.start:
+        start = parse_date(args.start)
+        end = parse_date(args.end) if args.end else datetime.now()
+        args.dates += [start + timedelta(days=day) for day in range((end - start).days + 1)]
+
+    if not args.dates and not args.archive:
+        parser.error("Please specify a date, a --from/--to range or --archive")
+
+    return args
 
 
 def main():
-    """Main function to fetch and hash an executive vote document."""
-    # Parse the date argument
-    date = parse_arguments()
+    """Main function to fetch and hash executive vote documents."""
+    args = parse_arguments()
+
+    try:
+        if args.archive:
+            rows = audit_archive(args.workers)
+            print_rows(rows, ['archive', 'match', 'hash', 'expected', 'url', 'error'], args.json)
+            if not all(row['match'] for row in rows):
+                raise SystemExit(1)
+            return
+
+        if args.mirror or args.offline:
+            rows = lookup_mirror(args.dates, args.workers, args.offline, skip_missing=args.start is not None)
+            if len(args.dates) > 1 or args.json:
+                print_rows(rows, ['date', 'commit', 'url', 'hash', 'error'], args.json)
+                return
+            if not rows or rows[0]['error']:
+                raise SystemExit(f"Error: No executive vote file found for date {args.dates[0].strftime('%Y-%m-%d')}")
+            print(f"Executive Votes repo commit: {rows[0]['commit']}")
+            print(f"Raw GitHub URL: {rows[0]['url']}")
+            print(f"Exec copy hash: {rows[0]['hash']}")
+            return
+
+        if len(args.dates) > 1 or args.json:
+            rows = hash_dates(args.dates, args.workers, skip_missing=args.start is not None)
+            print_rows(rows, ['date', 'commit', 'url', 'hash', 'error'], args.json)
+            return
+    except requests.exceptions.RequestException as e:
+        raise SystemExit(f"HTTP Request failed: {e}")
+
+    date = args.dates[0]
 
     # Extract year and format date
     year = date.strftime("%Y")
@@ -180,13 +695,10 @@ def main():
         # Find the executive file for the given date
         exec_title = find_exec_file_by_date(year, formatted_date)
 
-        # Get the content and metadata
-        executive_content, executive_url, commit_hash = get_executive(
+        # Get the content hash and metadata
+        exec_hash, executive_url, commit_hash = get_executive(
             exec_title, year)
 
-        # Calculate the hash
-        exec_hash = get_content_hash(executive_content)
-
         # Output results
         print(f"Executive Votes repo commit: {commit_hash}")
         print(f"Raw GitHub URL: {executive_url}")
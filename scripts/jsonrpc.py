@@ -0,0 +1,512 @@
+"""
+Minimal Ethereum JSON-RPC client shared by the spell scripts.
+
+Replaces per-call `cast` subprocesses with a pooled HTTP session, JSON-RPC
+batching, Multicall3 aggregation, ABI encoding/decoding for cast-style
+signatures such as `action()(address)`, and a cache for responses pinned to
+a block number.
+"""
+import os
+import itertools
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+import keccak
+
+# Constants
+REQUEST_TIMEOUT = 60
+BATCH_SIZE = 100
+USER_AGENT = 'Sky-Protocol-Spell-Scripts'
+WORD_SIZE = 32
+BLOCK_TAGS = ('latest', 'earliest', 'pending', 'safe', 'finalized')
+# Position of the block parameter for the methods whose answer is immutable once pinned to a block
+BLOCK_PARAM_INDEX = {
+    'eth_call': 1,
+    'eth_getBalance': 1,
+    'eth_getCode': 1,
+    'eth_getStorageAt': 2,
+    'eth_getBlockByNumber': 0,
+}
+IMMUTABLE_METHODS = ('eth_chainId', 'net_version')
+MULTICALL3_ADDRESS = '0xcA11bde05977b3631167028862bE2a173976CA11'
+MULTICALL3_TRY_AGGREGATE = 'tryAggregate(bool,(address,bytes)[])((bool,bytes)[])'
+MULTICALL_SIZE = 500
+LOG_BLOCK_RANGE = 10000
+LOG_ADDRESS_LIMIT = 100
+CHAIN_NAMES = {
+    1: 'ethlive',
+}
+
+BlockId = Union[int, str]
+
+
+class RpcError(Exception):
+    """
+    Raised when the node answers a request with a JSON-RPC error object.
+    """
+
+    def __init__(self, error: Dict[str, Any]):
+        super().__init__(f"RPC error {error.get('code')}: {error.get('message')}")
+        self.code = error.get('code')
+        self.data = error.get('data')
+
+
+def split_types(types: str) -> List[str]:
+    """
+    Split a comma separated list of ABI types, keeping tuples intact.
+    """
+    parts, depth, current = [], 0, ''
+    for char in types:
+        if char == ',' and depth == 0:
+            parts.append(current)
+            current = ''
+            continue
+        depth += (char == '(') - (char == ')')
+        current += char
+    if current:
+        parts.append(current)
+    return [part.strip() for part in parts]
+
+
+def parse_signature(signature: str) -> Tuple[str, List[str], List[str]]:
+    """
+    Parse a cast-style signature `name(inputs)(outputs)` into its name,
+    input types and output types.
+    """
+    name, _, rest = signature.partition('(')
+    depth, end = 1, 0
+    for end, char in enumerate(rest):
+        depth += (char == '(') - (char == ')')
+        if depth == 0:
+            break
+    inputs = rest[:end]
+    outputs = rest[end + 1:]
+    if outputs.startswith('(') and outputs.endswith(')'):
+        outputs = outputs[1:-1]
+    return name.strip(), split_types(inputs), split_types(outputs)
+
+
+def selector(signature: str) -> str:
+    """
+    Return the 4-byte function selector for a signature, as hex without prefix.
+    """
+    name, inputs, _ = parse_signature(signature)
+    return keccak.keccak256(f"{name}({','.join(inputs)})")[2:10]
+
+
+def to_checksum_address(address: str) -> str:
+    """
+    Return the EIP-55 mixed-case form of an address.
+    """
+    address = address.lower().replace('0x', '')
+    digest = keccak.keccak256(address)[2:]
+    return '0x' + ''.join(
+        char.upper() if int(nibble, 16) >= 8 else char
+        for char, nibble in zip(address, digest)
+    )
+
+
+def to_bytes32(text: str) -> str:
+    """
+    Right-pad an ASCII string into a bytes32 hex value, like `cast --format-bytes32-string`.
+    """
+    data = text.encode('ascii')
+    if len(data) > WORD_SIZE:
+        raise ValueError(f'String too long for bytes32: {text}')
+    return '0x' + _pad_right(data).hex() if data else '0x' + '00' * WORD_SIZE
+
+
+def from_bytes32(value: str) -> str:
+    """
+    Decode a right-padded bytes32 hex value into an ASCII string.
+    """
+    return _to_bytes(value).rstrip(b'\0').decode('ascii', errors='replace')
+
+
+def _array_parts(abi_type: str) -> Tuple[str, Optional[int]]:
+    """
+    Split `T[k]` or `T[]` into the element type and the length (None when dynamic).
+    """
+    base, _, length = abi_type[:-1].rpartition('[')
+    return base, int(length) if length else None
+
+
+def is_dynamic(abi_type: str) -> bool:
+    if abi_type in ('bytes', 'string'):
+        return True
+    if abi_type.endswith(']'):
+        base, length = _array_parts(abi_type)
+        return length is None or is_dynamic(base)
+    if abi_type.startswith('('):
+        return any(is_dynamic(component) for component in split_types(abi_type[1:-1]))
+    return False
+
+
+def static_size(abi_type: str) -> int:
+    if abi_type.endswith(']'):
+        base, length = _array_parts(abi_type)
+        return length * static_size(base)
+    if abi_type.startswith('('):
+        return sum(static_size(component) for component in split_types(abi_type[1:-1]))
+    return WORD_SIZE
+
+
+def _pad_right(data: bytes) -> bytes:
+    return data + b'\0' * (-len(data) % WORD_SIZE)
+
+
+def _to_bytes(value: Union[bytes, str]) -> bytes:
+    if isinstance(value, str):
+        return bytes.fromhex(value[2:] if value.startswith('0x') else value)
+    return bytes(value)
+
+
+def encode_single(abi_type: str, value: Any) -> bytes:
+    if abi_type.endswith(']'):
+        base, length = _array_parts(abi_type)
+        encoded = encode([base] * len(value), value)
+        if length is None:
+            return len(value).to_bytes(WORD_SIZE, 'big') + encoded
+        return encoded
+    if abi_type.startswith('('):
+        return encode(split_types(abi_type[1:-1]), value)
+    if abi_type == 'address':
+        return int(value, 16).to_bytes(WORD_SIZE, 'big')
+    if abi_type == 'bool':
+        return int(bool(value)).to_bytes(WORD_SIZE, 'big')
+    if abi_type.startswith('uint'):
+        return int(value).to_bytes(WORD_SIZE, 'big')
+    if abi_type.startswith('int'):
+        return int(value).to_bytes(WORD_SIZE, 'big', signed=True)
+    if abi_type == 'string':
+        data = value.encode('utf-8')
+        return len(data).to_bytes(WORD_SIZE, 'big') + _pad_right(data)
+    if abi_type == 'bytes':
+        data = _to_bytes(value)
+        return len(data).to_bytes(WORD_SIZE, 'big') + _pad_right(data)
+    if abi_type.startswith('bytes'):
+        return _pad_right(_to_bytes(value))
+    raise ValueError(f'Unsupported ABI type: {abi_type}')
+
+
+def encode(types: Sequence[str], values: Sequence[Any]) -> bytes:
+    """
+    ABI-encode a list of values using the head/tail layout.
+    """
+    if len(types) != len(values):
+        raise ValueError(f'Expected {len(types)} values, got {len(values)}')
+    head_size = sum(WORD_SIZE if is_dynamic(t) else static_size(t) for t in types)
+    heads, tails = [], []
+    for abi_type, value in zip(types, values):
+        encoded = encode_single(abi_type, value)
+        if is_dynamic(abi_type):
+            heads.append((head_size + sum(len(tail) for tail in tails)).to_bytes(WORD_SIZE, 'big'))
+            tails.append(encoded)
+        else:
+            heads.append(encoded)
+    return b''.join(heads + tails)
+
+
+def _decode_single(abi_type: str, data: bytes, position: int) -> Any:
+    word = data[position:position + WORD_SIZE]
+    if abi_type.endswith(']'):
+        base, length = _array_parts(abi_type)
+        if length is None:
+            length = int.from_bytes(word, 'big')
+            position += WORD_SIZE
+        return decode([base] * length, data, position)
+    if abi_type.startswith('('):
+        return tuple(decode(split_types(abi_type[1:-1]), data, position))
+    if abi_type == 'address':
+        return to_checksum_address(word[-20:].hex())
+    if abi_type == 'bool':
+        return int.from_bytes(word, 'big') != 0
+    if abi_type.startswith('uint'):
+        return int.from_bytes(word, 'big')
+    if abi_type.startswith('int'):
+        return int.from_bytes(word, 'big', signed=True)
+    if abi_type in ('bytes', 'string'):
+        length = int.from_bytes(word, 'big')
+        raw = data[position + WORD_SIZE:position + WORD_SIZE + length]
+        return raw.decode('utf-8', errors='replace') if abi_type == 'string' else raw
+    if abi_type.startswith('bytes'):
+        return '0x' + word.hex()
+    raise ValueError(f'Unsupported ABI type: {abi_type}')
+
+
+def decode(types: Sequence[str], data: bytes, base: int = 0) -> List[Any]:
+    """
+    ABI-decode a list of values starting at the given offset.
+    """
+    values, position = [], base
+    for abi_type in types:
+        if is_dynamic(abi_type):
+            offset = int.from_bytes(data[position:position + WORD_SIZE], 'big')
+            values.append(_decode_single(abi_type, data, base + offset))
+            position += WORD_SIZE
+        else:
+            values.append(_decode_single(abi_type, data, position))
+            position += static_size(abi_type)
+    return values
+
+
+def encode_call(signature: str, *args: Any) -> str:
+    """
+    Build the calldata for a cast-style signature, as a 0x-prefixed hex string.
+    """
+    _, inputs, _ = parse_signature(signature)
+    return '0x' + selector(signature) + encode(inputs, args).hex()
+
+
+def decode_result(signature: str, result: str) -> Any:
+    """
+    Decode the return data of a call. A single output is returned as is,
+    several outputs as a tuple.
+    """
+    _, _, outputs = parse_signature(signature)
+    data = _to_bytes(result)
+    if len(data) < sum(WORD_SIZE if is_dynamic(t) else static_size(t) for t in outputs):
+        raise ValueError(f'Return data too short for {outputs}: {result}')
+    values = decode(outputs, data)
+    return values[0] if len(values) == 1 else tuple(values)
+
+
+def format_block(block: BlockId) -> str:
+    return hex(block) if isinstance(block, int) else block
+
+
+class JsonRpcClient:
+    """
+    JSON-RPC client over a pooled keep-alive session. Responses that cannot
+    change (pinned to a block number, or chain constants) are cached in memory.
+    """
+
+    def __init__(self, url: Optional[str] = None, pool_size: int = 10, timeout: float = REQUEST_TIMEOUT):
+        self.url = url or os.environ['ETH_RPC_URL']
+        self.timeout = timeout
+        self.session = requests.Session()
+        self.session.headers.update({'User-Agent': USER_AGENT, 'Connection': 'keep-alive'})
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.ids = itertools.count(1)
+        self.cache: Dict[Tuple[str, str], Any] = {}
+        self.lock = threading.Lock()
+
+    def close(self) -> None:
+        self.session.close()
+
+    def __enter__(self) -> 'JsonRpcClient':
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    @staticmethod
+    def _cache_key(method: str, params: Sequence[Any]) -> Optional[Tuple[str, str]]:
+        if method not in IMMUTABLE_METHODS:
+            index = BLOCK_PARAM_INDEX.get(method)
+            if index is None or len(params) <= index:
+                return None
+            block = params[index]
+            if not isinstance(block, str) or block in BLOCK_TAGS:
+                return None
+        return method, repr(params)
+
+    def _post(self, payload: Any) -> Any:
+        response = self.session.post(self.url, json=payload, timeout=self.timeout)
+        response.raise_for_status()
+        return response.json()
+
+    def request(self, method: str, params: Sequence[Any] = ()) -> Any:
+        """
+        Send a single request and return its result.
+        """
+        return self.batch([(method, params)])[0]
+
+    def batch(
+        self,
+        calls: Sequence[Tuple[str, Sequence[Any]]],
+        raise_errors: bool = True
+    ) -> List[Any]:
+        """
+        Send several requests as JSON-RPC batches and return the results in order.
+        With raise_errors=False, failed requests yield an RpcError in place of a result.
+        """
+        results: List[Any] = [None] * len(calls)
+        pending = []
+        for index, (method, params) in enumerate(calls):
+            key = self._cache_key(method, list(params))
+            if key is not None and key in self.cache:
+                results[index] = self.cache[key]
+            else:
+                pending.append((index, method, list(params), key))
+
+        for start in range(0, len(pending), BATCH_SIZE):
+            chunk = pending[start:start + BATCH_SIZE]
+            requests_by_id = {}
+            payload = []
+            for index, method, params, key in chunk:
+                request_id = next(self.ids)
+                requests_by_id[request_id] = (index, key)
+                payload.append({'jsonrpc': '2.0', 'id': request_id, 'method': method, 'params': params})
+
+            answers = self._post(payload if len(payload) > 1 else payload[0])
+            if isinstance(answers, dict):
+                answers = [answers]
+            if not isinstance(answers, list):
+                answers = [{'id': None, 'error': {'code': None, 'message': f'Malformed batch answer: {answers!r:.200}'}}]
+            for answer in answers:
+                if not isinstance(answer, dict) or answer.get('id') not in requests_by_id:
+                    # An error without one of our ids (rate limit, batch too large, ...) fails the whole chunk
+                    error = answer.get('error') if isinstance(answer, dict) else None
+                    error = error if isinstance(error, dict) else {'message': f'Unexpected answer: {answer!r:.200}'}
+                    for index, _ in requests_by_id.values():
+                        results[index] = RpcError(error)
+                    requests_by_id = {}
+                    break
+                index, key = requests_by_id.pop(answer['id'])
+                if 'error' in answer:
+                    results[index] = RpcError(answer['error'])
+                    continue
+                results[index] = answer.get('result')
+                if key is not None:
+                    with self.lock:
+                        self.cache[key] = results[index]
+            # Requests the node left unanswered
+            for request_id, (index, _) in requests_by_id.items():
+                results[index] = RpcError({'message': f'No answer to request {request_id}'})
+
+        if raise_errors:
+            for result in results:
+                if isinstance(result, RpcError):
+                    raise result
+        return results
+
+    def chain_id(self) -> int:
+        return int(self.request('eth_chainId'), 16)
+
+    def block_number(self) -> int:
+        return int(self.request('eth_blockNumber'), 16)
+
+    def get_block(self, block: BlockId = 'latest') -> Dict[str, Any]:
+        return self.request('eth_getBlockByNumber', [format_block(block), False])
+
+    def get_code(self, address: str, block: BlockId = 'latest') -> str:
+        return self.request('eth_getCode', [address, format_block(block)])
+
+    def get_storage_at(self, address: str, slot: int, block: BlockId = 'latest') -> str:
+        return self.request('eth_getStorageAt', [address, hex(slot), format_block(block)])
+
+    def get_logs(
+        self,
+        addresses: Sequence[str],
+        topics: Sequence[Any],
+        from_block: int,
+        to_block: int,
+        block_range: int = LOG_BLOCK_RANGE
+    ) -> List[Dict[str, Any]]:
+        """
+        Fetch the logs matching topics for many addresses over a block range, split
+        into block windows and address groups sent as JSON-RPC batches, sorted by
+        (blockNumber, logIndex).
+        """
+        groups = [
+            list(addresses[start:start + LOG_ADDRESS_LIMIT])
+            for start in range(0, len(addresses), LOG_ADDRESS_LIMIT)
+        ]
+        calls = [
+            ('eth_getLogs', [{
+                'address': group,
+                'topics': list(topics),
+                'fromBlock': hex(start),
+                'toBlock': hex(min(start + block_range - 1, to_block)),
+            }])
+            for start in range(from_block, to_block + 1, block_range)
+            for group in groups
+        ]
+        logs = [log for result in self.batch(calls) for log in result]
+        return sorted(logs, key=lambda log: (int(log['blockNumber'], 16), int(log['logIndex'], 16)))
+
+    def call(self, to: str, signature: str, *args: Any, block: BlockId = 'latest') -> Any:
+        """
+        Execute an eth_call against a cast-style signature and decode the result.
+        """
+        result = self.request(
+            'eth_call', [{'to': to, 'data': encode_call(signature, *args)}, format_block(block)])
+        return decode_result(signature, result)
+
+    def has_code(self, address: str, block: BlockId = 'latest') -> bool:
+        return self.get_code(address, block) not in ('0x', '0x0', None)
+
+    def multicall(
+        self,
+        calls: Sequence[Tuple[str, str, Sequence[Any]]],
+        block: BlockId = 'latest',
+        raise_errors: bool = False
+    ) -> List[Any]:
+        """
+        Execute many (to, signature, args) calls through Multicall3 tryAggregate,
+        falling back to plain JSON-RPC batching when Multicall3 is not deployed.
+        Failed or undecodable calls yield an RpcError unless raise_errors is set.
+        """
+        if not self.has_code(MULTICALL3_ADDRESS, block):
+            return self.call_many(calls, block, raise_errors)
+
+        chunks = [calls[start:start + MULTICALL_SIZE] for start in range(0, len(calls), MULTICALL_SIZE)]
+        answers = self.call_many(
+            [
+                (MULTICALL3_ADDRESS, MULTICALL3_TRY_AGGREGATE, (
+                    False,
+                    [(to, encode_call(signature, *args)) for to, signature, args in chunk]
+                ))
+                for chunk in chunks
+            ],
+            block
+        )
+
+        decoded = []
+        for (to, signature, _), (success, data) in zip(calls, itertools.chain.from_iterable(answers)):
+            try:
+                if not success:
+                    raise RpcError({'message': f'Call to {to} reverted: {signature}'})
+                try:
+                    decoded.append(decode_result(signature, '0x' + data.hex()))
+                except (ValueError, IndexError) as e:
+                    raise RpcError({'message': f'Undecodable result from {to}: {e}'})
+            except RpcError as e:
+                if raise_errors:
+                    raise
+                decoded.append(e)
+        return decoded
+
+    def call_many(
+        self,
+        calls: Sequence[Tuple[str, str, Sequence[Any]]],
+        block: BlockId = 'latest',
+        raise_errors: bool = True
+    ) -> List[Any]:
+        """
+        Execute several (to, signature, args) calls in one batch at the same block.
+        """
+        results = self.batch(
+            [
+                ('eth_call', [{'to': to, 'data': encode_call(signature, *args)}, format_block(block)])
+                for to, signature, args in calls
+            ],
+            raise_errors=raise_errors
+        )
+        decoded = []
+        for (_, signature, _), result in zip(calls, results):
+            if isinstance(result, RpcError):
+                decoded.append(result)
+                continue
+            try:
+                decoded.append(decode_result(signature, result))
+            except (ValueError, IndexError) as e:
+                if raise_errors:
+                    raise
+                decoded.append(RpcError({'message': f'Undecodable result: {e}'}))
+        return decoded
@@ -0,0 +1,150 @@
+"""
+Keccak-256 as used by Ethereum (and `cast keccak`), with a streaming interface.
+
+Note that this is the original Keccak padding, not the NIST SHA3-256 found in
+hashlib. A C-backed implementation is used when pycryptodome or pysha3 is
+installed; otherwise the pure-Python fallback below is used.
+"""
+from typing import Optional, Union
+
+try:
+    from Crypto.Hash import keccak as _pycryptodome_keccak
+except ImportError:
+    _pycryptodome_keccak = None
+
+try:
+    import sha3 as _pysha3
+except ImportError:
+    _pysha3 = None
+
+# Constants
+RATE = 136  # bytes absorbed per permutation for a 256-bit output
+DIGEST_SIZE = 32
+MASK_64 = (1 << 64) - 1
+ROUND_CONSTANTS = [
+    0x0000000000000001, 0x0000000000008082, 0x800000000000808A, 0x8000000080008000,
+    0x000000000000808B, 0x0000000080000001, 0x8000000080008081, 0x8000000000008009,
+    0x000000000000008A, 0x0000000000000088, 0x0000000080008009, 0x000000008000000A,
+    0x000000008000808B, 0x800000000000008B, 0x8000000000008089, 0x8000000000008003,
+    0x8000000000008002, 0x8000000000000080, 0x000000000000800A, 0x800000008000000A,
+    0x8000000080008081, 0x8000000000008080, 0x0000000080000001, 0x8000000080008008,
+]
+# Rotation offsets and destination lane of the combined rho and pi steps, indexed by x + 5 * y
+ROTATIONS = [
+    0, 1, 62, 28, 27,
+    36, 44, 6, 55, 20,
+    3, 10, 43, 25, 39,
+    41, 45, 15, 21, 8,
+    18, 2, 61, 56, 14,
+]
+PI_TARGETS = [y + 5 * ((2 * x + 3 * y) % 5) for y in range(5) for x in range(5)]
+RHO_PI = [
+    (PI_TARGETS[index], ROTATIONS[index], 64 - ROTATIONS[index])
+    for index in range(25)
+]
+
+
+def keccak_f1600(lanes: list) -> None:
+    """
+    Apply the Keccak-f[1600] permutation in place to 25 64-bit lanes.
+    """
+    b = [0] * 25
+    for round_constant in ROUND_CONSTANTS:
+        # theta
+        c0 = lanes[0] ^ lanes[5] ^ lanes[10] ^ lanes[15] ^ lanes[20]
+        c1 = lanes[1] ^ lanes[6] ^ lanes[11] ^ lanes[16] ^ lanes[21]
+        c2 = lanes[2] ^ lanes[7] ^ lanes[12] ^ lanes[17] ^ lanes[22]
+        c3 = lanes[3] ^ lanes[8] ^ lanes[13] ^ lanes[18] ^ lanes[23]
+        c4 = lanes[4] ^ lanes[9] ^ lanes[14] ^ lanes[19] ^ lanes[24]
+        d = (
+            c4 ^ (((c1 << 1) | (c1 >> 63)) & MASK_64),
+            c0 ^ (((c2 << 1) | (c2 >> 63)) & MASK_64),
+            c1 ^ (((c3 << 1) | (c3 >> 63)) & MASK_64),
+            c2 ^ (((c4 << 1) | (c4 >> 63)) & MASK_64),
+            c3 ^ (((c0 << 1) | (c0 >> 63)) & MASK_64),
+        )
+        # rho and pi
+        for index, (target, left, right) in enumerate(RHO_PI):
+            lane = lanes[index] ^ d[index % 5]
+            b[target] = ((lane << left) | (lane >> right)) & MASK_64 if left else lane
+        # chi
+        for row in range(0, 25, 5):
+            b0, b1, b2, b3, b4 = b[row], b[row + 1], b[row + 2], b[row + 3], b[row + 4]
+            lanes[row] = b0 ^ (~b1 & b2)
+            lanes[row + 1] = b1 ^ (~b2 & b3)
+            lanes[row + 2] = b2 ^ (~b3 & b4)
+            lanes[row + 3] = b3 ^ (~b4 & b0)
+            lanes[row + 4] = b4 ^ (~b0 & b1)
+        # iota
+        lanes[0] ^= round_constant
+
+
+class PureKeccak256:
+    """
+    Incremental pure-Python Keccak-256 with a hashlib-like interface.
+    """
+    name = 'keccak-256'
+    digest_size = DIGEST_SIZE
+    block_size = RATE
+    # Domain separation byte: 0x01 for Keccak, 0x06 would give NIST SHA3-256
+    padding = 0x01
+
+    def __init__(self, data: bytes = b''):
+        self._lanes = [0] * 25
+        self._buffer = bytearray()
+        self.update(data)
+
+    def _absorb(self, block: bytes) -> None:
+        lanes = self._lanes
+        for index in range(RATE // 8):
+            lanes[index] ^= int.from_bytes(block[8 * index:8 * index + 8], 'little')
+        keccak_f1600(lanes)
+
+    def update(self, data: bytes) -> None:
+        self._buffer += data
+        full = len(self._buffer) - len(self._buffer) % RATE
+        for start in range(0, full, RATE):
+            self._absorb(self._buffer[start:start + RATE])
+        del self._buffer[:full]
+
+    def copy(self) -> 'PureKeccak256':
+        clone = type(self)()
+        clone._lanes = list(self._lanes)
+        clone._buffer = bytearray(self._buffer)
+        return clone
+
+    def digest(self) -> bytes:
+        final = self.copy()
+        block = bytearray(final._buffer) + bytes([self.padding]) + b'\0' * (RATE - len(final._buffer) - 1)
+        block[-1] |= 0x80
+        final._absorb(bytes(block))
+        return b''.join(lane.to_bytes(8, 'little') for lane in final._lanes[:DIGEST_SIZE // 8])
+
+    def hexdigest(self) -> str:
+        return self.digest().hex()
+
+
+# Installed implementations by name, in order of preference
+BACKENDS = {}
+if _pycryptodome_keccak is not None:
+    BACKENDS['pycryptodome'] = lambda data=b'': _pycryptodome_keccak.new(data=data, digest_bits=256)
+if _pysha3 is not None:
+    BACKENDS['pysha3'] = _pysha3.keccak_256
+BACKENDS['pure'] = PureKeccak256
+
+
+def new(data: bytes = b'', backend: Optional[str] = None):
+    """
+    Create a Keccak-256 hash object, preferring a C-backed implementation
+    unless a backend is named.
+    """
+    return BACKENDS[backend or next(iter(BACKENDS))](data)
+
+
+def keccak256(data: Union[bytes, str], backend: Optional[str] = None) -> str:
+    """
+    Return the 0x-prefixed Keccak-256 hex digest of bytes or of a UTF-8 string.
+    """
+    if isinstance(data, str):
+        data = data.encode('utf-8')
+    return '0x' + new(data, backend).hexdigest()
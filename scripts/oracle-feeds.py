@@ -0,0 +1,330 @@
+#!/usr/bin/env python3
+"""
+Oracle Feed Monitor
+
+Reads every `PIP_*` oracle of the ChainLog at one block: whether it can be poked (`pass()`),
+its current and next price, and when it can be poked next. The oracle layout is detected
+per PIP: OSMs keep `cur`/`nxt` in storage slots 3/4, UNIV2LPOracles (recognized by `orb0()`)
+in slots 6/7, and plain value feeds are read through `peek()`.
+
+All calls go through one Multicall3 batch and all storage reads through one JSON-RPC batch,
+pinned to the same block. In watch mode the head is polled asynchronously and, for every
+new block, the ChainLog PIPs are listed again and only the feeds that changed are reported,
+including PIPs added to, removed from or repointed in the ChainLog.
+
+Usage:
+    ./oracle-feeds.py [--block <number>] [--sort name|current|next|change|poke] [--reverse] [--json]
+    ./oracle-feeds.py --watch [--interval <seconds>] [--json]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+from datetime import datetime, timezone
+from decimal import Decimal
+
+import requests
+
+from jsonrpc import CHAIN_NAMES, JsonRpcClient, RpcError
+from wards import resolve_chainlog
+
+# Constants
+PIP_PREFIX = 'PIP_'
+WAD = Decimal(10) ** 18
+# Storage slots of the `cur` and `nxt` feeds per layout
+FEED_SLOTS = {
+    'osm': (3, 4),
+    'lp': (6, 7),
+}
+DEFAULT_INTERVAL = 2.0
+SORT_KEYS = {
+    'name': lambda feed: feed['name'],
+    'current': lambda feed: feed['current'] or 0,
+    'next': lambda feed: feed['next'] or 0,
+    'change': lambda feed: abs(feed['change'] or 0),
+    'poke': lambda feed: feed['poke'] or 0,
+}
+WATCHED_FIELDS = ('address', 'pass', 'current', 'next', 'poke')
+TRANSIENT_ERRORS = (requests.exceptions.RequestException, RpcError)
+
+
+def find_pips(rpc, block):
+    return [(name, address) for name, address in resolve_chainlog(rpc, block) if name.startswith(PIP_PREFIX)]
+
+
+def detect_layouts(rpc, pips, block):
+    """Detect the storage layout of every PIP.
+
+    Returns:
+        list: 'osm', 'lp' or 'value' per PIP
+    """
+    results = rpc.multicall(
+        [call for _, address in pips for call in (
+            (address, 'pass()(bool)', ()),
+            (address, 'orb0()(address)', ()),
+        )],
+        block
+    )
+    layouts = []
+    for can_pass, orb0 in zip(results[0::2], results[1::2]):
+        if isinstance(can_pass, RpcError):
+            layouts.append('value')
+        elif isinstance(orb0, RpcError):
+            layouts.append('osm')
+        else:
+            layouts.append('lp')
+    return layouts
+
+
+def feed_value(slot):
+    """
+    Price of a packed Feed struct (`uint128 val, uint128 has`): the low 128 bits.
+    """
+    return Decimal(int(slot, 16) & ((1 << 128) - 1)) / WAD
+
+
+def read_feeds(rpc, pips, layouts, block):
+    """Read every PIP at a block.
+
+    Returns:
+        list: dicts with 'name', 'address', 'layout', 'pass', 'current', 'next', 'change'
+            (next vs current, in percent) and 'poke' (timestamp of the next possible poke)
+    """
+    calls, storage = [], []
+    for (_, address), layout in zip(pips, layouts):
+        if layout == 'value':
+            calls.append((address, 'peek()(bytes32,bool)', ()))
+        else:
+            calls += [
+                (address, 'pass()(bool)', ()),
+                (address, 'zzz()(uint64)', ()),
+                (address, 'hop()(uint16)', ()),
+            ]
+            storage += [('eth_getStorageAt', [address, hex(slot), hex(block)]) for slot in FEED_SLOTS[layout]]
+    results = iter(rpc.multicall(calls, block))
+    slots = iter(rpc.batch(storage))
+
+    feeds = []
+    for (name, address), layout in zip(pips, layouts):
+        feed = {'name': name, 'address': address, 'layout': layout, 'pass': None, 'poke': None}
+        if layout == 'value':
+            peek = next(results)
+            value = None if isinstance(peek, RpcError) or not peek[1] else Decimal(int(peek[0], 16)) / WAD
+            feed.update(current=value, next=value)
+        else:
+            can_pass, zzz, hop = next(results), next(results), next(results)
+            feed['pass'] = None if isinstance(can_pass, RpcError) else can_pass
+            if not isinstance(zzz, RpcError) and not isinstance(hop, RpcError):
+                feed['poke'] = zzz + hop
+            feed.update(current=feed_value(next(slots)), next=feed_value(next(slots)))
+        current, upcoming = feed['current'], feed['next']
+        feed['change'] = (upcoming - current) / current * 100 if current and upcoming is not None else None
+        feeds.append(feed)
+    return feeds
+
+
+def format_price(value):
+    return '-' if value is None else f'{value:.6f}'
+
+
+def format_time(timestamp):
+    if not timestamp:
+        return '-'
+    return datetime.fromtimestamp(timestamp, timezone.utc).strftime('%Y-%m-%d %H:%M')
+
+
+def to_json(feed):
+    return {
+        **feed,
+        'current': None if feed['current'] is None else str(feed['current']),
+        'next': None if feed['next'] is None else str(feed['next']),
+        'change': None if feed['change'] is None else round(float(feed['change']), 4),
+    }
+
+
+def print_table(feeds):
+    rows = [('PIP', 'LAYOUT', 'PASS', 'CURRENT', 'NEXT', 'CHANGE', 'NEXT POKE (UTC)')]
+    for feed in feeds:
+        rows.append((
+            feed['name'],
+            feed['layout'],
+            '-' if feed['pass'] is None else str(feed['pass']).lower(),
+            format_price(feed['current']),
+            format_price(feed['next']),
+            '-' if feed['change'] is None else f"{feed['change']:+.2f}%",
+            format_time(feed['poke']),
+        ))
+    widths = [max(len(row[column]) for row in rows) for column in range(len(rows[0]))]
+    for row in rows:
+        print('  '.join(
+            cell.ljust(width) if column < 3 else cell.rjust(width)
+            for column, (cell, width) in enumerate(zip(row, widths))
+        ).rstrip())
+
+
+def diff_feeds(previous, feeds):
+    """
+    Changes between two readings, as (name, field, old, new); new and removed PIPs use
+    the field 'pip'.
+    """
+    before = {feed['name']: feed for feed in previous}
+    after = {feed['name']: feed for feed in feeds}
+    changes = [(name, 'pip', 'removed', None) for name in before if name not in after]
+    for name, feed in after.items():
+        if name not in before:
+            changes.append((name, 'pip', None, 'added'))
+            continue
+        for field in WATCHED_FIELDS:
+            if feed[field] != before[name][field]:
+                changes.append((name, field, before[name][field], feed[field]))
+    return changes
+
+
+def format_change(value, field):
+    if field in ('current', 'next'):
+        return format_price(value)
+    if field == 'poke':
+        return format_time(value)
+    if field == 'address':
+        return str(value)
+    return str(value).lower()
+
+
+def read_chainlog_feeds(rpc, layouts, block):
+    """Read the feeds of the PIPs in the ChainLog at a block.
+
+    Args:
+        layouts (dict): Layout per PIP address, extended with the PIPs not seen before
+    """
+    pips = find_pips(rpc, block)
+    added = [(name, address) for name, address in pips if address not in layouts]
+    if added:
+        layouts.update(zip((address for _, address in added), detect_layouts(rpc, added, block)))
+    return read_feeds(rpc, pips, [layouts[address] for _, address in pips], block)
+
+
+async def watch(rpc, interval, as_json):
+    """
+    Poll the head every `interval` seconds and report what changed at every new block.
+    Block polling keeps running while a reading is in flight; blocks that arrive during
+    a reading are coalesced into the latest one. Failed polls and readings are reported
+    and retried at the next interval or block.
+    """
+    latest = {'block': await asyncio.to_thread(rpc.block_number)}
+    arrived = asyncio.Event()
+
+    async def poll_head():
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                block = await asyncio.to_thread(rpc.block_number)
+            except TRANSIENT_ERRORS as e:
+                print(f"Polling the head failed: {e}", file=sys.stderr)
+                continue
+            if block > latest['block']:
+                latest['block'] = block
+                arrived.set()
+
+    poller = asyncio.create_task(poll_head())
+    try:
+        block = latest['block']
+        layouts = {}
+        feeds = await asyncio.to_thread(read_chainlog_feeds, rpc, layouts, block)
+        print(f"Watching {len(feeds)} feeds from block {block}", file=sys.stderr)
+        while True:
+            await arrived.wait()
+            arrived.clear()
+            block = latest['block']
+            try:
+                current = await asyncio.to_thread(read_chainlog_feeds, rpc, layouts, block)
+            except TRANSIENT_ERRORS as e:
+                print(f"Reading block {block} failed: {e}", file=sys.stderr)
+                continue
+            for name, field, old, new in diff_feeds(feeds, current):
+                if as_json:
+                    print(json.dumps({'block': block, 'pip': name, 'field': field,
+                                      'old': format_change(old, field), 'new': format_change(new, field)}))
+                else:
+                    print(f"{block} {name} {field}: {format_change(old, field)} -> {format_change(new, field)}")
+            sys.stdout.flush()
+            feeds = current
+    finally:
+        poller.cancel()
+
+
+def parse_arguments():
+    """Parse command line arguments.
+
+    Returns:
+        argparse.Namespace: The parsed arguments
+    """
+    parser = argparse.ArgumentParser(description="Read every PIP oracle of the ChainLog at one block")
+    parser.add_argument(
+        "--block",
+        type=int,
+        help="Block number to read at (default: latest)"
+    )
+    parser.add_argument(
+        "--sort",
+        choices=sorted(SORT_KEYS),
+        default="name",
+        help="Column to sort the table by (default: name)"
+    )
+    parser.add_argument(
+        "--reverse",
+        action="store_true",
+        help="Sort in descending order"
+    )
+    parser.add_argument(
+        "--json",
+        action="store_true",
+        help="Print JSON instead of a table"
+    )
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="Keep polling and report the changes at every new block"
+    )
+    parser.add_argument(
+        "--interval",
+        type=float,
+        default=DEFAULT_INTERVAL,
+        help=f"Seconds between head polls in watch mode (default: {DEFAULT_INTERVAL})"
+    )
+    return parser.parse_args()
+
+
+def main():
+    """Main function to print or watch the oracle feeds."""
+    args = parse_arguments()
+
+    if not os.environ.get('ETH_RPC_URL'):
+        sys.exit("Please set a ETH_RPC_URL")
+
+    with JsonRpcClient() as rpc:
+        if args.watch:
+            try:
+                asyncio.run(watch(rpc, args.interval, args.json))
+            except KeyboardInterrupt:
+                pass
+            return
+
+        chain_id = rpc.chain_id()
+        block = args.block if args.block is not None else rpc.block_number()
+        pips = find_pips(rpc, block)
+        feeds = read_feeds(rpc, pips, detect_layouts(rpc, pips, block), block)
+        feeds.sort(key=SORT_KEYS[args.sort], reverse=args.reverse)
+
+        if args.json:
+            print(json.dumps({'block': block, 'feeds': [to_json(feed) for feed in feeds]}, indent=2))
+            return
+        print(f"Network: {CHAIN_NAMES.get(chain_id, chain_id)}")
+        print(f"Block: {block}")
+        print_table(feeds)
+
+
+# Execute the main function if this script is run directly
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,423 @@
+#!/usr/bin/env python3
+"""
+Archive Pack Store
+
+Content-addressed storage for archive/: every distinct file is stored once as a blob named
+by its sha256 under archive/.store/objects, and each archived spell is a manifest under
+archive/.store/manifests/<name>.json mapping its relative paths to blobs.
+
+ArchiveStore reads both layouts: spells already migrated to the store and plain
+`archive/<name>/` directories, so archive-wide tools work before, during and after a migration.
+
+Usage:
+    ./packstore.py ls
+    ./packstore.py cat <name> <path>
+    ./packstore.py checkout <name> [<dest>]
+    ./packstore.py add <source dir> <name>
+    ./packstore.py migrate [<name> ...] [--keep] [--dry-run]
+    ./packstore.py verify
+    ./packstore.py stats
+"""
+
+import argparse
+import hashlib
+import json
+import mmap
+import os
+import shutil
+import stat
+import sys
+
+# Constants
+ARCHIVE_DIR = 'archive'
+STORE_DIRNAME = '.store'
+CHUNK_SIZE = 1 << 16
+INDEX_PATH = os.path.join(os.environ.get('SPELLS_CACHE_DIR', '.cache'), 'archive', 'index.json')
+
+
+def hash_file(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def walk_files(directory):
+    """
+    Relative paths of every regular file under a directory, '/'-separated and sorted.
+    """
+    found = []
+    for root, dirs, files in os.walk(directory):
+        dirs.sort()
+        for name in files:
+            path = os.path.join(root, name)
+            found.append(os.path.relpath(path, directory).replace(os.sep, '/'))
+    return sorted(found)
+
+
+def tree_signature(directory):
+    """
+    Cheap change marker of a directory tree: the latest mtime and the total size of its entries.
+    """
+    latest, total, count = os.stat(directory).st_mtime_ns, 0, 0
+    for root, dirs, files in os.walk(directory):
+        for name in dirs + files:
+            info = os.stat(os.path.join(root, name))
+            latest = max(latest, info.st_mtime_ns)
+            total += info.st_size
+            count += 1
+    return f'{latest}:{total}:{count}'
+
+
+def tree_digest(files):
+    """
+    Digest of a whole tree from its {relative path: sha256} map, for exact-match lookups.
+    """
+    digest = hashlib.sha256()
+    for relative in sorted(files):
+        digest.update(f'{relative}\0{files[relative]}\n'.encode())
+    return digest.hexdigest()
+
+
+def hash_tree(directory):
+    return {relative: hash_file(os.path.join(directory, relative)) for relative in walk_files(directory)}
+
+
+def load_file_index(store, path=INDEX_PATH):
+    """Bring the on-disk per-file hash index of every archived spell up to date.
+
+    Only loose directories whose tree signature changed are re-hashed; packed spells
+    take their hashes from the store manifest.
+
+    Args:
+        store (ArchiveStore): The archive to index
+        path (str): Location of the index
+
+    Returns:
+        tuple: (index {name: {'signature', 'files', 'digest'}}, number of re-hashed entries)
+    """
+    try:
+        with open(path) as f:
+            index = json.load(f)
+    except (FileNotFoundError, ValueError):
+        index = {}
+
+    updated, refreshed = {}, 0
+    for name in store.names():
+        if store.is_packed(name):
+            signature = f'packed:{os.stat(store.manifest_path(name)).st_mtime_ns}'
+        else:
+            signature = tree_signature(os.path.join(store.root, name))
+        cached = index.get(name)
+        if cached and cached['signature'] == signature:
+            updated[name] = cached
+            continue
+        if store.is_packed(name):
+            files = {relative: entry['sha256'] for relative, entry in store.manifest(name).items()}
+        else:
+            files = hash_tree(os.path.join(store.root, name))
+        updated[name] = {'signature': signature, 'files': files, 'digest': tree_digest(files)}
+        refreshed += 1
+
+    if refreshed or len(updated) != len(index):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path + '.tmp', 'w') as f:
+            json.dump(updated, f, separators=(',', ':'))
+        os.replace(path + '.tmp', path)
+    return updated, refreshed
+
+
+class ArchiveStore:
+    """
+    Reader and writer for archived spells, packed or loose.
+    """
+
+    def __init__(self, root=ARCHIVE_DIR):
+        self.root = root
+        self.store = os.path.join(root, STORE_DIRNAME)
+        self.objects = os.path.join(self.store, 'objects')
+        self.manifests = os.path.join(self.store, 'manifests')
+        self._manifest_cache = {}
+
+    def blob_path(self, digest):
+        return os.path.join(self.objects, digest[:2], digest[2:])
+
+    def manifest_path(self, name):
+        return os.path.join(self.manifests, f'{name}.json')
+
+    def packed_names(self):
+        try:
+            return sorted(entry[:-len('.json')] for entry in os.listdir(self.manifests) if entry.endswith('.json'))
+        except FileNotFoundError:
+            return []
+
+    def loose_names(self):
+        try:
+            return sorted(
+                entry.name for entry in os.scandir(self.root)
+                if entry.is_dir() and not entry.name.startswith('.')
+            )
+        except FileNotFoundError:
+            return []
+
+    def names(self):
+        """
+        Every archived spell, whichever layout it is stored in.
+        """
+        return sorted(set(self.packed_names()) | set(self.loose_names()))
+
+    def is_packed(self, name):
+        return os.path.exists(self.manifest_path(name))
+
+    def manifest(self, name):
+        """Return the files of an archived spell.
+
+        Args:
+            name (str): Archive directory name (e.g. 2024-01-25-DssSpell)
+
+        Returns:
+            dict: {relative path: {'sha256', 'size', 'executable'}}; loose spells are hashed on the fly
+
+        Raises:
+            KeyError: If no spell is archived under that name
+        """
+        if name in self._manifest_cache:
+            return self._manifest_cache[name]
+        if self.is_packed(name):
+            with open(self.manifest_path(name)) as f:
+                files = json.load(f)['files']
+        elif os.path.isdir(os.path.join(self.root, name)):
+            directory = os.path.join(self.root, name)
+            files = {}
+            for relative in walk_files(directory):
+                path = os.path.join(directory, relative)
+                info = os.stat(path)
+                files[relative] = {
+                    'sha256': hash_file(path),
+                    'size': info.st_size,
+                    'executable': bool(info.st_mode & stat.S_IXUSR),
+                }
+        else:
+            raise KeyError(name)
+        self._manifest_cache[name] = files
+        return files
+
+    def files(self, name):
+        if self.is_packed(name):
+            return sorted(self.manifest(name))
+        return walk_files(os.path.join(self.root, name))
+
+    def locate(self, name, relative):
+        """
+        Filesystem path holding the content of a file of an archived spell.
+        """
+        if self.is_packed(name):
+            entry = self.manifest(name).get(relative)
+            if entry is None:
+                raise FileNotFoundError(f'{name}/{relative}')
+            return self.blob_path(entry['sha256'])
+        return os.path.join(self.root, name, *relative.split('/'))
+
+    def exists(self, name, relative):
+        if self.is_packed(name):
+            return relative in self.manifest(name)
+        return os.path.isfile(os.path.join(self.root, name, *relative.split('/')))
+
+    def read(self, name, relative):
+        with open(self.locate(name, relative), 'rb') as f:
+            return f.read()
+
+    def read_text(self, name, relative):
+        return self.read(name, relative).decode('utf-8')
+
+    def mmap(self, name, relative):
+        """
+        Read-only memory map of an archived file (bytes for empty files, which cannot be mapped).
+        """
+        with open(self.locate(name, relative), 'rb') as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return b''
+            return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def add(self, source, name):
+        """Pack a directory into the store under a name.
+
+        Args:
+            source (str): Directory to archive (e.g. src)
+            name (str): Archive name (e.g. 2024-01-25-DssSpell)
+
+        Returns:
+            tuple: (manifest files, number of new blobs written)
+
+        Raises:
+            NotADirectoryError: If the source is not a directory
+        """
+        if not os.path.isdir(source):
+            raise NotADirectoryError(source)
+        files, written = {}, 0
+        for relative in walk_files(source):
+            path = os.path.join(source, relative)
+            digest = hash_file(path)
+            info = os.stat(path)
+            blob = self.blob_path(digest)
+            if not os.path.exists(blob):
+                os.makedirs(os.path.dirname(blob), exist_ok=True)
+                shutil.copyfile(path, blob + '.tmp')
+                os.replace(blob + '.tmp', blob)
+                written += 1
+            files[relative] = {
+                'sha256': digest,
+                'size': info.st_size,
+                'executable': bool(info.st_mode & stat.S_IXUSR),
+            }
+        os.makedirs(self.manifests, exist_ok=True)
+        path = self.manifest_path(name)
+        with open(path + '.tmp', 'w') as f:
+            json.dump({'files': files}, f, indent=1, sort_keys=True)
+            f.write('\n')
+        os.replace(path + '.tmp', path)
+        self._manifest_cache.pop(name, None)
+        return files, written
+
+    def materialize(self, name, dest):
+        """
+        Write the files of an archived spell to a directory.
+        """
+        for relative, entry in self.manifest(name).items():
+            path = os.path.join(dest, *relative.split('/'))
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            shutil.copyfile(self.locate(name, relative), path)
+            if entry['executable']:
+                os.chmod(path, os.stat(path).st_mode | stat.S_IXUSR | stat.S_IXGRP | stat.S_IXOTH)
+
+    def migrate(self, name, keep=False):
+        """Move a loose archive directory into the store.
+
+        The directory is removed only after every file was read back from the store
+        with a matching hash.
+
+        Returns:
+            int: The number of new blobs written
+
+        Raises:
+            ValueError: If the packed copy does not match the directory
+        """
+        directory = os.path.join(self.root, name)
+        files, written = self.add(directory, name)
+        for relative, entry in files.items():
+            if hash_file(self.blob_path(entry['sha256'])) != entry['sha256']:
+                raise ValueError(f'Packed copy of {name}/{relative} does not match')
+        if not keep:
+            shutil.rmtree(directory)
+        return written
+
+    def verify(self):
+        """
+        Check that every manifest entry points to a blob whose content matches its name.
+        """
+        problems, checked = [], {}
+        for name in self.packed_names():
+            for relative, entry in self.manifest(name).items():
+                digest = entry['sha256']
+                if digest not in checked:
+                    blob = self.blob_path(digest)
+                    checked[digest] = os.path.exists(blob) and hash_file(blob) == digest
+                if not checked[digest]:
+                    problems.append(f'{name}/{relative}: missing or corrupt blob {digest}')
+        return problems
+
+
+def parse_arguments():
+    """Parse command line arguments.
+
+    Returns:
+        argparse.Namespace: The parsed arguments
+    """
+    parser = argparse.ArgumentParser(description="Content-addressed archive store")
+    parser.add_argument("--root", default=ARCHIVE_DIR, help=f"Archive directory (default: {ARCHIVE_DIR})")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("ls", help="List archived spells and their layout")
+    cat = commands.add_parser("cat", help="Print an archived file")
+    cat.add_argument("name")
+    cat.add_argument("path")
+    checkout = commands.add_parser("checkout", help="Materialize an archived spell")
+    checkout.add_argument("name")
+    checkout.add_argument("dest", nargs="?", help="Destination directory (default: out/archive/<name>)")
+    add = commands.add_parser("add", help="Pack a directory into the store")
+    add.add_argument("source")
+    add.add_argument("name")
+    migrate = commands.add_parser("migrate", help="Move loose archive directories into the store")
+    migrate.add_argument("names", nargs="*", help="Archive names (default: every loose directory)")
+    migrate.add_argument("--keep", action="store_true", help="Keep the loose directories")
+    migrate.add_argument("--dry-run", action="store_true", help="Only report the expected savings")
+    commands.add_parser("verify", help="Check every blob against its hash")
+    commands.add_parser("stats", help="Compare the logical and stored sizes")
+    return parser.parse_args()
+
+
+def main():
+    """Main function to manage the archive store."""
+    args = parse_arguments()
+    store = ArchiveStore(args.root)
+
+    if args.command == 'ls':
+        for name in store.names():
+            print(f"{name}\t{'packed' if store.is_packed(name) else 'loose'}")
+    elif args.command == 'cat':
+        try:
+            sys.stdout.buffer.write(store.read(args.name, args.path))
+        except (KeyError, FileNotFoundError):
+            sys.exit(f"No {args.path} archived in {args.name}")
+    elif args.command == 'checkout':
+        dest = args.dest or os.path.join('out', 'archive', args.name)
+        try:
+            store.materialize(args.name, dest)
+        except KeyError:
+            sys.exit(f"No archived spell named {args.name}")
+        print(f"Materialized {args.name} in {dest}")
+    elif args.command == 'add':
+        try:
+            files, written = store.add(args.source, args.name)
+        except NotADirectoryError:
+            sys.exit(f"{args.source} is not a directory")
+        print(f"Packed {len(files)} files of {args.source} as {args.name} ({written} new blobs)")
+    elif args.command == 'migrate':
+        names = args.names or [name for name in store.loose_names() if not store.is_packed(name)]
+        if args.dry_run:
+            seen, logical, stored = set(), 0, 0
+            for name in names:
+                for entry in store.manifest(name).values():
+                    logical += entry['size']
+                    if entry['sha256'] not in seen and not os.path.exists(store.blob_path(entry['sha256'])):
+                        seen.add(entry['sha256'])
+                        stored += entry['size']
+            print(f"{len(names)} directories, {logical} bytes, {stored} bytes of new blobs")
+            return
+        for name in names:
+            try:
+                written = store.migrate(name, keep=args.keep)
+            except NotADirectoryError:
+                sys.exit(f"No loose archive directory named {name}")
+            print(f"Migrated {name} ({written} new blobs)")
+    elif args.command == 'verify':
+        problems = store.verify()
+        for problem in problems:
+            print(problem)
+        if problems:
+            sys.exit(1)
+        print(f"All blobs of {len(store.packed_names())} packed spells match")
+    elif args.command == 'stats':
+        digests, logical = {}, 0
+        for name in store.names():
+            for entry in store.manifest(name).values():
+                logical += entry['size']
+                digests[entry['sha256']] = entry['size']
+        print(f"{len(store.names())} spells, {sum(len(store.manifest(name)) for name in store.names())} files, "
+              f"{len(digests)} distinct blobs")
+        print(f"{logical} bytes logical, {sum(digests.values())} bytes deduplicated")
+
+
+# Execute the main function if this script is run directly
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,585 @@
+#!/usr/bin/env python3
+"""
+Rates Table
+
+Computes the per-second ray rate for an annual percentage exactly as
+`bc -l <<< "scale=27; e( l(1 + bps/10000)/(60 * 60 * 24 * 365) ) * 10^27"` does,
+by replaying bc's `l()` and `e()` library functions with its truncating fixed-scale
+arithmetic on Python integers. The full 0.00% - 100.00% table is evaluated in one
+pass and cached on disk.
+
+Usage:
+    ./rates.py                  list all rates from 0 to 100% with granularity of 0.01%
+    ./rates.py <pct>            return the computed rate (e.g. 4.25)
+    ./rates.py --check          validate every entry of src/test/rates.sol
+    ./rates.py --solidity [--add <pct> ...] [--write]
+                                regenerate (and extend) the Rates mapping in src/test/rates.sol
+    ./rates.py --lookup <ray> ... | - [--all]
+                                find the rates.sol entry (or the nearest ones) of ray rates,
+                                reading them from stdin with `-`
+    ./rates.py --spell src/DssSpell.sol [--all]
+                                look up every ray rate literal of a spell
+    ./rates.py --audit          check every archived rates.sol against the formula
+"""
+
+import argparse
+import bisect
+import hashlib
+import json
+import os
+import re
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from decimal import Decimal, localcontext
+
+from packstore import ArchiveStore
+
+# Constants
+SCALE = 27
+SECONDS_PER_YEAR = 60 * 60 * 24 * 365
+MAX_BPS = 10000
+RATES_SOL_PATH = 'src/test/rates.sol'
+RATES_ENTRY_PATTERN = re.compile(r'rates\[\s*(\d+)\]\s*=\s*(\d+);')
+RATES_LINE_FORMAT = '        rates[{bps:5d}] = {rate};'
+PERCENTAGE_PATTERN = re.compile(r'^(0|[1-9][0-9]?|100)(\.[0-9]{1,2})?$')
+# Ray literals in a spell, optionally preceded by the name or the file() key they are assigned to
+SPELL_RATE_PATTERN = re.compile(r'(?:(\w+)\s*=\s*|"(\w+)"\s*,\s*)?\b(1[0-9_]{26,})\b')
+ARCHIVE_RATES_PATH = 'test/rates.sol'
+CACHE_DIR = os.path.join(os.environ.get('SPELLS_CACHE_DIR', '.cache'), 'rates')
+CACHE_PATH = os.path.join(CACHE_DIR, 'table.json')
+AUDIT_CACHE_PATH = os.path.join(CACHE_DIR, 'audit.json')
+# Bump when the evaluation changes so stale cached tables are recomputed
+CACHE_VERSION = 1
+
+
+class BcNumber:
+    """
+    A bc number: an integer mantissa with a decimal scale, value = mantissa / 10^scale.
+    Operations follow bc's scale rules and truncate toward zero like bc does.
+    """
+    __slots__ = ('mantissa', 'scale')
+
+    def __init__(self, mantissa, scale=0):
+        self.mantissa = mantissa
+        self.scale = scale
+
+    def rescale(self, scale):
+        if scale >= self.scale:
+            return BcNumber(self.mantissa * 10 ** (scale - self.scale), scale)
+        quotient = abs(self.mantissa) // 10 ** (self.scale - scale)
+        return BcNumber(quotient if self.mantissa >= 0 else -quotient, scale)
+
+    def add(self, other):
+        scale = max(self.scale, other.scale)
+        return BcNumber(self.rescale(scale).mantissa + other.rescale(scale).mantissa, scale)
+
+    def sub(self, other):
+        return self.add(BcNumber(-other.mantissa, other.scale))
+
+    def mul(self, other, scale):
+        product = BcNumber(self.mantissa * other.mantissa, self.scale + other.scale)
+        return product.rescale(min(product.scale, max(scale, self.scale, other.scale)))
+
+    def div(self, other, scale):
+        numerator = self.mantissa * 10 ** (scale + other.scale)
+        denominator = other.mantissa * 10 ** self.scale
+        quotient = abs(numerator) // abs(denominator)
+        return BcNumber(quotient if (numerator >= 0) == (denominator > 0) else -quotient, scale)
+
+    def sqrt(self, scale):
+        scale = max(scale, self.scale)
+        return BcNumber(isqrt(self.rescale(2 * scale).mantissa), scale)
+
+    def compare(self, value):
+        scale = max(self.scale, value.scale)
+        return (self.rescale(scale).mantissa > value.rescale(scale).mantissa) - \
+            (self.rescale(scale).mantissa < value.rescale(scale).mantissa)
+
+    def is_zero(self):
+        return self.mantissa == 0
+
+
+def isqrt(value):
+    # math.isqrt needs Python 3.8
+    if value < 2:
+        return value
+    root = 1 << ((value.bit_length() + 1) // 2)
+    while True:
+        next_root = (root + value // root) // 2
+        if next_root >= root:
+            return root
+        root = next_root
+
+
+ONE = BcNumber(1)
+TWO = BcNumber(2)
+HALF = BcNumber(5, 1)
+
+
+def bc_l(x, scale):
+    """
+    Natural logarithm, a transcription of `l(x)` from bc's math library.
+    """
+    z = scale
+    scale = 6 + scale
+    f = TWO
+    while x.compare(TWO) >= 0:
+        f = f.mul(TWO, scale)
+        x = x.sqrt(scale)
+    while x.compare(HALF) <= 0:
+        f = f.mul(TWO, scale)
+        x = x.sqrt(scale)
+
+    v = n = x.sub(ONE).div(x.add(ONE), scale)
+    m = n.mul(n, scale)
+    i = 3
+    while True:
+        n = n.mul(m, scale)
+        e = n.div(BcNumber(i), scale)
+        if e.is_zero():
+            return f.mul(v, scale).div(ONE, z)
+        v = v.add(e)
+        i += 2
+
+
+def bc_e(x, scale):
+    """
+    Exponential, a transcription of `e(x)` from bc's math library.
+    """
+    negative = x.mantissa < 0
+    if negative:
+        x = BcNumber(-x.mantissa, x.scale)
+
+    z = scale
+    n = 6 + z + BcNumber(44, 2).mul(x, scale).rescale(0).mantissa
+    scale = x.scale + 1
+    f = 0
+    while x.compare(ONE) > 0:
+        f += 1
+        x = x.div(TWO, scale)
+        scale += 1
+
+    scale = n
+    v = ONE.add(x)
+    a = x
+    d = ONE
+    i = 2
+    while True:
+        a = a.mul(x, scale)
+        d = d.mul(BcNumber(i), scale)
+        e = a.div(d, scale)
+        if e.is_zero():
+            for _ in range(f):
+                v = v.mul(v, scale)
+            return ONE.div(v, z) if negative else v.div(ONE, z)
+        v = v.add(e)
+        i += 1
+
+
+def compute_rate(bps):
+    """Compute the ray per-second rate of an annual rate in basis points.
+
+    Args:
+        bps (int): Annual rate in basis points (425 for 4.25%)
+
+    Returns:
+        int: The rate as printed by bc (the integer part of the scaled bc result)
+    """
+    normalized = BcNumber(bps, 4).add(ONE)
+    per_second = bc_l(normalized, SCALE).div(BcNumber(SECONDS_PER_YEAR), SCALE)
+    rate = bc_e(per_second, SCALE)
+    return rate.mul(BcNumber(10 ** SCALE), SCALE).rescale(0).mantissa
+
+
+def load_table():
+    """Return the rates for every basis point from 0 to MAX_BPS, cached on disk.
+
+    Returns:
+        list: rates indexed by basis points
+    """
+    try:
+        with open(CACHE_PATH) as f:
+            cached = json.load(f)
+        if cached.get('version') == CACHE_VERSION and len(cached['rates']) == MAX_BPS + 1:
+            return [int(rate) for rate in cached['rates']]
+    except (FileNotFoundError, ValueError, KeyError):
+        pass
+
+    table = [compute_rate(bps) for bps in range(MAX_BPS + 1)]
+    os.makedirs(os.path.dirname(CACHE_PATH), exist_ok=True)
+    with open(CACHE_PATH + '.tmp', 'w') as f:
+        json.dump({'version': CACHE_VERSION, 'rates': [str(rate) for rate in table]}, f)
+    os.replace(CACHE_PATH + '.tmp', CACHE_PATH)
+    return table
+
+
+def get_rate(bps, table=None):
+    if table is not None and 0 <= bps <= MAX_BPS:
+        return table[bps]
+    return compute_rate(bps)
+
+
+def parse_percentage(value):
+    """Convert a percentage such as '4.25' to basis points.
+
+    Raises:
+        ValueError: If the value is not a percentage between 0 and 100 with up to 2 decimals
+    """
+    if not PERCENTAGE_PATTERN.match(value):
+        raise ValueError(f"Invalid percentage: {value}")
+    whole, _, fraction = value.partition('.')
+    return int(whole) * 100 + int(fraction.ljust(2, '0') or 0)
+
+
+def format_percentage(bps):
+    return f"{bps // 100}.{bps % 100:02d}"
+
+
+def parse_rates_sol(text):
+    """Parse the entries of a Rates contract.
+
+    Args:
+        text (str): Solidity source of a rates.sol
+
+    Returns:
+        dict: rate by basis points
+    """
+    return {int(bps): int(rate) for bps, rate in RATES_ENTRY_PATTERN.findall(text)}
+
+
+def read_rates_sol(path=RATES_SOL_PATH):
+    with open(path) as f:
+        return parse_rates_sol(f.read())
+
+
+def render_rates_sol(text, entries):
+    """Replace the mapping entries of a Rates contract, keeping everything around them.
+
+    Args:
+        text (str): Current Solidity source of rates.sol
+        entries (dict): rate by basis points
+
+    Returns:
+        str: The updated source with one entry per line, sorted by basis points
+    """
+    lines = text.splitlines(keepends=True)
+    positions = [index for index, line in enumerate(lines) if RATES_ENTRY_PATTERN.search(line)]
+    if not positions:
+        raise ValueError("No rates entries found")
+    body = ''.join(
+        RATES_LINE_FORMAT.format(bps=bps, rate=rate) + '\n'
+        for bps, rate in sorted(entries.items())
+    )
+    return ''.join(lines[:positions[0]]) + body + ''.join(lines[positions[-1] + 1:])
+
+
+def check_rates_sol(path, table):
+    """Compare every entry of a rates.sol against the formula.
+
+    Returns:
+        list: (bps, expected, actual) for every mismatching entry
+    """
+    return [
+        (bps, get_rate(bps, table), rate)
+        for bps, rate in sorted(read_rates_sol(path).items())
+        if get_rate(bps, table) != rate
+    ]
+
+
+class RateIndex:
+    """
+    Sorted index over a rates table for reverse lookups of ray per-second rates.
+    """
+
+    def __init__(self, entries):
+        # Rates grow with basis points, sorting by rate keeps them aligned
+        pairs = sorted((rate, bps) for bps, rate in entries.items())
+        self.rates = [rate for rate, _ in pairs]
+        self.bps = [bps for _, bps in pairs]
+
+    def lookup(self, value):
+        """Find a ray rate in the table.
+
+        Args:
+            value (int): The ray per-second rate
+
+        Returns:
+            tuple: (exact bps or None, (bps, rate) just below or None, (bps, rate) just above or None)
+        """
+        position = bisect.bisect_left(self.rates, value)
+        if position < len(self.rates) and self.rates[position] == value:
+            return self.bps[position], None, None
+        below = (self.bps[position - 1], self.rates[position - 1]) if position > 0 else None
+        above = (self.bps[position], self.rates[position]) if position < len(self.rates) else None
+        return None, below, above
+
+
+def annual_percentage(value):
+    """
+    Approximate annual percentage of a ray per-second rate, for rates that are not in the table.
+    """
+    with localcontext() as context:
+        context.prec = 50
+        yearly = ((Decimal(value) / Decimal(10) ** SCALE).ln() * SECONDS_PER_YEAR).exp()
+        return (yearly - 1) * 100
+
+
+def parse_spell_rates(text):
+    """Extract the ray rate literals of a spell.
+
+    Args:
+        text (str): Solidity source of a spell
+
+    Returns:
+        list: (label, value) pairs where label is the assigned name, the file() key or the line number
+    """
+    found = []
+    for number, line in enumerate(text.splitlines(), start=1):
+        for name, key, literal in SPELL_RATE_PATTERN.findall(line):
+            digits = literal.replace('_', '')
+            if len(digits) == SCALE + 1:
+                found.append((name or key or f"line {number}", int(digits)))
+    return found
+
+
+def describe_lookup(index, value):
+    """
+    One-line description of where a ray rate falls in the index.
+    """
+    exact, below, above = index.lookup(value)
+    if exact is not None:
+        return f"{format_percentage(exact)}% (rates[{exact}])"
+    parts = ["no exact match"]
+    if value > 0:
+        parts[0] += f", ~{annual_percentage(value):.4f}%"
+    if below is not None:
+        parts.append(f"+{value - below[1]} above {format_percentage(below[0])}%")
+    if above is not None:
+        parts.append(f"-{above[1] - value} below {format_percentage(above[0])}%")
+    return '; '.join(parts)
+
+
+def hash_file(path):
+    with open(path, 'rb') as f:
+        return path, hashlib.sha256(f.read()).hexdigest()
+
+
+def parse_file(path):
+    return read_rates_sol(path)
+
+
+def audit_archive(table, workers=None):
+    """Check every archived rates.sol against the formula.
+
+    Files are hashed and parsed in a process pool, identical files are parsed once,
+    and every distinct (bps, rate) entry is checked once. Packed archives take their
+    content hash from the store manifest; loose file hashes (keyed by mtime and size)
+    and parsed entries (keyed by content hash) are cached on disk.
+
+    Args:
+        table (list): rates indexed by basis points, from load_table
+        workers (int): Process pool size (default: CPU count)
+
+    Returns:
+        tuple: (number of files, number of distinct files, number of distinct entries,
+            list of (bps, rate, expected, dates) for every wrong entry)
+    """
+    try:
+        with open(AUDIT_CACHE_PATH) as f:
+            cache = json.load(f)
+    except (FileNotFoundError, ValueError):
+        cache = {}
+    files, contents = cache.get('files', {}), cache.get('contents', {})
+
+    store = ArchiveStore()
+    archived = {
+        name: store.locate(name, ARCHIVE_RATES_PATH)
+        for name in store.names() if store.exists(name, ARCHIVE_RATES_PATH)
+    }
+    digests = {}
+    stale = []
+    for name, path in archived.items():
+        if store.is_packed(name):
+            digests[name] = store.manifest(name)[ARCHIVE_RATES_PATH]['sha256']
+            continue
+        stat = os.stat(path)
+        cached = files.get(path)
+        if cached and cached['mtime'] == stat.st_mtime_ns and cached['size'] == stat.st_size:
+            digests[name] = cached['sha256']
+        else:
+            stale.append(name)
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for name, (path, digest) in zip(stale, pool.map(hash_file, [archived[name] for name in stale], chunksize=8)):
+            stat = os.stat(path)
+            files[path] = {'mtime': stat.st_mtime_ns, 'size': stat.st_size, 'sha256': digest}
+            digests[name] = digest
+
+        by_digest = {}
+        for name in archived:
+            by_digest.setdefault(digests[name], []).append(name)
+        unparsed = [digest for digest in by_digest if digest not in contents]
+        paths = [archived[by_digest[digest][0]] for digest in unparsed]
+        for digest, entries in zip(unparsed, pool.map(parse_file, paths)):
+            contents[digest] = {str(bps): str(rate) for bps, rate in entries.items()}
+
+    dates_by_entry = {}
+    for digest, names in by_digest.items():
+        for bps, rate in contents[digest].items():
+            dates_by_entry.setdefault((int(bps), int(rate)), set()).update(name[:10] for name in names)
+    wrong = [
+        (bps, rate, get_rate(bps, table), sorted(dates))
+        for (bps, rate), dates in sorted(dates_by_entry.items())
+        if get_rate(bps, table) != rate
+    ]
+
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    with open(AUDIT_CACHE_PATH + '.tmp', 'w') as f:
+        json.dump({
+            'files': {path: files[path] for path in archived.values() if path in files},
+            'contents': {digest: contents[digest] for digest in by_digest},
+        }, f)
+    os.replace(AUDIT_CACHE_PATH + '.tmp', AUDIT_CACHE_PATH)
+    return len(archived), len(by_digest), len(dates_by_entry), wrong
+
+
+def parse_arguments():
+    """Parse command line arguments.
+
+    Returns:
+        argparse.Namespace: The parsed arguments
+    """
+    parser = argparse.ArgumentParser(description="List all rates or compute specific ones")
+    parser.add_argument(
+        "pct",
+        nargs="?",
+        help="Annual percentage with up to 2 decimals (e.g. 4.25); lists all rates when omitted"
+    )
+    parser.add_argument(
+        "--check",
+        action="store_true",
+        help=f"Validate every entry of {RATES_SOL_PATH}"
+    )
+    parser.add_argument(
+        "--solidity",
+        action="store_true",
+        help=f"Regenerate the Rates mapping of {RATES_SOL_PATH}"
+    )
+    parser.add_argument(
+        "--add",
+        nargs="+",
+        default=[],
+        metavar="PCT",
+        help="Percentages to add to the regenerated mapping"
+    )
+    parser.add_argument(
+        "--write",
+        action="store_true",
+        help=f"Write the regenerated mapping to {RATES_SOL_PATH} instead of printing it"
+    )
+    parser.add_argument(
+        "--audit",
+        action="store_true",
+        help=f"Check every archived {ARCHIVE_RATES_PATH} against the formula"
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        help="Process pool size for --audit (default: CPU count)"
+    )
+    parser.add_argument(
+        "--lookup",
+        nargs="+",
+        metavar="RAY",
+        help="Ray per-second rates to find in the table, or - to read them from stdin"
+    )
+    parser.add_argument(
+        "--spell",
+        metavar="PATH",
+        help="Look up every ray rate literal of a spell (e.g. src/DssSpell.sol)"
+    )
+    parser.add_argument(
+        "--all",
+        action="store_true",
+        help=f"Look up in the full 0.00%%-100.00%% table instead of {RATES_SOL_PATH}"
+    )
+    parser.add_argument(
+        "--path",
+        default=RATES_SOL_PATH,
+        help=f"Path of the Rates contract (default: {RATES_SOL_PATH})"
+    )
+    args = parser.parse_args()
+    if args.pct is not None:
+        args.pct = args.pct.replace("pct=", "")
+    return args
+
+
+def main():
+    """Main function to compute, validate or generate rates."""
+    args = parse_arguments()
+
+    if args.check:
+        table = load_table()
+        mismatches = check_rates_sol(args.path, table)
+        for bps, expected, actual in mismatches:
+            print(f"rates[{bps}] = {actual}, expected {expected}")
+        if mismatches:
+            sys.exit(1)
+        print(f"All {len(read_rates_sol(args.path))} entries of {args.path} match")
+    elif args.audit:
+        files, distinct, entries, wrong = audit_archive(load_table(), args.workers)
+        for bps, rate, expected, dates in wrong:
+            print(f"rates[{bps}] = {rate}, expected {expected} in {', '.join(dates)}")
+        print(f"Checked {entries} distinct entries from {distinct} distinct files ({files} archived rates.sol)")
+        if wrong:
+            sys.exit(1)
+    elif args.solidity or args.add:
+        try:
+            added = [parse_percentage(pct) for pct in args.add]
+        except ValueError as e:
+            sys.exit(str(e))
+        table = load_table()
+        with open(args.path) as f:
+            text = f.read()
+        entries = {bps: get_rate(bps, table) for bps in set(parse_rates_sol(text)) | set(added)}
+        output = render_rates_sol(text, entries)
+        if args.write:
+            with open(args.path, 'w') as f:
+                f.write(output)
+            print(f"Wrote {len(entries)} entries to {args.path}")
+        else:
+            sys.stdout.write(output)
+    elif args.lookup or args.spell:
+        entries = dict(enumerate(load_table())) if args.all else read_rates_sol(args.path)
+        index = RateIndex(entries)
+        if args.spell:
+            with open(args.spell) as f:
+                values = parse_spell_rates(f.read())
+        else:
+            words = sys.stdin.read().split() if args.lookup == ['-'] else args.lookup
+            try:
+                values = [(word, int(word.replace('_', ''))) for word in words]
+            except ValueError as e:
+                sys.exit(f"Invalid ray rate: {e}")
+        for label, value in values:
+            prefix = f"{label}: " if args.spell else ""
+            print(f"{prefix}{value} -> {describe_lookup(index, value)}")
+    elif args.pct:
+        try:
+            bps = parse_percentage(args.pct)
+        except ValueError:
+            sys.exit(
+                "Please specify a percentage parameter "
+                "(e.g. for 4.25% use ./scripts/rates.py 4.25 or make rates pct=4.25)"
+            )
+        print(f"{args.pct}%: {compute_rate(bps)}")
+    else:
+        table = load_table()
+        sys.stdout.write(''.join(
+            f"{format_percentage(bps)}%: {rate}\n" for bps, rate in enumerate(table)
+        ))
+
+
+# Execute the main function if this script is run directly
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,330 @@
+#!/usr/bin/env python3
+"""
+Record/Replay Stand-in Server
+
+Local HTTP stand-in for Etherscan, GitHub or a JSON-RPC node. In record mode it forwards
+every request to the real upstream and stores the answers in a cassette; in replay mode it
+answers from the cassette only, after a configurable latency, so the scripts can be run and
+timed without network access or API keys.
+
+Requests are matched on their content, not their order: JSON-RPC calls by method and params
+(batches are split and reassembled with the caller's ids), HTTP calls by method, path, query
+and form body with API keys removed. A request answered differently over time (e.g. polling
+`checkverifystatus`) replays its answers in the recorded order, repeating the last one.
+
+Recording never publishes anything: POSTs other than JSON-RPC reads and Etherscan status
+checks (e.g. `verifysourcecode` submissions, `eth_sendRawTransaction`) are refused instead of
+forwarded, unless a stub answers them locally; stubbed answers are recorded like real ones.
+
+Point a script at a stand-in with ETH_RPC_URL, ETHERSCAN_API_URL, GITHUB_API_BASE or
+GITHUB_RAW_BASE.
+
+Usage:
+    ./replay.py record <cassette> --upstream <url> [--port <port>]
+    ./replay.py replay <cassette> [--port <port>] [--latency <ms>]
+"""
+
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+import requests
+
+# Constants
+DEFAULT_PORT = 8545
+UPSTREAM_TIMEOUT = 120
+SECRET_PARAMS = ('apikey', 'api_key')
+FORWARDED_HEADERS = ('Accept', 'Authorization', 'Content-Type', 'User-Agent')
+NOT_RECORDED = -32001
+REFUSED = -32003
+# The only form POSTs forwarded while recording; any other POST may publish something
+READ_ONLY_ACTIONS = ('checkverifystatus', 'checkproxyverification')
+WRITE_METHOD_PREFIXES = ('eth_send', 'eth_sign', 'personal_')
+
+
+def redact(pairs):
+    return sorted((name, value) for name, value in pairs if name.lower() not in SECRET_PARAMS)
+
+
+def http_key(method, path, body):
+    """
+    Match key of a plain HTTP request: method, path, sorted query and form body without API keys.
+    """
+    url = urlsplit(path)
+    key = [method, url.path.rstrip('/') or '/', urlencode(redact(parse_qsl(url.query)))]
+    if body:
+        try:
+            key.append(urlencode(redact(parse_qsl(body.decode('utf-8'), strict_parsing=True))))
+        except (UnicodeDecodeError, ValueError):
+            key.append(body.decode('utf-8', errors='replace'))
+    return ' '.join(key)
+
+
+def form_fields(path, body):
+    """
+    Query and form body fields of a request.
+    """
+    fields = dict(parse_qsl(urlsplit(path).query))
+    if body:
+        fields.update(parse_qsl(body.decode('utf-8', errors='replace')))
+    return fields
+
+
+def is_read_only(method, path, body):
+    return method != 'POST' or form_fields(path, body).get('action') in READ_ONLY_ACTIONS
+
+
+def rpc_key(request):
+    return f"rpc {request.get('method')} {json.dumps(request.get('params', []), sort_keys=True)}"
+
+
+class Cassette:
+    """
+    Recorded answers by match key. Each key holds the list of answers in the order they were
+    recorded; replay walks through them and then keeps repeating the last one.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        self.positions = {}
+        try:
+            with open(path) as f:
+                self.entries = json.load(f)['entries']
+        except FileNotFoundError:
+            self.entries = {}
+
+    def record(self, key, answer):
+        with self.lock:
+            self.entries.setdefault(key, []).append(answer)
+
+    def replay(self, key):
+        with self.lock:
+            answers = self.entries.get(key)
+            if not answers:
+                return None
+            position = self.positions.get(key, 0)
+            self.positions[key] = position + 1
+            return answers[min(position, len(answers) - 1)]
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        with self.lock, open(self.path + '.tmp', 'w') as f:
+            json.dump({'entries': self.entries}, f, indent=1, sort_keys=True)
+        os.replace(self.path + '.tmp', self.path)
+
+
+class StandInServer(ThreadingHTTPServer):
+    """
+    Threaded stand-in server. Keeps per-server counters (requests, misses, time spent
+    answering) for the benchmarks.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, cassette, port=0, upstream=None, latency=0.0, stub=None):
+        super().__init__(('127.0.0.1', port), StandInHandler)
+        self.cassette = cassette
+        self.upstream = upstream
+        self.latency = latency
+        # stub(method, path, body) -> answer or None, consulted before forwarding while recording
+        self.stub = stub
+        self.session = requests.Session() if upstream else None
+        self.lock = threading.Lock()
+        self.stats = {'requests': 0, 'misses': 0, 'seconds': 0.0}
+
+    @property
+    def url(self):
+        return f'http://127.0.0.1:{self.server_address[1]}'
+
+    def count(self, started, misses=0):
+        with self.lock:
+            self.stats['requests'] += 1
+            self.stats['misses'] += misses
+            self.stats['seconds'] += time.monotonic() - started
+
+    def reset_stats(self):
+        with self.lock:
+            self.stats = {'requests': 0, 'misses': 0, 'seconds': 0.0}
+            self.cassette.positions.clear()
+
+    def forward(self, method, path, headers, body):
+        url = urlsplit(path)
+        target = self.upstream.rstrip('/') + (url.path if url.path != '/' else '')
+        if url.query:
+            target += '?' + url.query
+        response = self.session.request(
+            method, target, headers=headers, data=body, timeout=UPSTREAM_TIMEOUT
+        )
+        return response.status_code, response.headers.get('Content-Type', 'application/json'), response.text
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, *args):
+        pass
+
+    def send(self, status, content_type, text):
+        body = text.encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        self.handle_request(b'')
+
+    def do_POST(self):
+        self.handle_request(self.rfile.read(int(self.headers.get('Content-Length', 0))))
+
+    def handle_request(self, body):
+        server = self.server
+        started = time.monotonic()
+        if server.latency:
+            time.sleep(server.latency)
+        try:
+            payload = json.loads(body) if body.startswith((b'{', b'[')) else None
+        except ValueError:
+            payload = None
+
+        if self.command == 'POST' and isinstance(payload, (dict, list)) and \
+                all('method' in request for request in (payload if isinstance(payload, list) else [payload])):
+            misses = self.handle_rpc(payload, body)
+        else:
+            misses = self.handle_http(body)
+        server.count(started, misses)
+
+    def handle_http(self, body):
+        server = self.server
+        key = http_key(self.command, self.path, body)
+        if server.upstream:
+            answer = server.stub(self.command, self.path, body) if server.stub else None
+            if answer is None and not is_read_only(self.command, self.path, body):
+                print(f"Refused to record: {key}", file=sys.stderr)
+                self.send(403, 'application/json', json.dumps({
+                    'status': '0', 'message': 'NOTOK', 'result': 'refused: recording never forwards submissions'
+                }))
+                return 1
+            if answer is None:
+                headers = {name: self.headers[name] for name in FORWARDED_HEADERS if self.headers.get(name)}
+                status, content_type, text = server.forward(self.command, self.path, headers, body or None)
+                answer = {'status': status, 'content_type': content_type, 'body': text}
+            server.cassette.record(key, answer)
+            self.send(answer['status'], answer['content_type'], answer['body'])
+            return 0
+
+        answer = server.cassette.replay(key)
+        if answer is None:
+            print(f"Not recorded: {key}", file=sys.stderr)
+            self.send(404, 'application/json', json.dumps({'error': 'not recorded', 'key': key}))
+            return 1
+        self.send(answer['status'], answer['content_type'], answer['body'])
+        return 0
+
+    def handle_rpc(self, payload, body):
+        server = self.server
+        requests_ = payload if isinstance(payload, list) else [payload]
+        writes = [request for request in requests_ if str(request.get('method')).startswith(WRITE_METHOD_PREFIXES)]
+        if server.upstream and writes:
+            for request in writes:
+                print(f"Refused to record: {rpc_key(request)}", file=sys.stderr)
+            answers = [
+                {'jsonrpc': '2.0', 'id': request.get('id'),
+                 'error': {'code': REFUSED, 'message': 'refused: recording never forwards transactions'}}
+                for request in requests_
+            ]
+            self.send(200, 'application/json', json.dumps(answers if isinstance(payload, list) else answers[0]))
+            return len(writes)
+        if server.upstream:
+            status, content_type, text = server.forward('POST', '/', {'Content-Type': 'application/json'}, body)
+            answers = json.loads(text) if status == 200 else []
+            by_id = {answer.get('id'): answer for answer in (answers if isinstance(answers, list) else [answers])}
+            for request in requests_:
+                answer = by_id.get(request.get('id'))
+                if answer is not None:
+                    server.cassette.record(
+                        rpc_key(request),
+                        {field: answer[field] for field in ('result', 'error') if field in answer}
+                    )
+            self.send(status, content_type, text)
+            return 0
+
+        misses, answers = 0, []
+        for request in requests_:
+            answer = server.cassette.replay(rpc_key(request))
+            if answer is None:
+                print(f"Not recorded: {rpc_key(request)}", file=sys.stderr)
+                answer = {'error': {'code': NOT_RECORDED, 'message': 'not recorded'}}
+                misses += 1
+            answers.append({'jsonrpc': '2.0', 'id': request.get('id'), **answer})
+        self.send(200, 'application/json', json.dumps(answers if isinstance(payload, list) else answers[0]))
+        return misses
+
+
+def start_server(cassette_path, upstream=None, latency=0.0, port=0, stub=None):
+    """Start a stand-in server in a background thread.
+
+    Args:
+        cassette_path (str): Cassette to replay from, or to record into when upstream is set
+        upstream (str): Real endpoint to forward to (record mode)
+        latency (float): Delay in seconds added to every answer
+        port (int): Port to listen on, 0 for any free port
+        stub (callable): Answers some requests locally while recording, see StandInServer
+
+    Returns:
+        StandInServer: The running server; call shutdown() and, when recording, cassette.save()
+    """
+    server = StandInServer(Cassette(cassette_path), port, upstream, latency, stub)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def parse_arguments():
+    """Parse command line arguments.
+
+    Returns:
+        argparse.Namespace: The parsed arguments
+    """
+    parser = argparse.ArgumentParser(description="Record or replay Etherscan, GitHub and JSON-RPC answers")
+    parser.add_argument("mode", choices=["record", "replay"])
+    parser.add_argument("cassette", help="Cassette file")
+    parser.add_argument("--upstream", help="Real endpoint to record from (record mode)")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help=f"Port to listen on (default: {DEFAULT_PORT})")
+    parser.add_argument("--latency", type=float, default=0, help="Milliseconds added to every replayed answer")
+    args = parser.parse_args()
+    if args.mode == 'record' and not args.upstream:
+        parser.error("record mode needs --upstream")
+    return args
+
+
+def main():
+    """Main function to run a stand-in server until interrupted."""
+    args = parse_arguments()
+    upstream = args.upstream if args.mode == 'record' else None
+    if args.mode == 'replay' and not os.path.exists(args.cassette):
+        sys.exit(f"{args.cassette} not found")
+
+    server = start_server(args.cassette, upstream, args.latency / 1000, args.port)
+    print(f"{args.mode.capitalize()}ing {args.cassette} on {server.url}", file=sys.stderr)
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.shutdown()
+        if upstream:
+            server.cassette.save()
+        print(f"{server.stats['requests']} requests, {server.stats['misses']} not recorded", file=sys.stderr)
+
+
+# Execute the main function if this script is run directly
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,295 @@
+#!/usr/bin/env python3
+"""
+Spell Config Parser
+
+Parses the `SpellValues`, `SystemValues` and per-collateral `CollateralValues` blocks of a
+`src/test/config.sol` (current or archived) into plain data, evaluating the constant
+expressions used there (`150 * MILLION`, `6 hours`, `type(uint256).max`, `address(0x...)`).
+Expressions that are not constant (e.g. `prevSpells`) are kept as their source text.
+
+Parsed results are cached under .cache/config by content hash, so scripts can read any
+field without re-scanning the 2000+ line file.
+
+Usage:
+    ./spellconfig.py [<path>]                   dump the parsed config as JSON
+    ./spellconfig.py [<path>] --field <name>    print one field, e.g. spell.deployed_spell
+                                                or collaterals.ETH-A.pct
+"""
+
+import argparse
+import ast
+import hashlib
+import json
+import operator
+import os
+import re
+import sys
+
+# Constants
+CONFIG_PATH = 'src/test/config.sol'
+CACHE_DIR = os.path.join(os.environ.get('SPELLS_CACHE_DIR', '.cache'), 'config')
+# Bump when the parsed format changes so cached results are parsed again
+PARSER_VERSION = 1
+MAX_UINT256 = 2 ** 256 - 1
+TIME_UNITS = {'seconds': 1, 'minutes': 60, 'hours': 3600, 'days': 86400, 'weeks': 604800}
+COMMENT_PATTERN = re.compile(r'("(?:[^"\\\n]|\\.)*")|//[^\n]*|/\*.*?\*/', re.S)
+CONSTANT_PATTERN = re.compile(r'uint256\s+constant\s+(?:\w+\s+)*?([A-Z_][A-Z0-9_]*)\s*=\s*([^;]+);')
+ADDRESS_PATTERN = re.compile(r'^(?:address\s*\(\s*)?(0x[0-9a-fA-F]{40})\s*\)?$')
+STRUCT_ASSIGNMENT_PATTERN = r'{target}\s*=\s*{struct}\s*\(\s*\{{'
+FIELD_ASSIGNMENT_PATTERN = re.compile(r'\bafterSpell\.(\w+)\s*=\s*([^;]+);')
+COLLATERAL_PATTERN = re.compile(r'\bafterSpell\.collaterals\[\s*"([^"]+)"\s*\]\s*=\s*CollateralValues\s*\(\s*\{')
+BINARY_OPERATORS = {
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+    ast.Mult: operator.mul,
+    ast.Div: operator.floordiv,
+    ast.FloorDiv: operator.floordiv,
+    ast.Mod: operator.mod,
+    ast.Pow: operator.pow,
+}
+
+
+class NotConstant(ValueError):
+    """
+    Raised for expressions that cannot be evaluated without running the contract.
+    """
+
+
+def strip_comments(source):
+    return COMMENT_PATTERN.sub(lambda match: match.group(1) or '', source)
+
+
+def evaluate(expression, constants):
+    """Evaluate a Solidity constant expression from config.sol.
+
+    Args:
+        expression (str): Expression source, without comments
+        constants (dict): Named uint256 constants (MILLION, WAD, ...)
+
+    Returns:
+        int, bool, str: The value; addresses and string literals are returned as str
+
+    Raises:
+        NotConstant: If the expression uses anything else than literals, constants and arithmetic
+    """
+    expression = expression.strip()
+    if expression in ('true', 'false'):
+        return expression == 'true'
+    address = ADDRESS_PATTERN.match(expression)
+    if address:
+        return address.group(1)
+    if re.fullmatch(r'address\s*\(\s*0\s*\)', expression):
+        return '0x' + '0' * 40
+    if re.fullmatch(r'"(?:[^"\\]|\\.)*"', expression):
+        return expression[1:-1]
+
+    translated = re.sub(r'type\s*\(\s*uint256\s*\)\s*\.\s*max', str(MAX_UINT256), expression)
+    translated = re.sub(
+        r'(\d[\d_]*)\s+(' + '|'.join(TIME_UNITS) + r')\b',
+        lambda match: f'({match.group(1)} * {TIME_UNITS[match.group(2)]})',
+        translated
+    )
+    try:
+        tree = ast.parse(translated, mode='eval')
+    except SyntaxError:
+        raise NotConstant(expression)
+
+    def walk(node):
+        if isinstance(node, ast.Constant) and isinstance(node.value, int) and not isinstance(node.value, bool):
+            return node.value
+        if isinstance(node, ast.Name) and node.id in constants:
+            return constants[node.id]
+        if isinstance(node, ast.BinOp) and type(node.op) in BINARY_OPERATORS:
+            return BINARY_OPERATORS[type(node.op)](walk(node.left), walk(node.right))
+        if isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.USub):
+            return -walk(node.operand)
+        raise NotConstant(expression)
+
+    try:
+        return walk(tree.body)
+    except ZeroDivisionError:
+        raise NotConstant(expression)
+
+
+def split_top_level(text, separator=','):
+    """
+    Split on separators that are not nested in brackets or string literals.
+    """
+    parts, depth, start, quoted = [], 0, 0, False
+    for index, char in enumerate(text):
+        if char == '"' and (index == 0 or text[index - 1] != '\\'):
+            quoted = not quoted
+        elif quoted:
+            continue
+        elif char in '([{':
+            depth += 1
+        elif char in ')]}':
+            depth -= 1
+        elif char == separator and depth == 0:
+            parts.append(text[start:index])
+            start = index + 1
+    parts.append(text[start:])
+    return [part.strip() for part in parts if part.strip()]
+
+
+def read_block(source, start):
+    """
+    Return the text between the `{` just before `start` and its matching `}`.
+    """
+    depth = 1
+    for index in range(start, len(source)):
+        if source[index] == '{':
+            depth += 1
+        elif source[index] == '}':
+            depth -= 1
+            if depth == 0:
+                return source[start:index]
+    raise ValueError("Unterminated struct literal")
+
+
+def parse_fields(block, constants):
+    fields = {}
+    for entry in split_top_level(block):
+        name, separator, expression = entry.partition(':')
+        if not separator:
+            continue
+        fields[name.strip()] = to_value(expression, constants)
+    return fields
+
+
+def to_value(expression, constants):
+    try:
+        return evaluate(expression, constants)
+    except NotConstant:
+        return {'expr': ' '.join(expression.split())}
+
+
+def parse_config(source):
+    """Parse a config.sol source.
+
+    Args:
+        source (str): Solidity source of a config.sol
+
+    Returns:
+        dict: {'constants', 'spell', 'system', 'collaterals'}; the spell and system
+            sections are empty when the file does not define them
+    """
+    source = strip_comments(source)
+    constants = {}
+    for name, expression in CONSTANT_PATTERN.findall(source):
+        try:
+            constants[name] = evaluate(expression, constants)
+        except NotConstant:
+            pass
+
+    def struct(target, struct_name):
+        match = re.search(STRUCT_ASSIGNMENT_PATTERN.format(target=target, struct=struct_name), source)
+        return parse_fields(read_block(source, match.end()), constants) if match else {}
+
+    spell = struct(r'\bspellValues', 'SpellValues')
+    system = struct(r'\bafterSpell', 'SystemValues')
+    for name, expression in FIELD_ASSIGNMENT_PATTERN.findall(source):
+        system[name] = to_value(expression, constants)
+
+    collaterals = {}
+    for match in COLLATERAL_PATTERN.finditer(source):
+        collaterals[match.group(1)] = parse_fields(read_block(source, match.end()), constants)
+
+    return {'constants': constants, 'spell': spell, 'system': system, 'collaterals': collaterals}
+
+
+def load_config(path=CONFIG_PATH):
+    """Parse a config.sol, reusing the cached result for the same content.
+
+    Args:
+        path (str): Path of the config.sol
+
+    Returns:
+        dict: See parse_config
+    """
+    with open(path, 'rb') as f:
+        content = f.read()
+    digest = hashlib.sha256(content).hexdigest()
+    cache_path = os.path.join(CACHE_DIR, f'{digest}.json')
+    try:
+        with open(cache_path) as f:
+            cached = json.load(f)
+        if cached.get('version') == PARSER_VERSION:
+            return cached['config']
+    except (FileNotFoundError, ValueError):
+        pass
+
+    config = parse_config(content.decode('utf-8'))
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    with open(cache_path + '.tmp', 'w') as f:
+        json.dump({'version': PARSER_VERSION, 'config': config}, f)
+    os.replace(cache_path + '.tmp', cache_path)
+    return config
+
+
+def get_field(config, name):
+    """Look up a dotted field name such as `spell.deployed_spell` or `collaterals.ETH-A.pct`.
+
+    Raises:
+        KeyError: If the field does not exist
+    """
+    section, _, rest = name.partition('.')
+    value = config[section]
+    if section == 'collaterals' and rest:
+        ilk, _, rest = rest.rpartition('.') if rest.count('.') else (rest, '', '')
+        value = value[ilk]
+    for part in filter(None, rest.split('.')):
+        value = value[part]
+    return value
+
+
+def format_field(value):
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    if isinstance(value, dict) and set(value) == {'expr'}:
+        return value['expr']
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, indent=2)
+    return str(value)
+
+
+def parse_arguments():
+    """Parse command line arguments.
+
+    Returns:
+        argparse.Namespace: The parsed arguments
+    """
+    parser = argparse.ArgumentParser(description="Parse a config.sol into structured data")
+    parser.add_argument(
+        "path",
+        nargs="?",
+        default=CONFIG_PATH,
+        help=f"Path of the config.sol (default: {CONFIG_PATH})"
+    )
+    parser.add_argument(
+        "--field",
+        help="Print a single field, e.g. spell.deployed_spell or collaterals.ETH-A.pct"
+    )
+    return parser.parse_args()
+
+
+def main():
+    """Main function to dump a parsed config.sol."""
+    args = parse_arguments()
+    try:
+        config = load_config(args.path)
+    except FileNotFoundError:
+        sys.exit(f"{args.path} not found")
+
+    if args.field:
+        try:
+            print(format_field(get_field(config, args.field)))
+        except KeyError:
+            sys.exit(f"No field {args.field} in {args.path}")
+    else:
+        print(json.dumps(config, indent=2))
+
+
+# Execute the main function if this script is run directly
+if __name__ == "__main__":
+    main()
@@ -1,26 +1,196 @@
 #! /usr/bin/env python3
 
 import argparse
+import bisect
+import json
+import os
+import sys
 from datetime import datetime, timezone
 
 DATE_FORMAT="%Y-%m-%d %H:%M:%S";
+CACHE_DIR = os.path.join(os.environ.get('SPELLS_CACHE_DIR', '.cache'), 'time')
+
+
+class BlockResolver:
+    """
+    Finds the block at a timestamp with an interpolation search over eth_getBlockByNumber.
+    Every sampled (block, timestamp) pair is kept on disk per chain, so later searches start
+    from a tight bracket and usually need one or two requests.
+    """
+
+    def __init__(self, rpc):
+        self.rpc = rpc
+        self.path = os.path.join(CACHE_DIR, f'blocks-{rpc.chain_id()}.json')
+        try:
+            with open(self.path) as f:
+                samples = {int(block): timestamp for block, timestamp in json.load(f).items()}
+        except (FileNotFoundError, ValueError):
+            samples = {}
+        self.blocks = sorted(samples)
+        self.timestamps = [samples[block] for block in self.blocks]
+        self.requests = 0
+        self.dirty = False
+
+    def save(self):
+        if not self.dirty:
+            return
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        with open(self.path + '.tmp', 'w') as f:
+            json.dump(dict(zip(map(str, self.blocks), self.timestamps)), f, separators=(',', ':'))
+        os.replace(self.path + '.tmp', self.path)
+        self.dirty = False
+
+    def timestamp(self, block):
+        """
+        Timestamp of a block, from the sample cache when possible.
+        """
+        position = bisect.bisect_left(self.blocks, block)
+        if position < len(self.blocks) and self.blocks[position] == block:
+            return self.timestamps[position]
+        timestamp = int(self.rpc.get_block(block)['timestamp'], 16)
+        self.requests += 1
+        self.blocks.insert(position, block)
+        self.timestamps.insert(position, timestamp)
+        self.dirty = True
+        return timestamp
+
+    def latest(self):
+        block = self.rpc.block_number()
+        self.requests += 1
+        return block, self.timestamp(block)
+
+    def block_at(self, timestamp):
+        """Find the last block mined at or before a timestamp.
+
+        Args:
+            timestamp (int): Unix timestamp
+
+        Returns:
+            int: The block number
+
+        Raises:
+            ValueError: If the timestamp is before the genesis block
+        """
+        if self.timestamp(0) > timestamp:
+            raise ValueError(f"{timestamp} is before the genesis block")
+        # Bracket with the nearest cached samples: ts(low) <= timestamp < ts(high)
+        position = bisect.bisect_right(self.timestamps, timestamp)
+        low = self.blocks[position - 1]
+        if position < len(self.blocks):
+            high = self.blocks[position]
+        else:
+            high, high_timestamp = self.latest()
+            if high_timestamp <= timestamp:
+                return high
+
+        interpolate = True
+        while high - low > 1:
+            width = high - low
+            if interpolate:
+                low_timestamp, high_timestamp = self.timestamp(low), self.timestamp(high)
+                guess = low + (timestamp - low_timestamp) * width // max(high_timestamp - low_timestamp, 1)
+            else:
+                guess = (low + high) // 2
+            guess = min(max(guess, low + 1), high - 1)
+            if self.timestamp(guess) <= timestamp:
+                low = guess
+            else:
+                high = guess
+            # Fall back to one bisection step whenever interpolation did not halve the bracket
+            interpolate = high - low <= width // 2
+        return low
+
+
+def parse_date(date):
+    return datetime.fromisoformat(date.upper().replace(" UTC", "")).replace(tzinfo=timezone.utc)
+
+
+def parse_input(value):
+    """
+    Turn a `date=...`, `stamp=...`, `block=...`, bare timestamp or bare date into (kind, value).
+    """
+    key, separator, rest = value.partition("=")
+    if separator and key in ("date", "stamp", "block"):
+        kind, value = key, rest
+    else:
+        kind = "stamp" if value.isdigit() else "date"
+    if kind == "date":
+        return "stamp", int(parse_date(value).timestamp())
+    return kind, int(value)
+
+
+def format_stamp(stamp):
+    return datetime.fromtimestamp(stamp, timezone.utc).strftime(DATE_FORMAT)
+
+
+def get_resolver():
+    if not os.environ.get('ETH_RPC_URL'):
+        sys.exit("Please set a ETH_RPC_URL")
+    from jsonrpc import JsonRpcClient
+    return BlockResolver(JsonRpcClient())
+
+
+def resolve_batch(lines):
+    """
+    Resolve one input per line, printing `input, block, timestamp, date` tab-separated.
+    """
+    resolver = get_resolver()
+    try:
+        for line in lines:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                kind, value = parse_input(line)
+                if kind == "block":
+                    block, stamp = value, resolver.timestamp(value)
+                else:
+                    block = resolver.block_at(value)
+                    stamp = resolver.timestamp(block)
+            except ValueError as e:
+                print(f"{line}\terror: {e}")
+                continue
+            print(f"{line}\t{block}\t{stamp}\t{format_stamp(stamp)}")
+    finally:
+        resolver.save()
+    print(f"RPC requests: {resolver.requests}", file=sys.stderr)
+
 
 # Parse positional arguments
 parser=argparse.ArgumentParser()
-parser.add_argument("date", help="Converts date to UTC timestamp")
-parser.add_argument("stamp", help="Converts timestamp to UTC date")
+parser.add_argument("date", nargs="?", default="", help="Converts date to UTC timestamp")
+parser.add_argument("stamp", nargs="?", default="", help="Converts timestamp to UTC date")
+parser.add_argument("block", nargs="?", default="", help="Converts block number to UTC timestamp and date (needs ETH_RPC_URL)")
+parser.add_argument("--resolve", action="store_true", help="Also find the block at the date or timestamp (needs ETH_RPC_URL)")
+parser.add_argument("--stdin", action="store_true", help="Resolve dates, timestamps or block=<number> read one per line from stdin")
 parsed=parser.parse_args()
 
+if parsed.stdin:
+    resolve_batch(sys.stdin)
+    sys.exit()
+
 # Cleanup positional arguments
 date = parsed.date.replace("date=", "").upper().replace(" UTC", "")
 stamp = parsed.stamp.replace("stamp=", "")
+block = parsed.block.replace("block=", "")
+resolver = get_resolver() if parsed.resolve or block else None
 
 # Convert provided input in UTC format into desired output in UTC as well
 if date:
     utc_date = datetime.fromisoformat(date).replace(tzinfo=timezone.utc)
     print(utc_date)
     print(int(utc_date.timestamp()))
+    if parsed.resolve:
+        print(resolver.block_at(int(utc_date.timestamp())))
 if stamp:
     utc_date = datetime.fromtimestamp(int(stamp), timezone.utc)
     print(utc_date)
     print(utc_date.strftime(DATE_FORMAT))
+    if parsed.resolve:
+        print(resolver.block_at(int(stamp)))
+if block:
+    block_stamp = resolver.timestamp(int(block))
+    print(block_stamp)
+    print(format_stamp(block_stamp))
+if resolver:
+    resolver.save()
@@ -5,18 +5,28 @@ This script verifies both the DssSpell and DssSpellAction contracts.
 """
 import os
 import sys
+import argparse
+import hashlib
 import subprocess
+import threading
 import time
 import re
 import json
-import requests
+import random
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor, FIRST_EXCEPTION, wait
 from datetime import datetime
-from typing import Dict, Any, Tuple, Optional
+from typing import Dict, Any, Iterator, List, Tuple, Optional
+
+from etherscan import EtherscanClient
+from jsonrpc import JsonRpcClient
 
 # Constants
-ETHERSCAN_API_URL = 'https://api.etherscan.io/v2/api'
 FLATTEN_OUTPUT_PATH = 'out/flat.sol'
+BUILD_INFO_DIR = 'out/build-info'
 SOURCE_FILE_PATH = 'src/DssSpell.sol'
+SPELL_OUTPUT_PATH = 'out/DssSpell.sol/DssSpell.json'
+ACTION_OUTPUT_PATH = 'out/DssSpell.sol/DssSpellAction.json'
 LIBRARY_NAME = 'DssExecLib'
 ETHERSCAN_SUBDOMAINS = {
     '1': ''
@@ -25,6 +35,228 @@ LICENSE_NUMBERS = {
     'GPL-3.0-or-later': 5,
     'AGPL-3.0-or-later': 13
 }
+POLL_INTERVAL = 15
+POLL_DEADLINE = 15 * 60
+CACHE_DIR = os.path.join(os.environ.get('SPELLS_CACHE_DIR', '.cache'), 'verify')
+CACHE_KEY_PATHS = ['src', 'lib', 'remappings.txt', 'foundry.toml']
+LIBRARY_PLACEHOLDER_PATTERN = r'__\$[0-9a-fA-F]{34}\$__'
+
+
+class VerificationCancelled(Exception):
+    """
+    Raised inside a verification job when a sibling job has already failed.
+    """
+
+
+def log(message: str, label: Optional[str] = None, file=sys.stdout) -> None:
+    """
+    Print a progress message, prefixed with the contract name in concurrent mode.
+    """
+    prefix = f'[{label}] ' if label else ''
+    print(f'{prefix}{message}', file=file)
+
+
+class PollSchedule(ABC):
+    """
+    Produces the delays between successive Etherscan polls.
+    Iteration stops once the total deadline would be exceeded.
+    """
+    name = 'base'
+
+    def __init__(self, deadline: float = POLL_DEADLINE):
+        self.deadline = deadline
+
+    @abstractmethod
+    def intervals(self) -> Iterator[float]:
+        """
+        Yield the delays before each poll, without regard to the deadline.
+        """
+
+    def delays(self) -> Iterator[float]:
+        started = time.monotonic()
+        for interval in self.intervals():
+            remaining = self.deadline - (time.monotonic() - started)
+            if remaining <= 0:
+                return
+            yield min(interval, remaining)
+
+
+class FixedSchedule(PollSchedule):
+    """
+    Polls at a constant interval.
+    """
+    name = 'fixed'
+
+    def __init__(self, interval: float = POLL_INTERVAL, deadline: float = POLL_DEADLINE):
+        super().__init__(deadline)
+        self.interval = interval
+
+    def intervals(self) -> Iterator[float]:
+        while True:
+            yield self.interval
+
+
+class BackoffSchedule(PollSchedule):
+    """
+    Starts with a short probe and backs off exponentially, with random jitter
+    so that concurrent jobs do not poll in lockstep.
+    """
+    name = 'backoff'
+
+    def __init__(
+        self,
+        first: float = 2,
+        factor: float = 2,
+        maximum: float = 30,
+        jitter: float = 0.25,
+        deadline: float = POLL_DEADLINE
+    ):
+        super().__init__(deadline)
+        self.first = first
+        self.factor = factor
+        self.maximum = maximum
+        self.jitter = jitter
+
+    def intervals(self) -> Iterator[float]:
+        interval = self.first
+        while True:
+            yield interval * random.uniform(1 - self.jitter, 1 + self.jitter)
+            interval = min(interval * self.factor, self.maximum)
+
+
+POLL_SCHEDULES = {
+    FixedSchedule.name: FixedSchedule,
+    BackoffSchedule.name: BackoffSchedule,
+}
+
+
+class TimingRecorder:
+    """
+    Appends one JSON line per completed verification phase to a log file.
+    Does nothing when no path is configured.
+    """
+
+    def __init__(self, path: Optional[str] = None, schedule: Optional[PollSchedule] = None):
+        self.path = path
+        self.schedule = schedule.name if schedule else None
+        self.lock = threading.Lock()
+
+    def record(self, phase: str, started: float, contract: Optional[str] = None, **fields: Any) -> None:
+        if not self.path:
+            return
+        entry = {
+            'timestamp': datetime.now().timestamp(),
+            'phase': phase,
+            'contract': contract,
+            'duration': round(time.monotonic() - started, 3),
+            'schedule': self.schedule,
+            **fields
+        }
+        with self.lock, open(self.path, 'a') as f:
+            f.write(json.dumps(entry) + '\n')
+
+
+def get_source_tree_hash(paths: List[str] = CACHE_KEY_PATHS) -> str:
+    """
+    Hash the Solidity sources and build configuration that the verification depends on.
+    """
+    digest = hashlib.sha256()
+    for root in paths:
+        if os.path.isfile(root):
+            files = [root]
+        else:
+            files = sorted(
+                os.path.join(directory, name)
+                for directory, _, names in os.walk(root)
+                for name in names if name.endswith('.sol')
+            )
+        for path in files:
+            with open(path, 'rb') as f:
+                digest.update(path.encode('utf-8') + b'\0' + f.read() + b'\0')
+    return digest.hexdigest()
+
+
+class VerifyCache:
+    """
+    Content-addressed cache of everything derived from a source tree (flattened
+    code, standard JSON input, compiler metadata), plus the last verification
+    outcome per address and the action address of each spell.
+    """
+
+    def __init__(self, directory: str = CACHE_DIR, enabled: bool = True):
+        self.directory = directory
+        self.enabled = enabled
+        self.lock = threading.Lock()
+        self.key = get_source_tree_hash() if enabled else ''
+        self.entry = self._load(f'{self.key}.json')
+        self.outcomes = self._load('outcomes.json')
+        self.actions = self._load('actions.json')
+
+    def _load(self, name: str) -> Dict[str, Any]:
+        if not self.enabled:
+            return {}
+        try:
+            with open(os.path.join(self.directory, name), 'r') as f:
+                return json.load(f)
+        except (FileNotFoundError, json.decoder.JSONDecodeError):
+            return {}
+
+    def _save(self, name: str, value: Dict[str, Any]) -> None:
+        if not self.enabled:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        path = os.path.join(self.directory, name)
+        with open(f'{path}.tmp', 'w') as f:
+            json.dump(value, f)
+        os.replace(f'{path}.tmp', path)
+
+    def get(self, name: str, compute) -> Any:
+        """
+        Return the cached value for this source tree, computing and storing it on a miss.
+        Empty values are never stored, so they are recomputed on the next run.
+        """
+        if self.entry.get(name):
+            return self.entry[name]
+        value = compute()
+        if not value:
+            return value
+        with self.lock:
+            self.entry[name] = value
+            self._save(f'{self.key}.json', self.entry)
+        return value
+
+    def is_verified(self, chain_id: str, address: str) -> bool:
+        outcome = self.outcomes.get(f'{chain_id}:{address.lower()}')
+        return bool(outcome and outcome['ok'] and outcome['key'] == self.key)
+
+    def record_outcome(self, chain_id: str, address: str, contract_name: str, ok: bool) -> None:
+        with self.lock:
+            self.outcomes[f'{chain_id}:{address.lower()}'] = {
+                'contract': contract_name,
+                'key': self.key,
+                'ok': ok,
+                'timestamp': datetime.now().timestamp()
+            }
+            self._save('outcomes.json', self.outcomes)
+
+    def get_action(self, spell_address: str) -> Optional[str]:
+        return self.actions.get(spell_address.lower())
+
+    def record_action(self, spell_address: str, action_address: str) -> None:
+        with self.lock:
+            self.actions[spell_address.lower()] = action_address
+            self._save('actions.json', self.actions)
+
+
+def sleep_or_cancel(seconds: float, cancel: Optional[threading.Event]) -> None:
+    """
+    Sleep for the given number of seconds, waking up early if the job is cancelled.
+    """
+    if cancel is None:
+        time.sleep(seconds)
+        return
+    if cancel.wait(seconds):
+        raise VerificationCancelled('Verification cancelled')
 
 
 def get_env_var(var_name: str, error_message: str) -> str:
@@ -38,13 +270,12 @@ def get_env_var(var_name: str, error_message: str) -> str:
         sys.exit(1)
 
 
-def get_chain_id() -> str:
+def get_chain_id(rpc: JsonRpcClient) -> str:
     """
     Get the current chain ID.
     """
     print('Obtaining chain ID... ')
-    result = subprocess.run(['cast', 'chain-id'], capture_output=True)
-    chain_id = result.stdout.decode('utf-8').strip()
+    chain_id = str(rpc.chain_id())
     print(f"CHAIN_ID: {chain_id}")
     return chain_id
 
@@ -92,55 +323,97 @@ def get_library_address() -> str:
     return ''
 
 
-def parse_command_line_args() -> Tuple[str, str, str]:
+def parse_command_line_args() -> argparse.Namespace:
     """
     Parse command line arguments.
     """
-    if len(sys.argv) not in [3, 4]:
-        print("""usage:\n
-./verify.py <contractname> <address> [constructorArgs]
-""", file=sys.stderr)
-        sys.exit(1)
-
-    contract_name = sys.argv[1]
-    contract_address = sys.argv[2]
+    parser = argparse.ArgumentParser(
+        usage='./verify.py [options] <contractname> <address> [constructorArgs]')
+    parser.add_argument('contract_name')
+    parser.add_argument('contract_address')
+    parser.add_argument('constructor_args', nargs='?', default='')
+    parser.add_argument(
+        '--concurrent',
+        action='store_true',
+        help='Submit and poll the spell and action verifications in parallel'
+    )
+    parser.add_argument(
+        '--standard-json',
+        action='store_true',
+        help='Upload a standard JSON input built from the forge build-info instead of a flattened file'
+    )
+    parser.add_argument(
+        '--poll',
+        choices=sorted(POLL_SCHEDULES),
+        default=BackoffSchedule.name,
+        help='Etherscan polling schedule (default: %(default)s)'
+    )
+    parser.add_argument(
+        '--poll-deadline',
+        type=float,
+        default=POLL_DEADLINE,
+        help='Give up polling a request after this many seconds (default: %(default)s)'
+    )
+    parser.add_argument(
+        '--timings',
+        default=os.environ.get('VERIFY_TIMINGS_LOG'),
+        help='Append a JSON timing record per phase to this file (default: $VERIFY_TIMINGS_LOG)'
+    )
+    # The bytecode comparison runs before every upload unless skipped, or alone
+    preflight = parser.add_mutually_exclusive_group()
+    preflight.add_argument(
+        '--preflight-only',
+        dest='preflight',
+        action='store_const',
+        const='only',
+        default='run',
+        help='Only compare the local build with the deployed bytecode, without uploading'
+    )
+    preflight.add_argument(
+        '--no-preflight',
+        dest='preflight',
+        action='store_const',
+        const='skip',
+        help='Upload without first comparing the local build with the deployed bytecode'
+    )
+    parser.add_argument(
+        '--no-cache',
+        action='store_true',
+        help=f'Ignore and do not update the cache in {CACHE_DIR}'
+    )
+    args = parser.parse_args()
 
-    if len(contract_address) != 42:
+    if len(args.contract_address) != 42:
         sys.exit('Malformed address')
 
-    constructor_args = ''
-    if len(sys.argv) == 4:
-        constructor_args = sys.argv[3]
-
-    return contract_name, contract_address, constructor_args
+    return args
 
 
 def flatten_source_code() -> None:
     """
     Flatten the source code using Forge.
     """
-    subprocess.run([
+    result = subprocess.run([
         'forge', 'flatten',
         SOURCE_FILE_PATH,
         '--output', FLATTEN_OUTPUT_PATH
-    ], capture_output=True)
+    ], capture_output=True, text=True)
+    if result.returncode != 0:
+        raise Exception(f'forge flatten failed: {result.stderr.strip() or result.stdout.strip()}')
 
 
-def send_etherscan_api_request(params: Dict[str, str], data: Dict[str, Any]) -> Dict:
+def send_etherscan_api_request(
+    params: Dict[str, str],
+    data: Dict[str, Any],
+    client: EtherscanClient,
+    label: Optional[str] = None
+) -> Dict:
     """
     Sends the verification request to the Etherscan API
     """
-    headers = {'User-Agent': 'Sky-Protocol-Spell-Verifier'}
-
-    print('Sending verification request...', file=sys.stderr)
-    response = requests.post(
-        ETHERSCAN_API_URL, headers=headers, params=params, data=data)
-
-    try:
-        return json.loads(response.text)
-    except json.decoder.JSONDecodeError:
-        print(response.text, file=sys.stderr)
-        raise Exception('Error: Etherscan responded with invalid JSON.')
+    log('Sending verification request...', label, file=sys.stderr)
+    # A submission is not retried on network errors, as it may already have been received
+    return client.request(params, data, idempotent=data['action'] != 'verifysourcecode')
 
 
 def get_contract_metadata(output_path: str, input_path: str) -> Dict[str, Any]:
@@ -178,25 +451,92 @@ def read_flattened_code() -> str:
         return f.read()
 
 
+def get_flattened_code() -> str:
+    """
+    Flatten the source code and return it.
+    """
+    flatten_source_code()
+    code = read_flattened_code()
+    if not code.strip():
+        raise Exception(f'forge flatten produced an empty {FLATTEN_OUTPUT_PATH}')
+    return code
+
+
+def find_build_info(input_path: str) -> Dict[str, Any]:
+    """
+    Load the most recent forge build-info file that compiled the given source.
+    """
+    try:
+        candidates = sorted(
+            (os.path.join(BUILD_INFO_DIR, name)
+             for name in os.listdir(BUILD_INFO_DIR) if name.endswith('.json')),
+            key=os.path.getmtime,
+            reverse=True
+        )
+    except FileNotFoundError:
+        candidates = []
+
+    for path in candidates:
+        try:
+            with open(path, 'r') as f:
+                build_info = json.load(f)
+        except json.decoder.JSONDecodeError:
+            raise Exception(f'Malformed JSON in {path}. Run `forge build --force --build-info` and try again')
+        if input_path in build_info.get('input', {}).get('sources', {}):
+            return build_info
+
+    raise Exception('Run `forge build --build-info` and try again')
+
+
+def get_standard_json_input(output_paths: List[str], input_path: str, library_address: str) -> str:
+    """
+    Build a solidity-standard-json-input payload shared by all the given contracts.
+    Only the sources listed in the contracts' metadata are included.
+    """
+    used_sources = set()
+    for output_path in output_paths:
+        try:
+            with open(output_path, 'r') as f:
+                used_sources.update(json.load(f)['metadata']['sources'])
+        except FileNotFoundError:
+            raise Exception('Run `forge build` and try again')
+        except KeyError as e:
+            raise Exception(f'Missing metadata field: {e}')
+
+    build_input = find_build_info(input_path)['input']
+    missing = used_sources - set(build_input['sources'])
+    if missing:
+        raise Exception(
+            f'Build info is missing sources {sorted(missing)}. Run `forge build --force --build-info` and try again')
+
+    settings = dict(build_input['settings'])
+    library_sources = [
+        name for name in used_sources if os.path.basename(name) == f'{LIBRARY_NAME}.sol']
+    if library_address and library_sources:
+        settings['libraries'] = {library_sources[0]: {LIBRARY_NAME: library_address}}
+
+    return json.dumps({
+        'language': build_input.get('language', 'Solidity'),
+        'sources': {name: build_input['sources'][name] for name in sorted(used_sources)},
+        'settings': settings
+    })
+
+
 def prepare_verification_data(
     contract_name: str,
     contract_address: str,
     input_path: str,
-    output_path: str,
+    metadata: Dict[str, Any],
     chain_id: str,
     api_key: str,
     constructor_args: str,
-    library_address: str
+    library_address: str,
+    source_code: str,
+    code_format: str
 ) -> Tuple[Dict[str, str], Dict[str, Any], str]:
     """
     Prepare data for contract verification.
     """
-    # Get contract metadata
-    metadata = get_contract_metadata(output_path, input_path)
-
-    # Read flattened source code
-    code = read_flattened_code()
-
     # Prepare API request parameters
     params = {'chainid': chain_id}
 
@@ -205,8 +545,8 @@ def prepare_verification_data(
         'module': 'contract',
         'action': 'verifysourcecode',
         'contractaddress': contract_address,
-        'sourceCode': code,
-        'codeFormat': 'solidity-single-file',
+        'sourceCode': source_code,
+        'codeFormat': code_format,
         'contractName': contract_name,
         'compilerversion': metadata['compiler_version'],
         'optimizationUsed': '1' if metadata['optimizer_enabled'] else '0',
@@ -214,14 +554,30 @@ def prepare_verification_data(
         'constructorArguements': constructor_args,
         'evmversion': metadata['evm_version'],
         'licenseType': metadata['license_number'],
-        'libraryname1': LIBRARY_NAME,
-        'libraryaddress1': library_address,
     }
 
-    return params, data, code
+    if code_format == 'solidity-standard-json-input':
+        # Libraries are part of the JSON settings, and the contract is referenced by its source path
+        data['contractName'] = f'{input_path}:{contract_name}'
+    else:
+        data['libraryname1'] = LIBRARY_NAME
+        data['libraryaddress1'] = library_address
+
+    return params, data, source_code
 
 
-def wait_for_verification(guid: str, params: Dict[str, str], api_key: str, code: str) -> None:
+def wait_for_verification(
+    guid: str,
+    params: Dict[str, str],
+    api_key: str,
+    code: str,
+    schedule: PollSchedule,
+    recorder: TimingRecorder,
+    client: EtherscanClient,
+    cancel: Optional[threading.Event] = None,
+    label: Optional[str] = None,
+    contract_name: Optional[str] = None
+) -> None:
     """
     Wait for verification to complete and check status.
     """
@@ -233,104 +589,272 @@ def wait_for_verification(guid: str, params: Dict[str, str], api_key: str, code:
     }
 
     check_response = {}
+    started = time.monotonic()
+    delays = schedule.delays()
+    polls = 0
 
     # Poll until verification is complete
     while check_response == {} or 'pending' in check_response.get('result', '').lower():
         if check_response != {}:
-            print(check_response['result'], file=sys.stderr)
-            print(
-                'Waiting for 15 seconds for Etherscan to process the request...',
+            if polls == 1:
+                recorder.record('first-pending', started, contract_name, guid=guid)
+            delay = next(delays, None)
+            if delay is None:
+                recorder.record('verified', started, contract_name, guid=guid, polls=polls, ok=False)
+                raise Exception(f'Verification still pending after {schedule.deadline:.0f} seconds')
+            log(check_response['result'], label, file=sys.stderr)
+            log(
+                f'Waiting for {delay:.1f} seconds for Etherscan to process the request...',
+                label,
                 file=sys.stderr
             )
-            time.sleep(15)
+            sleep_or_cancel(delay, cancel)
 
         check_response = send_etherscan_api_request(
-            params=params, data=check_data)
+            params=params, data=check_data, client=client, label=label)
+        polls += 1
 
     # Check verification result
-    if check_response['status'] != '1' or check_response['message'] != 'OK':
+    ok = check_response['status'] == '1' and check_response['message'] == 'OK'
+    recorder.record(
+        'verified', started, contract_name, guid=guid, polls=polls,
+        ok=ok or 'already verified' in check_response['result'].lower())
+    if not ok:
         if 'already verified' not in check_response['result'].lower():
             # Log the flattened source code for debugging
             log_name = f'verify-{datetime.now().timestamp()}.log'
-            with open(log_name, 'w') as log:
-                log.write(code)
-            print(f'Source code logged to {log_name}', file=sys.stderr)
+            with open(log_name, 'w') as log_file:
+                log_file.write(code)
+            log(f'Source code logged to {log_name}', label, file=sys.stderr)
 
             raise Exception('Verification failed')
         else:
-            print('Contract is already verified')
+            log('Contract is already verified', label)
 
 
 def verify_contract(
     contract_name: str,
     contract_address: str,
     input_path: str,
-    output_path: str,
+    metadata: Dict[str, Any],
     chain_id: str,
     api_key: str,
     constructor_args: str,
-    library_address: str
+    library_address: str,
+    source_code: str,
+    code_format: str,
+    schedule: PollSchedule,
+    recorder: TimingRecorder,
+    cache: VerifyCache,
+    client: EtherscanClient,
+    cancel: Optional[threading.Event] = None,
+    label: Optional[str] = None
 ) -> None:
     """
     Verify a contract on Etherscan.
     """
-    print(f'\nVerifying {contract_name} at {contract_address}...')
+    if not label:
+        print()
+    log(f'Verifying {contract_name} at {contract_address}...', label)
+
+    if cache.is_verified(chain_id, contract_address):
+        log('Contract is already verified (cached)', label)
+        return
 
     # Prepare verification data
     params, data, code = prepare_verification_data(
-        contract_name, contract_address, input_path, output_path,
-        chain_id, api_key, constructor_args, library_address
+        contract_name, contract_address, input_path, metadata,
+        chain_id, api_key, constructor_args, library_address,
+        source_code, code_format
     )
 
     # Submit verification request
-    verify_response = send_etherscan_api_request(params, data)
+    started = time.monotonic()
+    delays = schedule.delays()
+    verify_response = send_etherscan_api_request(
+        params, data, client=client, label=label)
 
     # Handle "contract not yet deployed" case
     while 'locate' in verify_response.get('result', '').lower():
-        print(verify_response['result'], file=sys.stderr)
-        print('Waiting for 15 seconds for the network to update...', file=sys.stderr)
-        time.sleep(15)
-        verify_response = send_etherscan_api_request(params, data)
+        delay = next(delays, None)
+        if delay is None:
+            raise Exception(f'Contract not found after {schedule.deadline:.0f} seconds')
+        log(verify_response['result'], label, file=sys.stderr)
+        log(f'Waiting for {delay:.1f} seconds for the network to update...',
+            label, file=sys.stderr)
+        sleep_or_cancel(delay, cancel)
+        verify_response = send_etherscan_api_request(
+            params, data, client=client, label=label)
+
+    recorder.record('submit', started, contract_name, address=contract_address,
+                    ok=verify_response['status'] == '1')
 
     # Check verification submission status
     if verify_response['status'] != '1' or verify_response['message'] != 'OK':
         if 'already verified' in verify_response['result'].lower():
-            print('Contract is already verified')
+            log('Contract is already verified', label)
+            cache.record_outcome(chain_id, contract_address, contract_name, True)
             return
         raise Exception('Failed to submit verification request')
 
     # Get verification GUID
     guid = verify_response['result']
-    print(f'Verification request submitted with GUID: {guid}')
+    log(f'Verification request submitted with GUID: {guid}', label)
 
     # Check verification status
-    wait_for_verification(guid, params, api_key, code)
+    try:
+        wait_for_verification(
+            guid, params, api_key, code, schedule, recorder,
+            client=client, cancel=cancel, label=label, contract_name=contract_name)
+    except VerificationCancelled:
+        raise
+    except Exception:
+        cache.record_outcome(chain_id, contract_address, contract_name, False)
+        raise
+    cache.record_outcome(chain_id, contract_address, contract_name, True)
 
     # Get Etherscan URL
     subdomain = ETHERSCAN_SUBDOMAINS.get(chain_id, '')
     etherscan_url = f"https://{subdomain}etherscan.io/address/{contract_address}#code"
-    print(f'Contract verified successfully at {etherscan_url}')
+    log(f'Contract verified successfully at {etherscan_url}', label)
 
 
-def get_action_address(spell_address: str) -> Optional[str]:
+def verify_contracts_concurrently(jobs: List[Dict[str, Any]]) -> None:
+    """
+    Verify several contracts in parallel over the keep-alive session of their shared client.
+    Fails fast: the first failing job cancels the pending polls of the others.
+    """
+    cancel = threading.Event()
+
+    with ThreadPoolExecutor(max_workers=len(jobs)) as executor:
+        futures = {
+            executor.submit(
+                verify_contract,
+                **job,
+                cancel=cancel,
+                label=job['contract_name']
+            ): job['contract_name']
+            for job in jobs
+        }
+
+        done, _ = wait(futures, return_when=FIRST_EXCEPTION)
+        for future in done:
+            error = future.exception()
+            if error is not None:
+                cancel.set()
+                raise Exception(f'{futures[future]}: {str(error)}')
+
+
+def get_action_address(
+    rpc: JsonRpcClient,
+    spell_address: str,
+    cache: Optional[VerifyCache] = None
+) -> Optional[str]:
     """
     Get the action contract address from the spell contract.
     """
+    if cache and cache.get_action(spell_address):
+        return cache.get_action(spell_address)
     try:
-        result = subprocess.run(
-            ['cast', 'call', spell_address, 'action()(address)'],
-            capture_output=True,
-            env=os.environ | {
-                'ETH_GAS_PRICE': '0',
-                'ETH_PRIO_FEE': '0'
-            }
-        )
-        return result.stdout.decode('utf-8').strip()
+        action_address = rpc.call(spell_address, 'action()(address)')
+        if cache:
+            cache.record_action(spell_address, action_address)
+        return action_address
     except Exception as e:
         print(f'Error getting action address: {str(e)}', file=sys.stderr)
         return None
 
 
+def load_runtime_bytecode(output_path: str) -> Tuple[bytes, List[Tuple[int, int]]]:
+    """
+    Read the runtime bytecode of a forge artifact, along with the (start, length) ranges
+    that are only known at deployment: immutables and linked library addresses.
+    """
+    try:
+        with open(output_path, 'r') as f:
+            deployed = json.load(f)['deployedBytecode']
+    except FileNotFoundError:
+        raise Exception('Run `forge build` and try again')
+    except KeyError as e:
+        raise Exception(f'Missing artifact field: {e}')
+
+    masked = []
+    for references in deployed.get('immutableReferences', {}).values():
+        masked.extend((reference['start'], reference['length']) for reference in references)
+    for libraries in deployed.get('linkReferences', {}).values():
+        for references in libraries.values():
+            masked.extend((reference['start'], reference['length']) for reference in references)
+
+    # Unlinked libraries are left as __$<hash>$__ placeholders of 20 bytes
+    code = deployed['object'].removeprefix('0x')
+    for match in re.finditer(LIBRARY_PLACEHOLDER_PATTERN, code):
+        masked.append((match.start() // 2, 20))
+    code = re.sub(LIBRARY_PLACEHOLDER_PATTERN, '0' * 40, code)
+    return bytes.fromhex(code), masked
+
+
+def strip_metadata(code: bytes) -> bytes:
+    """
+    Drop the CBOR metadata solc appends to the runtime bytecode; its length is stored
+    in the last two bytes.
+    """
+    if len(code) < 2:
+        return code
+    length = int.from_bytes(code[-2:], 'big')
+    start = len(code) - 2 - length
+    # The metadata is a CBOR map of a few entries (0xa1..0xa7)
+    if length and start >= 0 and 0xa1 <= code[start] <= 0xa7:
+        return code[:start]
+    return code
+
+
+def compare_runtime_bytecode(
+    local: bytes,
+    masked: List[Tuple[int, int]],
+    deployed: bytes
+) -> Optional[str]:
+    """
+    Compare a local runtime bytecode with the deployed one, ignoring the masked ranges
+    and the metadata. Returns a description of the mismatch, or None when they match.
+    """
+    local, deployed = strip_metadata(local), strip_metadata(deployed)
+    if not deployed:
+        return 'no code at address'
+    if len(local) != len(deployed):
+        return f'runtime size differs: {len(local)} bytes built, {len(deployed)} bytes deployed'
+
+    ignored = set()
+    for start, length in masked:
+        ignored.update(range(start, start + length))
+    differing = [
+        offset for offset, (built, onchain) in enumerate(zip(local, deployed))
+        if built != onchain and offset not in ignored
+    ]
+    if differing:
+        return f'{len(differing)} bytes differ, first at offset {differing[0]:#x}'
+    return None
+
+
+def preflight_check(rpc: JsonRpcClient, contracts: List[Tuple[str, str, str]]) -> bool:
+    """
+    Check that the locally built contracts match the code deployed at their addresses
+    before anything is uploaded to Etherscan. Takes (contract name, address, artifact path).
+    """
+    print('\nComparing the local build with the deployed bytecode...')
+    codes = rpc.batch([('eth_getCode', [address, 'latest']) for _, address, _ in contracts])
+
+    ok = True
+    for (contract_name, address, output_path), code in zip(contracts, codes):
+        local, masked = load_runtime_bytecode(output_path)
+        mismatch = compare_runtime_bytecode(local, masked, bytes.fromhex(code.removeprefix('0x')))
+        if mismatch:
+            print(f'{contract_name} at {address} does not match the local build: {mismatch}', file=sys.stderr)
+            ok = False
+        else:
+            print(f'{contract_name} at {address} matches the local build')
+    return ok
+
+
 def main():
     """
     Main entry point for the script.
@@ -352,44 +876,117 @@ def main():
         )
 
         # Parse command line arguments
-        spell_name, spell_address, constructor_args = parse_command_line_args()
+        args = parse_command_line_args()
+        spell_name = args.contract_name
+        spell_address = args.contract_address
+        constructor_args = args.constructor_args
+        schedule = POLL_SCHEDULES[args.poll](deadline=args.poll_deadline)
+        recorder = TimingRecorder(args.timings, schedule)
+        cache = VerifyCache(enabled=not args.no_cache)
+        rpc = JsonRpcClient(rpc_url)
 
         # Get chain ID
-        chain_id = get_chain_id()
+        chain_id = get_chain_id(rpc)
+        etherscan = EtherscanClient(api_key, chain_id=int(chain_id))
 
         # Get library address
         library_address = get_library_address()
 
-        # Flatten source code
-        flatten_source_code()
-
-        # Verify spell contract
-        verify_contract(
-            contract_name=spell_name,
-            contract_address=spell_address,
-            input_path=SOURCE_FILE_PATH,
-            output_path=f'out/DssSpell.sol/DssSpell.json',
-            chain_id=chain_id,
-            api_key=api_key,
-            constructor_args=constructor_args,
-            library_address=library_address
-        )
+        # Only upload when the local build is known to match what is deployed
+        action_address = None
+        if args.preflight != 'skip':
+            action_address = get_action_address(rpc, spell_address, cache)
+            if not action_address:
+                raise Exception('Could not determine action contract address')
+            matches = preflight_check(rpc, [
+                (spell_name, spell_address, SPELL_OUTPUT_PATH),
+                ('DssSpellAction', action_address, ACTION_OUTPUT_PATH)
+            ])
+            if args.preflight == 'only':
+                sys.exit(0 if matches else 1)
+            if not matches:
+                raise Exception('Deployed bytecode does not match the local build, not uploading')
+
+        # Prepare the source code once for both contracts
+        started = time.monotonic()
+        if args.standard_json:
+            source_code = cache.get(
+                f'standard-json:{library_address}',
+                lambda: get_standard_json_input(
+                    [SPELL_OUTPUT_PATH, ACTION_OUTPUT_PATH], SOURCE_FILE_PATH, library_address)
+            )
+            code_format = 'solidity-standard-json-input'
+            recorder.record('standard-json', started)
+        else:
+            source_code = cache.get('flattened', get_flattened_code)
+            code_format = 'solidity-single-file'
+            recorder.record('flatten', started)
 
-        # Get and verify action contract
-        action_address = get_action_address(spell_address)
-        if not action_address:
-            raise Exception('Could not determine action contract address')
-
-        verify_contract(
-            contract_name="DssSpellAction",
-            contract_address=action_address,
-            input_path=SOURCE_FILE_PATH,
-            output_path=f'out/DssSpell.sol/DssSpellAction.json',
-            chain_id=chain_id,
-            api_key=api_key,
-            constructor_args=constructor_args,
-            library_address=library_address
+        spell_metadata = cache.get(
+            f'metadata:{SPELL_OUTPUT_PATH}',
+            lambda: get_contract_metadata(SPELL_OUTPUT_PATH, SOURCE_FILE_PATH)
         )
+        action_metadata = cache.get(
+            f'metadata:{ACTION_OUTPUT_PATH}',
+            lambda: get_contract_metadata(ACTION_OUTPUT_PATH, SOURCE_FILE_PATH)
+        )
+
+        spell_job = {
+            'contract_name': spell_name,
+            'contract_address': spell_address,
+            'input_path': SOURCE_FILE_PATH,
+            'metadata': spell_metadata,
+            'chain_id': chain_id,
+            'api_key': api_key,
+            'constructor_args': constructor_args,
+            'library_address': library_address,
+            'source_code': source_code,
+            'code_format': code_format,
+            'schedule': schedule,
+            'recorder': recorder,
+            'cache': cache,
+            'client': etherscan
+        }
+
+        if args.concurrent:
+            # The action address is needed up front to submit both requests together
+            action_address = action_address or get_action_address(rpc, spell_address, cache)
+            if not action_address:
+                raise Exception('Could not determine action contract address')
+
+            verify_contracts_concurrently([
+                spell_job,
+                spell_job | {
+                    'contract_name': 'DssSpellAction',
+                    'contract_address': action_address,
+                    'metadata': action_metadata
+                }
+            ])
+        else:
+            # Verify spell contract
+            verify_contract(**spell_job)
+
+            # Get and verify action contract
+            action_address = action_address or get_action_address(rpc, spell_address, cache)
+            if not action_address:
+                raise Exception('Could not determine action contract address')
+
+            verify_contract(
+                contract_name="DssSpellAction",
+                contract_address=action_address,
+                input_path=SOURCE_FILE_PATH,
+                metadata=action_metadata,
+                chain_id=chain_id,
+                api_key=api_key,
+                constructor_args=constructor_args,
+                library_address=library_address,
+                source_code=source_code,
+                code_format=code_format,
+                schedule=schedule,
+                recorder=recorder,
+                cache=cache,
+                client=etherscan
+            )
 
         print('\nVerification complete!')
     except Exception as e:
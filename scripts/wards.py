@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Wards Inspector
+
+Lists the authorizations between a target contract and every contract in the ChainLog:
+which ChainLog contracts the target is a ward of, which ones are wards of the target,
+and which `src()` of a ChainLog contract the target is a ward of.
+
+The ChainLog is resolved once and every `wards(address)` and `src()` probe is batched
+through Multicall3, all pinned to a single block.
+
+Usage:
+    ./wards.py <target> [--block <number>] OR
+    make wards target=<target>
+
+Where <target> is an address or a ChainLog key (e.g. MCD_VAT)
+"""
+
+import argparse
+import os
+import sys
+
+from jsonrpc import CHAIN_NAMES, JsonRpcClient, RpcError, from_bytes32, to_bytes32
+
+# Constants
+CHANGELOG = '0xdA0Ab1e0017DEbCd72Be8599041a2aa3bA7e740F'
+
+
+def is_address(value):
+    return value.startswith('0x') and len(value) == 42
+
+
+def resolve_chainlog(rpc, block):
+    """Read every ChainLog key and its address at the given block.
+
+    Args:
+        rpc (JsonRpcClient): The RPC client
+        block (int): The block to read at
+
+    Returns:
+        list: (name, address) pairs in ChainLog order
+    """
+    keys = rpc.call(CHANGELOG, 'list()(bytes32[])', block=block)
+    addresses = rpc.multicall(
+        [(CHANGELOG, 'getAddress(bytes32)(address)', (key,)) for key in keys],
+        block,
+        raise_errors=True
+    )
+    return [(from_bytes32(key), address) for key, address in zip(keys, addresses)]
+
+
+def is_ward(result):
+    return not isinstance(result, RpcError) and result == 1
+
+
+def find_wards(rpc, target, chainlog, block):
+    """Probe the authorizations between the target and every ChainLog contract.
+
+    Args:
+        rpc (JsonRpcClient): The RPC client
+        target (str): The address to inspect
+        chainlog (list): (name, address) pairs from resolve_chainlog
+        block (int): The block to read at
+
+    Returns:
+        list: (kind, name, address) tuples in ChainLog order, where kind is
+            'target-ward-of', 'ward-of-target' or 'source-ward-of'
+    """
+    probes = []
+    for _, contract in chainlog:
+        probes += [
+            (target, 'wards(address)(uint256)', (contract,)),
+            (contract, 'wards(address)(uint256)', (target,)),
+            (contract, 'src()(address)', ()),
+        ]
+    results = rpc.multicall(probes, block)
+
+    sources = [
+        src for src in results[2::3]
+        if not isinstance(src, RpcError)
+    ]
+    source_results = iter(rpc.multicall(
+        [(src, 'wards(address)(uint256)', (target,)) for src in sources], block))
+
+    found = []
+    for index, (name, contract) in enumerate(chainlog):
+        target_ward_of, ward_of_target, src = results[3 * index:3 * index + 3]
+        if is_ward(target_ward_of):
+            found.append(('target-ward-of', name, contract))
+        if is_ward(ward_of_target):
+            found.append(('ward-of-target', name, contract))
+        if not isinstance(src, RpcError) and is_ward(next(source_results)):
+            found.append(('source-ward-of', name, src))
+    return found
+
+
+def parse_arguments():
+    """Parse command line arguments.
+
+    Returns:
+        argparse.Namespace: The parsed arguments
+    """
+    parser = argparse.ArgumentParser(
+        description="List the wards relations between a target and every ChainLog contract")
+    parser.add_argument(
+        "target",
+        help="Target address (e.g. 0x35D1b3F3D7966A1DFe207aa4514C12a259A0492B) or ChainLog key (e.g. MCD_VAT)"
+    )
+    parser.add_argument(
+        "--block",
+        type=int,
+        help="Block number to inspect (default: latest)"
+    )
+    args = parser.parse_args()
+    args.target = args.target.replace("target=", "")
+    if not args.target:
+        parser.error("Please specify the Target Address or ChainLog Key to inspect")
+    return args
+
+
+def main():
+    """Main function to print the wards relations of a target."""
+    args = parse_arguments()
+
+    if not os.environ.get('ETH_RPC_URL'):
+        sys.exit("Please set a ETH_RPC_URL")
+
+    with JsonRpcClient() as rpc:
+        chain_id = rpc.chain_id()
+        block = args.block if args.block is not None else rpc.block_number()
+
+        if is_address(args.target):
+            target = args.target
+        else:
+            target = rpc.call(CHANGELOG, 'getAddress(bytes32)(address)', to_bytes32(args.target), block=block)
+
+        print(f"Network: {CHAIN_NAMES.get(chain_id, chain_id)}")
+        print(f"Block: {block}")
+
+        chainlog = resolve_chainlog(rpc, block)
+        for kind, name, address in find_wards(rpc, target, chainlog, block):
+            if kind == 'target-ward-of':
+                print(f"{args.target} -> {name}")
+            elif kind == 'ward-of-target':
+                print(f"{name} -> {args.target}")
+            else:
+                print(f"{address} (source of {name}) -> {args.target}")
+
+
+# Execute the main function if this script is run directly
+if __name__ == "__main__":
+    main()